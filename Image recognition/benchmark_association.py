@@ -0,0 +1,81 @@
+import argparse
+import time
+import numpy as np
+from visualisations import Association
+from visualisations.Association import associate, project_x
+
+"""
+Compares the time taken to pair the detections with the radar objects the old way (a loop over every detection and
+every radar object, checking `x in range(start, end)`) and with the cost matrix, for increasing numbers of objects.
+
+Usage: python benchmark_association.py --repeats 200
+"""
+
+VIEWPORT = 600
+
+
+def random_frame(detections, radar_objects, rng):
+    starts = rng.integers(0, VIEWPORT - 100, detections)
+    widths = rng.integers(20, 100, detections)
+    boxes = np.stack([starts, np.zeros(detections, dtype=int), starts + widths, np.full(detections, 300)], axis=1)
+    radar = [{'x_pos': float(x), 'y_pos': float(y)}
+             for x, y in zip(rng.uniform(-1000, 1000, radar_objects), rng.uniform(500, 6000, radar_objects))]
+    return boxes, radar
+
+
+def loop_associate(boxes, radar):
+    """
+    The pairing as it was done before, for comparison.
+    """
+    adj_x_list = []
+    final_list = []
+    for obj in radar:
+        new_x = 200 + round(obj["x_pos"] / (abs(obj["y_pos"]) / VIEWPORT), 0)
+        adj_x_list.append((new_x, obj))
+        final_list = sorted(adj_x_list, key=lambda x: abs(x[1]["y_pos"]))
+    depths = []
+    for startX, startY, endX, endY in boxes:
+        depth = None
+        rad_obj = None
+        for obj in final_list:
+            if obj[0] in range(startX, endX):
+                depth = obj[1]["y_pos"]
+                rad_obj = obj
+        if rad_obj:
+            final_list.remove(rad_obj)
+        depths.append(depth)
+    return depths
+
+
+def vector_associate(boxes, radar, hungarian=False):
+    radar = sorted(radar, key=lambda obj: abs(obj["y_pos"]))
+    radar_x = project_x([obj["x_pos"] for obj in radar], [obj["y_pos"] for obj in radar], VIEWPORT)
+    match = associate(boxes, radar_x, hungarian)
+    return [None if index < 0 else radar[index]["y_pos"] for index in match]
+
+
+def time_per_frame(function, frames):
+    start = time.perf_counter()
+    for boxes, radar in frames:
+        function(boxes, radar)
+    return (time.perf_counter() - start) / len(frames)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare the old and the vectorized pairing of radar objects.')
+    parser.add_argument('--repeats', type=int, default=200, help='Number of frames to time each size on.')
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    methods = [('loop', loop_associate), ('greedy', vector_associate)]
+    if Association.linear_sum_assignment is not None:
+        methods.append(('hungarian', lambda boxes, radar: vector_associate(boxes, radar, True)))
+    print("objects  " + "".join(f"{name:>12}" for name, _ in methods) + "  (ms per frame)")
+    for objects in (5, 20, 50, 100, 200):
+        frames = [random_frame(objects, objects, rng) for _ in range(args.repeats)]
+        times = [time_per_frame(function, frames) * 1000 for _, function in methods]
+        print(f"{objects:7}  " + "".join(f"{ms:12.3f}" for ms in times))
+
+
+if __name__ == '__main__':
+    main()
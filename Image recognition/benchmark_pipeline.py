@@ -0,0 +1,89 @@
+import argparse
+import time
+import cv2
+from visualisations.ModImageDetectionDepth import ModImageDetectionDepth
+
+"""
+Measures the frame rate of the image recognition on a recorded video, with every step run one after another for each
+frame (as it used to be) and with the steps pipelined in their own threads.
+
+No radar or window is needed. The video is played at its own frame rate, as a camera would give it, unless --fast is
+given. Must be run from the application root directory so the model can be found.
+
+Usage: python benchmark_pipeline.py recording.mp4
+"""
+
+
+def no_radar():
+    return iter(())
+
+
+class Video:
+    """
+    Recorded video read like a camera, at its own frame rate unless fast.
+    """
+
+    def __init__(self, path, fast=False):
+        self.capture = cv2.VideoCapture(path)
+        self.interval = 0 if fast else 1 / (self.capture.get(cv2.CAP_PROP_FPS) or 30)
+        self.next_frame = time.monotonic()
+
+    def read(self):
+        self.next_frame += self.interval
+        time.sleep(max(0.0, self.next_frame - time.monotonic()))
+        return self.capture.read()
+
+
+def run_serial(vis):
+    """
+    :return: Number of frames shown and the time taken
+    """
+    frames = 0
+    start = time.perf_counter()
+    while not vis.camera_ended:
+        item = vis.capture()
+        if item is not None:
+            vis.draw(vis.infer(vis.preprocess(item)))
+            frames += 1
+    return frames, time.perf_counter() - start
+
+
+def run_pipelined(vis):
+    """
+    :return: Number of frames shown, the time taken and the pipeline
+    """
+    pipeline = vis.make_pipeline()
+    frames = 0
+    start = time.perf_counter()
+    pipeline.start()
+    while True:
+        item = pipeline.get(timeout=1)
+        if item is not None:
+            frames += 1
+        elif vis.camera_ended:
+            break
+    elapsed = time.perf_counter() - start - 1  # less the final wait
+    pipeline.stop()
+    return frames, elapsed, pipeline
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Measure the frame rate of the image recognition on a video.')
+    parser.add_argument('video', help='Recorded video to use instead of the camera.')
+    parser.add_argument('--fast', action='store_true', help='Read the video as fast as possible.')
+    args = parser.parse_args()
+
+    vis = ModImageDetectionDepth(no_radar, None, source=args.video)
+
+    vis.cam = Video(args.video, args.fast)
+    frames, elapsed = run_serial(vis)
+    print(f"Serial:    {frames} frames in {elapsed:.1f} s, {frames / elapsed:.1f} fps")
+
+    vis.cam, vis.camera_ended = Video(args.video, args.fast), False
+    frames, elapsed, pipeline = run_pipelined(vis)
+    print(f"Pipelined: {frames} frames in {elapsed:.1f} s, {frames / elapsed:.1f} fps")
+    print(f"           {pipeline.summary()}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,58 @@
+import unittest
+import numpy as np
+from visualisations import Association
+from visualisations.Association import project_x, cost_matrix, associate
+
+"""
+Unit tests for pairing the detections with the radar objects
+"""
+
+
+class TestProjectX(unittest.TestCase):
+
+    def test_project(self):
+        projected = project_x([0, 100, -300], [1000, 600, 1200], 600)
+        np.testing.assert_array_equal(projected, [200, 300, 50])
+
+    def test_zero_distance(self):
+        self.assertEqual(project_x([10], [0], 600)[0], np.inf)
+
+
+class TestAssociate(unittest.TestCase):
+
+    def test_cost_matrix(self):
+        cost = cost_matrix([[100, 0, 200, 50]], [150, 125, 100, 200, 99.5, 199.5])
+        np.testing.assert_allclose(cost, [[0, 0.5, 1, np.inf, np.inf, 0.99]])
+
+    def test_non_integer_x(self):
+        self.assertEqual(associate([[100, 0, 200, 50]], [150.5]).tolist(), [0])
+
+    def test_each_radar_object_used_once(self):
+        boxes = [[100, 0, 200, 50], [120, 0, 220, 50], [400, 0, 500, 50]]
+        match = associate(boxes, [150, 600])
+        self.assertEqual(match.tolist(), [0, -1, -1])
+
+    def test_closest_to_centre(self):
+        boxes = [[100, 0, 200, 50], [180, 0, 300, 50]]
+        match = associate(boxes, [190, 155])
+        self.assertEqual(match.tolist(), [1, 0])
+
+    def test_ties_go_to_earlier_radar_object(self):
+        self.assertEqual(associate([[100, 0, 200, 50]], [140, 160]).tolist(), [0])
+
+    def test_empty(self):
+        self.assertEqual(associate(np.zeros((0, 4)), [150]).tolist(), [])
+        self.assertEqual(associate([[100, 0, 200, 50]], []).tolist(), [-1])
+
+    @unittest.skipIf(Association.linear_sum_assignment is None, "scipy not installed")
+    def test_hungarian(self):
+        # Greedy takes the cheapest pair (box 0 with radar 0), leaving box 1 without a radar object
+        boxes = [[100, 0, 200, 50], [140, 0, 160, 50]]
+        radar_x = [151, 120]
+        self.assertEqual(associate(boxes, radar_x).tolist(), [0, -1])
+        self.assertEqual(associate(boxes, radar_x, hungarian=True).tolist(), [1, 0])
+
+    @unittest.skipIf(Association.linear_sum_assignment is not None, "scipy installed")
+    def test_hungarian_needs_scipy(self):
+        with self.assertRaises(ImportError):
+            associate([[100, 0, 200, 50]], [150], hungarian=True)
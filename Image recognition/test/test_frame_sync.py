@@ -0,0 +1,70 @@
+import unittest
+from visualisations.FrameSync import TimestampedBuffer, FrameMatcher, StreamReader
+
+"""
+Unit tests for pairing the camera and radar frames
+"""
+
+
+class TestTimestampedBuffer(unittest.TestCase):
+
+    def test_nearest(self):
+        buffer = TimestampedBuffer(seconds=10)
+        for timestamp in [0.0, 0.05, 0.1, 0.15]:
+            buffer.put(f"radar {timestamp}", timestamp)
+        self.assertEqual(buffer.nearest(0.06), (0.05, "radar 0.05"))
+        self.assertEqual(buffer.nearest(0.09), (0.1, "radar 0.1"))
+        self.assertEqual(buffer.nearest(-1), (0.0, "radar 0.0"))
+        self.assertEqual(buffer.nearest(5), (0.15, "radar 0.15"))
+
+    def test_old_frames_dropped(self):
+        buffer = TimestampedBuffer(seconds=1)
+        for timestamp in range(5):
+            buffer.put(timestamp, timestamp)
+        self.assertEqual(buffer.timestamps, [3, 4])
+
+    def test_out_of_order(self):
+        buffer = TimestampedBuffer(seconds=10)
+        buffer.put('b', 2)
+        buffer.put('a', 1)
+        self.assertEqual(buffer.timestamps, [1, 2])
+        self.assertEqual(buffer.nearest(1.2), (1, 'a'))
+
+
+class TestFrameMatcher(unittest.TestCase):
+
+    def setUp(self):
+        self.radar = TimestampedBuffer(seconds=10)
+        for i in range(20):  # 20 frames per second
+            self.radar.put(i, i * 0.05)
+
+    def test_match(self):
+        matcher = FrameMatcher(self.radar, tolerance=0.1)
+        self.assertEqual(matcher.match(0.26), 5)
+        self.assertIsNone(matcher.match(2.0))
+        stats = matcher.stats()
+        self.assertEqual(stats['matched'], 0.5)
+        self.assertAlmostEqual(stats['max'], 0.01)
+
+    def test_offset(self):
+        matcher = FrameMatcher(self.radar, tolerance=0.01, offset=0.1)
+        self.assertEqual(matcher.match(0.25), 7)
+
+    def test_summary(self):
+        matcher = FrameMatcher(self.radar)
+        self.assertEqual(matcher.summary(), "radar/camera: no frames matched")
+        matcher.match(0.27)
+        self.assertEqual(matcher.summary(), "radar/camera skew: mean 20 ms, 95th 20 ms, max 20 ms, 100% matched")
+
+
+class TestStreamReader(unittest.TestCase):
+
+    def test_reads_into_buffer(self):
+        buffer = TimestampedBuffer()
+        frames = iter([1, None, 2, 3])
+        ticks = iter([0.1, 0.2, 0.3, 0.4])
+        reader = StreamReader(frames, buffer, clock=lambda: next(ticks))
+        reader.start()
+        reader.join(timeout=2)
+        self.assertEqual(buffer.timestamps, [0.1, 0.3, 0.4])
+        self.assertEqual(buffer.frames, [1, 2, 3])
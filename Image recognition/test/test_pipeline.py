@@ -0,0 +1,74 @@
+import itertools
+import time
+import unittest
+from visualisations.Pipeline import LatestQueue, Pipeline
+
+"""
+Unit tests for the staged image pipeline
+"""
+
+
+class TestLatestQueue(unittest.TestCase):
+
+    def test_drops_oldest(self):
+        queue = LatestQueue(2)
+        for item in range(5):
+            queue.put(item)
+        self.assertEqual(queue.dropped, 3)
+        self.assertEqual(queue.get(), 3)
+        self.assertEqual(queue.get(), 4)
+        self.assertIsNone(queue.get(timeout=0.01))
+
+    def test_close_wakes(self):
+        queue = LatestQueue()
+        queue.close()
+        self.assertIsNone(queue.get(timeout=5))
+
+
+class TestPipeline(unittest.TestCase):
+
+    def test_stages_in_order(self):
+        counter = itertools.count()
+
+        def source():
+            time.sleep(0.005)
+            return {'captured': time.monotonic(), 'value': next(counter)}
+
+        def double(item):
+            item['value'] *= 2
+            return item
+
+        def skip_odd(item):
+            return item if item['value'] % 4 == 0 else None
+
+        pipeline = Pipeline([('capture', source), ('double', double), ('filter', skip_odd)])
+        pipeline.start()
+        results = [pipeline.get(timeout=2) for _ in range(5)]
+        pipeline.stop()
+        values = [item['value'] for item in results]
+        self.assertTrue(all(value % 4 == 0 for value in values))
+        self.assertEqual(values, sorted(values))
+        stats = pipeline.stats()
+        self.assertEqual([name for name, _, _ in stats['stages']], ['capture', 'double', 'filter'])
+        self.assertGreater(stats['latency'], 0)
+        self.assertIn("fps", pipeline.summary())
+
+    def test_slow_stage_gets_recent_frames(self):
+        counter = itertools.count()
+
+        def source():
+            time.sleep(0.001)
+            return next(counter)
+
+        def slow(item):
+            time.sleep(0.02)
+            return item
+
+        pipeline = Pipeline([('capture', source), ('inference', slow)])
+        pipeline.start()
+        first = pipeline.get(timeout=2)
+        second = pipeline.get(timeout=2)
+        pipeline.stop()
+        # Frames captured while the slow stage was busy were dropped rather than queued
+        self.assertGreater(second - first, 2)
+        self.assertGreater(pipeline.stats()['stages'][1][2], 0)
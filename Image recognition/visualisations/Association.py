@@ -0,0 +1,96 @@
+import numpy as np
+
+try:
+    from scipy.optimize import linear_sum_assignment
+except ImportError:
+    linear_sum_assignment = None
+
+"""
+Pairs the objects detected in the camera image with the objects seen by the radar.
+
+Each radar object is projected to an x position in the image. A cost matrix of every detection against every radar
+object is then worked out in one go: the distance of the radar object from the centre of the detection's box, as a
+fraction of half the box's width, or infinite if it is outside the box. Each detection is given at most one radar
+object, either greedily (cheapest pairs first) or with the Hungarian algorithm (needs scipy), which gives the lowest
+total cost.
+"""
+
+CENTRE_OFFSET = 200  # Image x position straight ahead of the radar (pixels)
+
+
+def project_x(x_pos, y_pos, viewport, centre=CENTRE_OFFSET):
+    """
+    Project radar positions to x positions in the image.
+
+    :param x_pos: Array of the x positions of the radar objects
+    :param y_pos: Array of the y positions (distances from the radar) of the radar objects
+    :param viewport: Width of the image (pixels)
+    :param centre: Image x position straight ahead of the radar (pixels)
+    :return: Array of the x positions in the image. Infinite for objects at a y position of 0
+    :rtype: np.ndarray
+    """
+    x_pos = np.asarray(x_pos, dtype=float)
+    y_pos = np.abs(np.asarray(y_pos, dtype=float))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        projected = centre + np.round(x_pos * viewport / y_pos)
+    projected[~np.isfinite(projected)] = np.inf
+    return projected
+
+
+def cost_matrix(boxes, radar_x):
+    """
+    :param boxes: Array of the boxes of the detections, in the form [[<start x>, <start y>, <end x>, <end y>], ...]
+    :param radar_x: Array of the x positions of the radar objects in the image
+    :return: Array of the cost of pairing each detection (rows) with each radar object (columns). Infinite where the
+        radar object is outside the box
+    :rtype: np.ndarray
+    """
+    boxes = np.asarray(boxes, dtype=float).reshape(-1, 4)
+    radar_x = np.asarray(radar_x, dtype=float)
+    start = boxes[:, 0:1]
+    end = boxes[:, 2:3]
+    centre = (start + end) / 2
+    half_width = np.maximum((end - start) / 2, 0.5)
+    cost = np.abs(radar_x - centre) / half_width
+    cost[(radar_x < start) | (radar_x >= end)] = np.inf
+    return cost
+
+
+def associate(boxes, radar_x, hungarian=False):
+    """
+    Pair each detection with at most one radar object, and each radar object with at most one detection.
+
+    :param boxes: Array of the boxes of the detections, in the form [[<start x>, <start y>, <end x>, <end y>], ...]
+    :param radar_x: Array of the x positions of the radar objects in the image. Where the costs are equal, the earlier
+        radar object is chosen, so order them closest first
+    :param hungarian: Use the Hungarian algorithm for the lowest total cost, rather than taking the cheapest pairs first
+    :return: Array of the index of the radar object paired with each detection, or -1 if there isn't one
+    :rtype: np.ndarray
+    """
+    cost = cost_matrix(boxes, radar_x)
+    match = np.full(cost.shape[0], -1, dtype=int)
+    if cost.size == 0:
+        return match
+
+    if hungarian:
+        if linear_sum_assignment is None:
+            raise ImportError("Hungarian assignment needs scipy (pip install scipy)")
+        feasible = np.isfinite(cost)
+        rows, columns = linear_sum_assignment(np.where(feasible, cost, cost.shape[0] + cost.shape[1] + 1e6))
+        paired = feasible[rows, columns]
+        match[rows[paired]] = columns[paired]
+        return match
+
+    rows, columns = np.nonzero(np.isfinite(cost))
+    order = np.lexsort((columns, cost[rows, columns]))  # cheapest first, then the earliest radar object
+    row_used = np.zeros(cost.shape[0], dtype=bool)
+    column_used = np.zeros(cost.shape[1], dtype=bool)
+    remaining = min(cost.shape)
+    for row, column in zip(rows[order], columns[order]):
+        if not row_used[row] and not column_used[column]:
+            match[row] = column
+            row_used[row] = column_used[column] = True
+            remaining -= 1
+            if remaining == 0:
+                break
+    return match
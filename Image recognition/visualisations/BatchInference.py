@@ -0,0 +1,149 @@
+import threading
+import time
+import numpy as np
+
+"""
+Runs the neural network on frames from several cameras (or several frames) at once.
+
+Frames are submitted from any thread and collected into a batch, which is run through the network in one forward pass
+once it is full (MAX_BATCH frames) or the oldest frame has waited MAX_LATENCY seconds. The detections are then split up
+and returned to whoever submitted each frame. One pass on a batch is cheaper than a pass per frame, and only one copy of
+the network is needed however many cameras there are.
+
+A copy of Surveillance System/batch_inference.py, so each application stands alone. Keep the two in sync.
+"""
+
+MAX_BATCH = 4  # Number of frames run through the network at once
+MAX_LATENCY = 0.05  # Longest a frame waits for the rest of its batch (seconds)
+INFERENCE_TIMEOUT = 2  # Longest to wait for the detections of a frame before giving up on it (seconds)
+
+
+def split_detections(detections, batch_size):
+    """
+    Split the output of an SSD network run on a batch into the detections for each frame.
+
+    :param detections: Output of the network, in the form [1, 1, <detections>, 7] with each detection in the form
+        [<frame number in the batch>, <class>, <confidence>, <start x>, <start y>, <end x>, <end y>]
+    :param batch_size: Number of frames in the batch
+    :return: List of the detections of each frame, each in the form [1, 1, <detections>, 7] as for a single frame
+    :rtype: list
+    """
+    detections = np.asarray(detections).reshape(-1, 7)
+    frame = detections[:, 0].astype(int)
+    order = np.argsort(frame, kind='stable')
+    bounds = np.searchsorted(frame[order], np.arange(batch_size + 1))
+    return [detections[order[bounds[i]:bounds[i + 1]]][np.newaxis, np.newaxis] for i in range(batch_size)]
+
+
+class Request:
+    """
+    A frame waiting for its detections.
+    """
+
+    def __init__(self, frame, submitted):
+        self.frame = frame
+        self.submitted = submitted
+        self.result = None
+        self.error = None
+        self.done = threading.Event()
+
+    def wait(self, timeout=None):
+        """
+        :param timeout: Maximum time to wait (seconds)
+        :return: The detections of the frame, or None if they weren't ready in time
+        """
+        if not self.done.wait(timeout):
+            return None
+        if self.error is not None:
+            raise self.error
+        return self.result
+
+
+class InferenceServer(threading.Thread):
+    """
+    Collects frames into batches and runs them through the network in a background thread.
+    """
+
+    def __init__(self, forward, max_batch=MAX_BATCH, max_latency=MAX_LATENCY, clock=time.monotonic):
+        """
+        :param forward: Function taking a list of frames and returning a list of their results, eg. detections
+        :param max_batch: Number of frames run at once. Set it to the number of cameras so a batch is run as soon as
+            every camera has sent a frame
+        :param max_latency: Longest a frame waits for the rest of its batch (seconds)
+        :param clock: Function returning the current time in seconds
+        """
+        threading.Thread.__init__(self, daemon=True)
+        self.forward = forward
+        self.max_batch = max_batch
+        self.max_latency = max_latency
+        self.clock = clock
+        self.pending = []
+        self.condition = threading.Condition()
+        self.running = True
+        self.batches = 0
+        self.frames = 0
+
+    def submit(self, frame):
+        """
+        Add a frame to the next batch.
+
+        :return: Request to wait on for the detections
+        :rtype: Request
+        """
+        request = Request(frame, self.clock())
+        with self.condition:
+            self.pending.append(request)
+            self.condition.notify()
+        return request
+
+    def infer(self, frame, timeout=None):
+        """
+        Run a frame through the network as part of a batch, waiting for the detections.
+
+        :param timeout: Maximum time to wait (seconds)
+        :return: The detections of the frame, or None if they weren't ready in time
+        """
+        return self.submit(frame).wait(timeout)
+
+    def run(self):
+        while self.running:
+            batch = self.next_batch()
+            if len(batch) == 0:
+                continue
+            try:
+                results = self.forward([request.frame for request in batch])
+                for request, result in zip(batch, results):
+                    request.result = result
+            except Exception as error:
+                for request in batch:
+                    request.error = error
+            self.batches += 1
+            self.frames += len(batch)
+            for request in batch:
+                request.done.set()
+
+    def next_batch(self):
+        """
+        Wait until a batch is full or its oldest frame has waited max_latency, then take it.
+
+        :return: The requests in the batch, empty if stopped
+        :rtype: list
+        """
+        with self.condition:
+            self.condition.wait_for(lambda: len(self.pending) > 0 or not self.running, 0.5)
+            while self.running and 0 < len(self.pending) < self.max_batch:
+                remaining = self.pending[0].submitted + self.max_latency - self.clock()
+                if remaining <= 0:
+                    break
+                self.condition.wait(remaining)
+            batch = self.pending[:self.max_batch]
+            del self.pending[:self.max_batch]
+            return batch
+
+    def mean_batch_size(self):
+        return self.frames / self.batches if self.batches > 0 else None
+
+    def stop(self):
+        with self.condition:
+            self.running = False
+            self.condition.notify_all()
@@ -0,0 +1,161 @@
+import bisect
+import threading
+import time
+from collections import deque
+
+"""
+Pairs camera frames with radar frames by the time they were captured.
+
+Each sensor is read by its own thread into a TimestampedBuffer, so neither waits for the other. FrameMatcher then finds
+the radar frame captured nearest in time to a camera frame, as long as it is within a tolerance, and keeps statistics
+of how far apart the paired frames were.
+"""
+
+BUFFER_SECONDS = 2  # How long frames are kept for matching (seconds)
+TOLERANCE = 0.1  # Maximum time between a camera frame and the radar frame paired with it (seconds)
+SKEW_HISTORY = 500  # Number of recent pairings the skew statistics cover
+
+
+class TimestampedBuffer:
+    """
+    The frames from one sensor over the last few seconds, with the time each was captured. Thread safe.
+    """
+
+    def __init__(self, seconds=BUFFER_SECONDS, clock=time.monotonic):
+        """
+        :param seconds: How long frames are kept for
+        :param clock: Function returning the current time in seconds
+        """
+        self.seconds = seconds
+        self.clock = clock
+        self.timestamps = []  # In the order they were captured
+        self.frames = []
+        self.lock = threading.Lock()
+
+    def put(self, frame, timestamp=None):
+        """
+        Add a frame.
+
+        :param frame: The frame
+        :param timestamp: Time the frame was captured. Defaults to the clock
+        """
+        timestamp = self.clock() if timestamp is None else timestamp
+        with self.lock:
+            index = bisect.bisect_right(self.timestamps, timestamp)  # the end, unless frames arrive out of order
+            self.timestamps.insert(index, timestamp)
+            self.frames.insert(index, frame)
+            old = bisect.bisect_left(self.timestamps, self.timestamps[-1] - self.seconds)
+            if old > 0:
+                del self.timestamps[:old]
+                del self.frames[:old]
+
+    def nearest(self, timestamp):
+        """
+        :param timestamp: Time to look for
+        :return: The frame captured nearest to the time in the form (<timestamp>, <frame>), or None if there are none
+        :rtype: tuple
+        """
+        with self.lock:
+            if len(self.timestamps) == 0:
+                return None
+            index = bisect.bisect_left(self.timestamps, timestamp)
+            if index == len(self.timestamps) or \
+                    (index > 0 and timestamp - self.timestamps[index - 1] <= self.timestamps[index] - timestamp):
+                index -= 1
+            return self.timestamps[index], self.frames[index]
+
+    def __len__(self):
+        return len(self.timestamps)
+
+
+class FrameMatcher:
+    """
+    Pairs each camera frame with the nearest radar frame within a tolerance and keeps statistics of the skew.
+    """
+
+    def __init__(self, radar_buffer, tolerance=TOLERANCE, offset=0.0, history=SKEW_HISTORY):
+        """
+        :param radar_buffer: TimestampedBuffer of the radar frames
+        :param tolerance: Maximum time between a camera frame and the radar frame paired with it (seconds)
+        :param offset: Time the radar timestamps lag the camera timestamps by, eg. due to the radar's processing
+        :param history: Number of recent pairings the skew statistics cover
+        """
+        self.radar_buffer = radar_buffer
+        self.tolerance = tolerance
+        self.offset = offset
+        self.skews = deque(maxlen=history)  # Signed skew of each recent pairing (radar - camera), None if unmatched
+        self.matched = 0
+        self.unmatched = 0
+
+    def match(self, timestamp):
+        """
+        :param timestamp: Time the camera frame was captured
+        :return: The radar frame nearest the camera frame, or None if there isn't one within the tolerance
+        """
+        nearest = self.radar_buffer.nearest(timestamp + self.offset)
+        if nearest is not None and abs(nearest[0] - self.offset - timestamp) <= self.tolerance:
+            self.matched += 1
+            self.skews.append(nearest[0] - self.offset - timestamp)
+            return nearest[1]
+        self.unmatched += 1
+        self.skews.append(None)
+        return None
+
+    def stats(self):
+        """
+        :return: Statistics of the recent pairings in the form {'matched': <fraction matched>, 'mean': <mean absolute
+            skew>, 'p95': <95th percentile absolute skew>, 'max': <max absolute skew>} (skews in seconds, None if
+            nothing has been matched)
+        :rtype: dict
+        """
+        skews = sorted(abs(skew) for skew in self.skews if skew is not None)
+        stats = {'matched': len(skews) / len(self.skews) if len(self.skews) > 0 else None,
+                 'mean': None, 'p95': None, 'max': None}
+        if len(skews) > 0:
+            stats['mean'] = sum(skews) / len(skews)
+            stats['p95'] = skews[min(len(skews) - 1, int(0.95 * len(skews)))]
+            stats['max'] = skews[-1]
+        return stats
+
+    def summary(self):
+        """
+        :return: The skew statistics as text
+        :rtype: str
+        """
+        stats = self.stats()
+        if stats['mean'] is None:
+            return "radar/camera: no frames matched"
+        return f"radar/camera skew: mean {stats['mean'] * 1000:.0f} ms, 95th {stats['p95'] * 1000:.0f} ms, " \
+               f"max {stats['max'] * 1000:.0f} ms, {stats['matched'] * 100:.0f}% matched"
+
+
+class StreamReader(threading.Thread):
+    """
+    Reads a sensor into a TimestampedBuffer in the background.
+    """
+
+    def __init__(self, frames, buffer, clock=time.monotonic):
+        """
+        :param frames: Iterable of frames, eg. the radar's data generator. None frames are skipped
+        :param buffer: TimestampedBuffer to add the frames to
+        :param clock: Function returning the current time in seconds, the same as the buffer's
+        """
+        threading.Thread.__init__(self, daemon=True)
+        self.frames = frames
+        self.buffer = buffer
+        self.clock = clock
+        self.running = True
+
+    def run(self):
+        try:
+            for frame in self.frames:
+                timestamp = self.clock()  # as soon as the frame arrives
+                if not self.running:
+                    break
+                if frame is not None:
+                    self.buffer.put(frame, timestamp)
+        except Exception as error:
+            print(error)
+
+    def stop(self):
+        self.running = False
@@ -4,17 +4,33 @@ import cv2
 import time
 import imutils
 import numpy as np
-from imutils.video import VideoStream
 from visualisations.VisualisationBase import VisualisationBase
+from visualisations.FrameSync import TimestampedBuffer, FrameMatcher, StreamReader
+from visualisations.Pipeline import Pipeline
+from visualisations.BatchInference import InferenceServer, split_detections, INFERENCE_TIMEOUT
+from visualisations.Association import associate, project_x
 
 np.set_printoptions(suppress=True)
 
+TOLERANCE = 0.1  # Maximum time between a camera frame and the radar frame paired with it (seconds)
+RADAR_OFFSET = 0.0  # Time the radar frames lag the camera frames by, to calibrate the pairing (seconds)
+HUNGARIAN = False  # Pair the detections and radar objects with the Hungarian algorithm (needs scipy)
+STATS_INTERVAL = 10  # How often to print the radar/camera skew and the pipeline timings (seconds)
+
 
 class ModImageDetectionDepth(VisualisationBase):
-    def __init__(self, data_getter, device):
+    def __init__(self, data_getter, device, source=0, server=None):
+        """
+        :param data_getter: Function returning a generator of radar frames
+        :param device: The RadarIQ module, or None if it is already started
+        :param source: Camera number, or the path of a video file to use instead of a camera
+        :param server: InferenceServer shared with the visualisations of other cameras, so their frames are run through
+            the network together in batches. By default each has its own
+        """
         VisualisationBase.__init__(self, data_getter)
         # Image Recon Var
-        self.cam_id = 0
+        self.cam_id = source
+        self.camera_ended = False
         self.cam = None
         self.im1 = None
         self.PROTOTXT = None
@@ -23,102 +39,160 @@ class ModImageDetectionDepth(VisualisationBase):
         self.CLASSES = None
         self.COLORS = None
         self.net = None
-        self.vs = None
         self.count = 0
         self.frame = None
-        self.go = self.running
         self.viewport = 600
 
+        # The radar is read into a buffer by its own thread, and each camera frame is paired with the radar frame
+        # captured nearest to it, so neither sensor waits for the other
+        self.radar_buffer = TimestampedBuffer()
+        self.matcher = FrameMatcher(self.radar_buffer, TOLERANCE, RADAR_OFFSET)
+        self.radar_reader = None
+        # Capture, preprocess, inference and drawing each run in their own thread (see Pipeline.py)
+        self.pipeline = None
+        self.server = server
+        self.own_server = server is None  # a shared server is stopped by whoever made it
+
         # Start Image Recognition System
         self.start_image_recon()
         self.device = device
-        print("[INFO] starting RadarIQ...")
-        self.device.start()
+        if self.device is not None:
+            print("[INFO] starting RadarIQ...")
+            self.device.start()
 
     def show(self):
         """
         Loop for matching then displaying image detections and radar objects
         """
         print("[INFO] starting generator...")
-        frame_generator = self.fetch_data()
-        while self.go:
-            # Capture radar frame
-            frame = next(frame_generator)
-            radar_frame = None
-
-            # If a frame is available create a new frame with adjusted x_pos indexing
-            if frame:
-                radar_frame = self.adjust_x_pos(frame)
-
-            # Capture image frame
-            img_frame = self.vs.read()
-
-            # Resize it to display width
-            # TODO make the width a global variable
-            img_frame = imutils.resize(img_frame, width=self.viewport)
-
-            # Grab the frame dimensions and convert it to a blob
-            (h, w) = img_frame.shape[:2]
-            blob = cv2.dnn.blobFromImage(cv2.resize(img_frame, (300, 300)),
-                                         0.007843, (300, 300), 127.5)
-
-            # Pass the blob through the self.network and obtain the detections and
-            # predictions
-            self.net.setInput(blob)
-            detections = self.net.forward()
-
-            # Transform np.array to a list, removes unused dimensions
-            objects = detections[0,0].tolist()
-
-            # Filter and organize detections that do not match person class in order of largest to smallest
-            # TODO Make the filter class a global variable and pass it to this function
-            objects = self.process_detections(objects)
-
-            # Loop over the detections
-            for i in range(len(objects)):
-
-                # Determine the confidence level of the detected object
-                confidence = objects[i][2]
-
-                # Filter out weak detections and person objects by ensuring the `confidence` is
-                if confidence > self.CONFIDENCE:
-
-                    # Compute the (x, y)-coordinates of
-                    # the bounding box for the object
-                    box = objects[i][3:7] * np.array([w, h, w, h])
-                    (startX, startY, endX, endY) = box.astype("int")
-
-                    # Set local variable for handling object depth
-                    depth = "N/A"
-                    rad_obj = None
-
-                    # Check if an object return from radar matches this detection
-                    if radar_frame:
-                        for obj in radar_frame:
-                            if obj[0] in range(startX, endX):
-                                depth = obj[1]["y_pos"]
-                                rad_obj = obj
-
-                    # Remove if a radar object has been assigned this detected object.
-                    if rad_obj:
-                        radar_frame.remove(rad_obj)
-
-                    # Draw the prediction on the frame
-                    label = "depth: {}".format(depth)
-                    cv2.rectangle(img_frame, (startX, startY), (endX, endY),
-                                  (255, 0, 0), 2)
-                    y = startY - 15 if startY - 15 > 15 else startY + 15
-                    cv2.putText(img_frame, label, (startX, y),
-                                cv2.FONT_HERSHEY_SIMPLEX, 0.5, (255, 0, 0), 2)
+        self.radar_reader = StreamReader(self.fetch_data(), self.radar_buffer)
+        self.radar_reader.start()
+        self.pipeline = self.make_pipeline()
+        self.pipeline.start()
+
+        next_stats = time.monotonic() + STATS_INTERVAL
+        while self.running:
+            item = self.pipeline.get(timeout=0.5)
+            if item is None:
+                if self.camera_ended:  # and the last frames have been shown
+                    print("[INFO] end of video")
+                    cv2.destroyAllWindows()
+                    break
+                continue
 
             # Display the result in its own window
-            cv2.imshow("Press Esc To Exit", img_frame)
-            key = cv2.waitKey(100)
+            cv2.imshow("Press Esc To Exit", item['image'])
+            if time.monotonic() > next_stats:
+                print(f"[INFO] {self.matcher.summary()}")
+                print(f"[INFO] {self.pipeline.summary()}")
+                next_stats += STATS_INTERVAL
+            key = cv2.waitKey(1)
             if key == 27:
                 print("ESC")
                 cv2.destroyAllWindows()
                 break
+        self.pipeline.stop()
+        if self.own_server:
+            self.server.stop()
+        self.radar_reader.stop()
+
+    def make_pipeline(self):
+        """
+        :return: Pipeline capturing, preprocessing, detecting and drawing frames, each in its own thread
+        :rtype: Pipeline
+        """
+        return Pipeline([('capture', self.capture), ('preprocess', self.preprocess), ('inference', self.infer),
+                         ('draw', self.draw)])
+
+    def capture(self):
+        """
+        Read the next frame from the camera, waiting for it to be captured.
+
+        :return: The frame in the form {'captured': <time>, 'image': <image>}, or None if the camera didn't give one
+        """
+        ok, img_frame = self.cam.read()
+        captured = time.monotonic()
+        if not ok:
+            self.camera_ended = isinstance(self.cam_id, str)  # the end of a video file
             time.sleep(0.01)
+            return None
+        return {'captured': captured, 'image': img_frame}
+
+    def preprocess(self, item):
+        """
+        Resize the frame to the display width and convert it to a blob for the network.
+        """
+        # Resize it to display width
+        # TODO make the width a global variable
+        item['image'] = imutils.resize(item['image'], width=self.viewport)
+
+        # Resize it to the network's input size
+        item['input'] = cv2.resize(item['image'], (300, 300))
+        return item
+
+    def infer(self, item):
+        """
+        Pass the frame through the network, in a batch with the frames from any other cameras, to obtain the detections
+        and predictions.
+
+        :return: The item with the detections added, or None to drop the frame if they weren't ready within
+            INFERENCE_TIMEOUT
+        """
+        detections = self.server.infer(item.pop('input'), INFERENCE_TIMEOUT)
+        if detections is None:
+            print(f"[WARNING] no detections within {INFERENCE_TIMEOUT} s, dropping the frame")
+            return None
+
+        # Transform np.array to a list, removes unused dimensions
+        objects = detections[0,0].tolist()
+
+        # Filter and organize detections that do not match person class in order of largest to smallest
+        # TODO Make the filter class a global variable and pass it to this function
+        item['objects'] = self.process_detections(objects)
+        return item
+
+    def forward_batch(self, frames):
+        """
+        Pass a batch of 300x300 frames through the network in one go.
+
+        :return: List of the detections of each frame
+        :rtype: list
+        """
+        blob = cv2.dnn.blobFromImages(frames, 0.007843, (300, 300), 127.5)
+        self.net.setInput(blob)
+        return split_detections(self.net.forward(), len(frames))
+
+    def draw(self, item):
+        """
+        Pair the detections with the radar objects and draw them on the frame.
+        """
+        img_frame = item['image']
+        objects = item['objects']
+        (h, w) = img_frame.shape[:2]
+
+        # Pair with the radar frame captured nearest to the camera frame. Done after the inference, so a radar frame
+        # captured just after the camera frame has had time to arrive
+        frame = self.matcher.match(item['captured'])
+        radar_x, radar_objects = self.adjust_x_pos(frame if frame else [])
+
+        # Compute the (x, y)-coordinates of the bounding boxes of the detections which are confident enough
+        objects = np.asarray(objects, dtype=float).reshape(-1, 7)
+        boxes = (objects[objects[:, 2] > self.CONFIDENCE, 3:7] * np.array([w, h, w, h])).astype("int")
+
+        # Pair each detection with the radar object nearest the middle of its box
+        match = associate(boxes, radar_x, HUNGARIAN)
+
+        for (startX, startY, endX, endY), radar_index in zip(boxes, match):
+            depth = "N/A" if radar_index < 0 else radar_objects[radar_index]["y_pos"]
+
+            # Draw the prediction on the frame
+            label = "depth: {}".format(depth)
+            cv2.rectangle(img_frame, (startX, startY), (endX, endY),
+                          (255, 0, 0), 2)
+            y = startY - 15 if startY - 15 > 15 else startY + 15
+            cv2.putText(img_frame, label, (startX, y),
+                        cv2.FONT_HERSHEY_SIMPLEX, 0.5, (255, 0, 0), 2)
+        return item
 
     def start_image_recon(self):
         """
@@ -139,35 +213,26 @@ class ModImageDetectionDepth(VisualisationBase):
 
         print("[INFO] loading model...")
         self.net = cv2.dnn.readNetFromCaffe(self.PROTOTXT, self.MODEL)
+        if self.server is None:
+            self.server = InferenceServer(self.forward_batch, max_batch=1)
+            self.server.start()
         print("[INFO] starting video stream...")
-        self.vs = VideoStream(src=0).start()
         self.cam = cv2.VideoCapture(self.cam_id)
 
     def adjust_x_pos(self, objects):
         """
-        Takes a list of radar objects, calculates an adjusted x_pos based on ratio for each element,
-        creates list of tuples with the adjusted x_pos, and original object,
-        sorts the list of tuples from closes to farthest.
-        """
-        adj_x_list = []
-        final_list = []
-        for OBJECT in objects:
-            original_x = OBJECT["x_pos"]
-            y = abs(OBJECT["y_pos"])
+        Takes a list of radar objects, calculates an adjusted x_pos (the x position in the image) based on ratio for
+        each of them, and sorts them from closest to farthest.
 
-            #  Scales x to be out of 400
-            ratio = (y / self.viewport)
-            new_x = original_x / ratio
-
-            #  Adjust for center point variation
-            new_x = 200 + round(new_x, 0)
-
-            #  Add object to list indexed by adjusted x
-            adj_x_list.append((new_x, OBJECT))
+        :return: Array of the adjusted x_pos of each object and the list of objects, both closest first
+        :rtype: tuple
+        """
+        #  Order the objects so that the closest is first
+        objects = sorted(objects, key=lambda obj: abs(obj["y_pos"]))
 
-            #  Order the list so that the closest is first
-            final_list = sorted(adj_x_list, key=lambda x: abs(x[1]["y_pos"]))
-        return final_list
+        #  Scales x to the viewport and adjusts for center point variation
+        radar_x = project_x([obj["x_pos"] for obj in objects], [obj["y_pos"] for obj in objects], self.viewport)
+        return radar_x, objects
 
     def process_detections(self, obj_list):
         """
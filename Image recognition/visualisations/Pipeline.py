@@ -0,0 +1,191 @@
+import threading
+import time
+from collections import deque
+
+"""
+Runs the steps of processing a frame (eg. capture, preprocess, inference, draw) at the same time on different frames.
+
+Each stage runs in its own thread and passes its results to the next through a LatestQueue. When a stage falls behind,
+the queue drops the oldest waiting frames rather than letting them pile up, so the frames being worked on are always
+recent and the slowest stage sets the frame rate. OpenCV releases the GIL while it works, so the stages really do run at
+the same time. The time each stage takes is recorded to show where the time goes.
+"""
+
+QUEUE_SIZE = 1  # Number of frames which can wait between stages before the oldest is dropped
+TIMING_HISTORY = 100  # Number of recent frames the timings cover
+
+
+class LatestQueue:
+    """
+    Bounded queue which drops the oldest item when full, so a slow consumer always gets recent items.
+    """
+
+    def __init__(self, maxsize=QUEUE_SIZE):
+        self.maxsize = maxsize
+        self.items = deque()
+        self.dropped = 0
+        self.closed = False
+        self.condition = threading.Condition()
+
+    def put(self, item):
+        with self.condition:
+            if len(self.items) >= self.maxsize:
+                self.items.popleft()
+                self.dropped += 1
+            self.items.append(item)
+            self.condition.notify()
+
+    def get(self, timeout=None):
+        """
+        :param timeout: Maximum time to wait for an item (seconds)
+        :return: The oldest item, or None if there wasn't one in time or the queue was closed
+        """
+        with self.condition:
+            self.condition.wait_for(lambda: len(self.items) > 0 or self.closed, timeout)
+            if len(self.items) == 0:
+                return None
+            return self.items.popleft()
+
+    def close(self):
+        """
+        Wake anything waiting for an item.
+        """
+        with self.condition:
+            self.closed = True
+            self.condition.notify_all()
+
+    def __len__(self):
+        return len(self.items)
+
+
+class Stage(threading.Thread):
+    """
+    One step of the pipeline, run in its own thread.
+    """
+
+    def __init__(self, name, function, inbox, outbox):
+        """
+        :param name: Name shown in the timings
+        :param function: Function taking an item from the inbox and returning the item to pass on, or None to pass
+            nothing on. Called without arguments if there is no inbox (the first stage)
+        :param inbox: LatestQueue to take items from, or None for the first stage
+        :param outbox: LatestQueue to pass items to
+        """
+        threading.Thread.__init__(self, daemon=True)
+        self.name = name
+        self.function = function
+        self.inbox = inbox
+        self.outbox = outbox
+        self.times = deque(maxlen=TIMING_HISTORY)
+        self.running = True
+
+    def run(self):
+        while self.running:
+            if self.inbox is None:
+                item = ()
+            else:
+                item = self.inbox.get(timeout=0.5)
+                if item is None:
+                    continue
+                item = (item,)
+            start = time.perf_counter()
+            try:
+                result = self.function(*item)
+            except Exception as error:
+                print(f"[ERROR] {self.name}: {error}")
+                continue
+            self.times.append(time.perf_counter() - start)
+            if result is not None:
+                self.outbox.put(result)
+
+    def mean_time(self):
+        """
+        :return: Mean time the stage took over the recent frames (seconds), or None if it hasn't run
+        :rtype: float
+        """
+        times = list(self.times)
+        return sum(times) / len(times) if len(times) > 0 else None
+
+    def stop(self):
+        self.running = False
+        if self.inbox is not None:
+            self.inbox.close()
+
+
+class Pipeline:
+    """
+    Stages connected by LatestQueues. The results of the last stage are taken with get().
+    """
+
+    def __init__(self, stages, queue_size=QUEUE_SIZE, clock=time.monotonic):
+        """
+        :param stages: List of the stages in the form [(<name>, <function>), ...]. The first function is called
+            without arguments and returns a new item (eg. a dict with the time it was captured under 'captured')
+        :param queue_size: Number of items which can wait between stages before the oldest is dropped
+        :param clock: Function returning the current time in seconds, the same as used for 'captured'
+        """
+        self.clock = clock
+        self.queues = [LatestQueue(queue_size) for _ in stages]
+        self.stages = [Stage(name, function, self.queues[i - 1] if i > 0 else None, self.queues[i])
+                       for i, (name, function) in enumerate(stages)]
+        self.latencies = deque(maxlen=TIMING_HISTORY)  # Time from capture to output of recent items
+        self.finished = deque(maxlen=TIMING_HISTORY)  # Time recent items were output
+
+    def start(self):
+        for stage in self.stages:
+            stage.start()
+
+    def get(self, timeout=None):
+        """
+        :param timeout: Maximum time to wait (seconds)
+        :return: The next result of the last stage, or None if there wasn't one in time
+        """
+        item = self.queues[-1].get(timeout)
+        if item is not None:
+            now = self.clock()
+            self.finished.append(now)
+            if isinstance(item, dict) and 'captured' in item:
+                self.latencies.append(now - item['captured'])
+        return item
+
+    def fps(self):
+        """
+        :return: Rate results have been output at recently (per second), or None if too few have been output
+        :rtype: float
+        """
+        if len(self.finished) < 2 or self.finished[-1] == self.finished[0]:
+            return None
+        return (len(self.finished) - 1) / (self.finished[-1] - self.finished[0])
+
+    def stats(self):
+        """
+        :return: Statistics in the form {'fps': <results per second>, 'latency': <mean capture to output time>,
+            'stages': [(<name>, <mean time>, <frames dropped before the stage>), ...]} (times in seconds)
+        :rtype: dict
+        """
+        latencies = list(self.latencies)
+        return {'fps': self.fps(),
+                'latency': sum(latencies) / len(latencies) if len(latencies) > 0 else None,
+                'stages': [(stage.name, stage.mean_time(), 0 if stage.inbox is None else stage.inbox.dropped)
+                           for stage in self.stages]}
+
+    def summary(self):
+        """
+        :return: The statistics as text
+        :rtype: str
+        """
+        stats = self.stats()
+        parts = []
+        for name, mean_time, dropped in stats['stages']:
+            part = f"{name} {'-' if mean_time is None else f'{mean_time * 1000:.0f}'} ms"
+            parts.append(part + (f" ({dropped} dropped)" if dropped > 0 else ""))
+        fps = '-' if stats['fps'] is None else f"{stats['fps']:.1f}"
+        latency = '-' if stats['latency'] is None else f"{stats['latency'] * 1000:.0f}"
+        return f"{fps} fps, latency {latency} ms: " + ", ".join(parts)
+
+    def stop(self):
+        for stage in self.stages:
+            stage.stop()
+        self.queues[-1].close()
+        for stage in self.stages:
+            stage.join(timeout=1)
@@ -2,8 +2,9 @@ import os
 import logging
 from time import time
 
-from radariq.RadarIQ import RadarIQ, MODE_POINT_CLOUD, OUTPUT_LIST
-from radariq import port_manager as pm
+from radariq.RadarIQ import MODE_POINT_CLOUD, OUTPUT_LIST
+from port_discovery import connect
+from targets import calculate_targets
 
 try:
     import Tkinter as tk
@@ -42,6 +43,7 @@ min_height.set("-5000")
 max_height = tk.StringVar()  # Maximum height to search
 max_height.set("5000")
 com_port = tk.StringVar(None)  # COM PORT device is connected
+multi_target = tk.BooleanVar()  # Measure every object in range rather than only the strongest
 connected = False  # Connection Status of Device
 riq = None
 cap_data = 0
@@ -55,15 +57,14 @@ logger.setLevel(logging.INFO)
 
 def auto_detect():
     """
-    Uses the port_manager app to detect the COM port of any connected RadarIQ devices.
+    Detects the COM port of a connected RadarIQ device, trying the last used port first.
     """
     global riq, connected, com_port
     try:
-        com_ports = pm.find_com_ports()
-        connection_port = str(com_ports[0])[:4]
-        riq = RadarIQ(connection_port, output_format=OUTPUT_LIST)
+        riq, connection_port = connect(output_format=OUTPUT_LIST)
         connected = True
         com_port.set(connection_port)
+        return True
 
     except Exception as error:
         py_ver_message("Connection Error", str(error), False)
@@ -118,7 +119,7 @@ def connect_riq():
     try:
 
         if com_port.get() != "":
-            riq = RadarIQ(com_port.get())
+            riq, _ = connect(com_port.get())
             connected = True
             return True
 
@@ -135,7 +136,20 @@ def display_distance(average):
     Updates the display of distance
     """
     round_average = round(average)
-    l_display_distance.configure(text="{} mm".format(round_average))
+    l_display_distance.configure(text="{} mm".format(round_average), font="none 40 bold")
+    l_display_distance.update()
+
+
+def display_targets(targets):
+    """
+    Updates the display with the distance to each target
+    """
+    if len(targets) == 0:
+        text = "N/A"
+    else:
+        text = "\n".join("{} mm \u00b1{}".format(round(target['distance']), round(target['spread']))
+                         for target in targets[:3])
+    l_display_distance.configure(text=text, font="none {} bold".format(40 if len(targets) <= 1 else 16))
     l_display_distance.update()
 
 
@@ -145,8 +159,11 @@ def measure():
         connect_riq()
     if connected:
         data = capture()
-        distance = calculate_distance(data)
-        display_distance(distance)
+        if multi_target.get():
+            display_targets(calculate_targets(data))
+        else:
+            distance = calculate_distance(data)
+            display_distance(distance)
 
 
 def py_ver_message(title, message, ask):
@@ -401,6 +418,15 @@ l_display_distance.configure(highlightcolor="black")
 l_display_distance.configure(text='''N/A''')
 l_display_distance.configure(font="none 40 bold")
 
+c_multi_target = tk.Checkbutton(measurement_frame)
+c_multi_target.place(relx=0.5, rely=0.92, anchor=tk.CENTER)
+c_multi_target.configure(activebackground="#ffffff")
+c_multi_target.configure(background="#ffffff")
+c_multi_target.configure(highlightbackground="#ffffff")
+c_multi_target.configure(text='''Multiple targets''')
+c_multi_target.configure(variable=multi_target)
+ToolTip(c_multi_target, "TkDefaultFont", '''Report the distance to every object in range''', delay=0.5)
+
 # Settings Area
 l_f_settings = tk.LabelFrame(window)
 l_f_settings.place(relx=0.05, rely=0.50, relheight=0.29,
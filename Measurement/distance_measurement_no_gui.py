@@ -1,9 +1,11 @@
 import os
+import argparse
 import logging
 from time import time
 
-from radariq.RadarIQ import RadarIQ, MODE_POINT_CLOUD, OUTPUT_LIST
-from radariq import port_manager as pm
+from radariq.RadarIQ import MODE_POINT_CLOUD, OUTPUT_LIST
+from port_discovery import connect
+from targets import calculate_targets
 
 connected = False  # Connection Status of Device
 riq = None
@@ -61,7 +63,7 @@ def connect_riq():
     """
     global riq
     try:
-        riq = RadarIQ()
+        riq, _ = connect(output_format=OUTPUT_LIST)
         return True
 
     except Exception as error:
@@ -73,21 +75,48 @@ def display_distance(average):
     print(f"Average Distance: {average}")
 
 
-def measure():
+def display_targets(targets):
+    """
+    Prints the distance to each target found
+    """
+    if len(targets) == 0:
+        print("No targets found")
+    for i, target in enumerate(targets, 1):
+        print(f"Target {i}: {target['distance']:.0f} mm (spread {target['spread']:.0f} mm, "
+              f"seen in {target['frames']} frames)")
+
+
+def measure(multi_target=False):
     global riq
     connect_riq()
     data = capture()
-    distance = calculate_distance(data)
-    display_distance(distance)
+    if multi_target:
+        display_targets(calculate_targets(data))
+    else:
+        distance = calculate_distance(data)
+        display_distance(distance)
     riq.close()
 
 
+def argparser():
+    """
+    Parse the commandline into a set of arguments.
+
+    :return: Args
+    """
+    parser = argparse.ArgumentParser(description='RadarIQ Approximate Distance Measurement.')
+    parser.add_argument('--multi-target', action='store_true',
+                        help='Measure the distance to every object in range rather than only the strongest one.')
+    return parser.parse_args()
+
+
 if __name__ == '__main__':
+    args = argparser()
     print("Please note, this is an approximate distance only. The point cloud mode of radar is not specifically designed for accurate distance measurement.")
     print("Please review the distance products at https://radariq.io for models which are designed for distance measurement.")
     print("Measurement error may be as high as 40mm in this mode.")
     print("")
     print('Taking 100 samples over 5 seconds...')
     print('')
-    measure()
+    measure(args.multi_target)
 
@@ -0,0 +1,145 @@
+import os
+import logging
+from concurrent.futures import ThreadPoolExecutor, as_completed, TimeoutError
+
+from serial import Serial, SerialException
+from serial.tools import list_ports
+from radariq.RadarIQ import RadarIQ
+from radariq.port_manager import USB_VID, USB_PID
+
+"""
+Finds the port a RadarIQ module is connected to.
+
+The last port that was successfully connected to is remembered on disk and tried first, so in the common case of the
+module staying plugged into the same port no enumeration is needed. Otherwise every candidate port is probed in
+parallel rather than one after another.
+"""
+
+CACHE_FILE = os.path.join(os.path.expanduser('~'), '.radariq_port')
+PROBE_TIMEOUT = 1  # seconds
+
+logger = logging.getLogger('RadarIQ')
+
+
+def connect(port=None, **kwargs):
+    """
+    Connect to a RadarIQ module, finding the port if one is not given.
+
+    If the remembered port no longer belongs to a RadarIQ module it is forgotten and the ports are searched again.
+
+    :param port: The port name or None to detect it
+    :param kwargs: Additional arguments for RadarIQ()
+    :return: The RadarIQ object and the port it is connected to
+    :rtype: tuple
+    """
+    if port is not None:
+        riq = RadarIQ(port, **kwargs)
+    else:
+        port = find_port()
+        try:
+            riq = RadarIQ(port, **kwargs)
+        except Exception:
+            clear_cached_port()
+            port = find_port(use_cache=False)
+            riq = RadarIQ(port, **kwargs)
+
+    save_port(port)
+    return riq, port
+
+
+def find_port(timeout=PROBE_TIMEOUT, use_cache=True):
+    """
+    Find the port of an available RadarIQ module.
+
+    :param timeout: Maximum time to wait for the candidate ports to respond (seconds)
+    :param use_cache: Try the last known port before searching
+    :return: The port name (eg. COM3 or /dev/ttyACM0)
+    :rtype: str
+    """
+    if use_cache:
+        port = load_cached_port()
+        if port is not None and probe(port, timeout):
+            return port
+
+    candidates = [port.device for port in list_ports.comports() if port.vid == USB_VID and port.pid == USB_PID]
+    port = probe_all(candidates, timeout)
+    if port is None:
+        raise Exception("No available RadarIQ modules detected")
+    return port
+
+
+def probe(port, timeout=PROBE_TIMEOUT):
+    """
+    Check that a port can be opened (exists and is not in use).
+
+    :param port: The port name
+    :param timeout: Serial timeout (seconds)
+    :rtype: bool
+    """
+    try:
+        connection = Serial(port=port, baudrate=115200, timeout=timeout, write_timeout=timeout)
+        connection.close()
+        return True
+    except (SerialException, OSError, ValueError):
+        return False
+
+
+def probe_all(ports, timeout=PROBE_TIMEOUT):
+    """
+    Probe several ports at once and return the first one which is available.
+
+    :param ports: List of port names
+    :param timeout: Maximum time to wait for a port to respond (seconds)
+    :return: The port name or None if none are available
+    """
+    if len(ports) == 0:
+        return None
+
+    executor = ThreadPoolExecutor(max_workers=len(ports))
+    futures = {executor.submit(probe, port, timeout): port for port in ports}
+    try:
+        for future in as_completed(futures, timeout=timeout):
+            if future.result():
+                return futures[future]
+    except TimeoutError:
+        logger.info("Timed out probing ports")
+    finally:
+        executor.shutdown(wait=False)
+    return None
+
+
+def load_cached_port():
+    """
+    Load the last successfully used port.
+
+    :return: The port name or None
+    """
+    try:
+        with open(CACHE_FILE) as f:
+            port = f.read().strip()
+            return port if port != '' else None
+    except OSError:
+        return None
+
+
+def save_port(port):
+    """
+    Remember a port which was successfully connected to.
+
+    :param port: The port name
+    """
+    try:
+        with open(CACHE_FILE, 'w') as f:
+            f.write(str(port))
+    except OSError as error:
+        logger.info("Unable to save port: {}".format(error))
+
+
+def clear_cached_port():
+    """
+    Forget the last used port (eg. when connecting to it fails).
+    """
+    try:
+        os.remove(CACHE_FILE)
+    except OSError:
+        pass
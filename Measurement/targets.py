@@ -0,0 +1,130 @@
+import numpy as np
+
+"""
+Multi-target distance measurement.
+
+Each frame's points are clustered by range (Y) and the clusters are tracked across frames so that several objects at
+different distances can be measured at the same time.
+"""
+
+CLUSTER_GAP = 150  # Points further apart than this in Y start a new cluster (mm)
+MIN_CLUSTER_POINTS = 2  # Clusters with fewer points are treated as noise
+TRACK_GATE = 200  # Maximum distance a cluster may move between frames and still belong to the same target (mm)
+MIN_FRAMES = 0.2  # Fraction of frames a target must be seen in to be reported
+
+
+def cluster_frame(frame, gap=CLUSTER_GAP, min_points=MIN_CLUSTER_POINTS):
+    """
+    Cluster the points in a frame by their distance from the sensor.
+
+    Points are sorted by Y and split wherever consecutive points are more than `gap` apart. This is equivalent to a
+    one dimensional DBSCAN but runs in a handful of vectorized operations.
+
+    :param frame: Points in the form [[x, y, z, intensity, velocity], ...]
+    :type frame: list or ndarray
+    :param gap: Gap between points which separates two clusters
+    :param min_points: Minimum number of points in a cluster
+    :return: Array of clusters in the form [[distance, spread, points], ...] sorted by distance
+    :rtype: ndarray
+    """
+    points = np.asarray(frame, dtype=float)
+    if points.ndim != 2 or len(points) == 0:
+        return np.empty((0, 3))
+
+    points = points[np.argsort(points[:, 1])]
+    ys = points[:, 1]
+    weights = np.maximum(points[:, 3], 1e-6)  # intensity
+
+    # Label each point with the index of the cluster it belongs to
+    labels = np.concatenate(([0], np.cumsum(np.diff(ys) > gap)))
+    n_clusters = labels[-1] + 1
+
+    sizes = np.bincount(labels, minlength=n_clusters)
+    total_weight = np.bincount(labels, weights=weights, minlength=n_clusters)
+    distance = np.bincount(labels, weights=weights * ys, minlength=n_clusters) / total_weight
+    variance = np.bincount(labels, weights=weights * (ys - distance[labels]) ** 2, minlength=n_clusters) / total_weight
+
+    clusters = np.column_stack((distance, np.sqrt(variance), sizes))
+    return clusters[sizes >= min_points]
+
+
+class TargetTracker:
+    """
+    Tracks the distance to several targets across frames.
+
+    Clusters from each frame are matched to the nearest existing target within `gate`. The running mean and spread
+    of each target is kept using Welford's algorithm so no per-frame history is stored.
+    """
+
+    def __init__(self, gate=TRACK_GATE):
+        self.gate = gate
+        self.frames = 0
+        # Columns: last distance, mean, M2 (sum of squared differences), frames seen
+        self.targets = np.empty((0, 4))
+
+    def update(self, clusters):
+        """
+        Update the targets with the clusters from one frame.
+
+        :param clusters: Clusters as returned by cluster_frame()
+        """
+        self.frames += 1
+        distances = clusters[:, 0].astype(float) if len(clusters) else np.empty(0)
+        matched = np.zeros(len(self.targets), dtype=bool)
+        new_targets = []
+
+        if len(self.targets) and len(distances):
+            cost = np.abs(distances[:, None] - self.targets[None, :, 0])
+            # Assign greedily in order of increasing cost
+            for flat in np.argsort(cost, axis=None):
+                c, t = np.unravel_index(flat, cost.shape)
+                if cost[c, t] > self.gate:
+                    break
+                if matched[t] or np.isnan(distances[c]):
+                    continue
+                self._add_sample(t, distances[c])
+                matched[t] = True
+                distances[c] = np.nan
+
+        for distance in distances[~np.isnan(distances)]:
+            new_targets.append([distance, distance, 0.0, 1])
+
+        if new_targets:
+            self.targets = np.vstack((self.targets, new_targets))
+
+    def _add_sample(self, index, distance):
+        target = self.targets[index]
+        target[3] += 1
+        delta = distance - target[1]
+        target[1] += delta / target[3]
+        target[2] += delta * (distance - target[1])
+        target[0] = distance
+
+    def results(self, min_frames=MIN_FRAMES):
+        """
+        Get the measured targets.
+
+        :param min_frames: Fraction of frames a target must have been seen in to be reported
+        :return: List of targets in the form [{'distance': .., 'spread': .., 'frames': ..}, ...] sorted by distance
+        :rtype: list
+        """
+        results = []
+        for _, mean, m2, seen in self.targets[np.argsort(self.targets[:, 1])]:
+            if seen < max(1, min_frames * self.frames):
+                continue
+            spread = np.sqrt(m2 / (seen - 1)) if seen > 1 else 0.0
+            results.append({'distance': mean, 'spread': spread, 'frames': int(seen)})
+        return results
+
+
+def calculate_targets(data, gap=CLUSTER_GAP, gate=TRACK_GATE):
+    """
+    Processes the points data to find the distance to every target in view.
+
+    :param data: List of frames from the RadarIQ module
+    :return: List of targets as returned by TargetTracker.results()
+    """
+    tracker = TargetTracker(gate)
+    for frame in data:
+        tracker.update(cluster_frame(frame, gap))
+    return tracker.results()
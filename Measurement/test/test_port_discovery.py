@@ -0,0 +1,62 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+import port_discovery
+
+"""
+Unit tests for port discovery
+"""
+
+
+class FakePort:
+    def __init__(self, device, vid=port_discovery.USB_VID, pid=port_discovery.USB_PID):
+        self.device = device
+        self.vid = vid
+        self.pid = pid
+
+
+class TestPortDiscovery(unittest.TestCase):
+
+    def setUp(self):
+        handle, self.cache_file = tempfile.mkstemp()
+        os.close(handle)
+        os.remove(self.cache_file)
+        patcher = mock.patch.object(port_discovery, 'CACHE_FILE', self.cache_file)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(port_discovery.clear_cached_port)
+
+    def test_cache(self):
+        self.assertIsNone(port_discovery.load_cached_port())
+        port_discovery.save_port('/dev/ttyUSB0')
+        self.assertEqual('/dev/ttyUSB0', port_discovery.load_cached_port())
+        port_discovery.clear_cached_port()
+        self.assertIsNone(port_discovery.load_cached_port())
+
+    @mock.patch.object(port_discovery.list_ports, 'comports')
+    @mock.patch.object(port_discovery, 'probe')
+    def test_cached_port_tried_first(self, probe, comports):
+        port_discovery.save_port('/dev/ttyACM3')
+        probe.return_value = True
+        self.assertEqual('/dev/ttyACM3', port_discovery.find_port())
+        comports.assert_not_called()
+
+    @mock.patch.object(port_discovery.list_ports, 'comports')
+    @mock.patch.object(port_discovery, 'probe')
+    def test_full_port_names(self, probe, comports):
+        comports.return_value = [FakePort('/dev/ttyS0', vid=1, pid=1), FakePort('/dev/ttyUSB10'),
+                                 FakePort('COM12')]
+        probe.side_effect = lambda port, timeout: port == 'COM12'
+        self.assertEqual('COM12', port_discovery.find_port())
+
+        probe.side_effect = lambda port, timeout: port == '/dev/ttyUSB10'
+        self.assertEqual('/dev/ttyUSB10', port_discovery.find_port(use_cache=False))
+
+    @mock.patch.object(port_discovery.list_ports, 'comports')
+    @mock.patch.object(port_discovery, 'probe')
+    def test_no_ports(self, probe, comports):
+        comports.return_value = [FakePort('COM1')]
+        probe.return_value = False
+        with self.assertRaises(Exception):
+            port_discovery.find_port()
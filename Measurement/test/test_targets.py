@@ -0,0 +1,47 @@
+import unittest
+import targets
+import numpy as np
+
+"""
+Unit tests for multi-target measurement
+"""
+
+
+class TestTargets(unittest.TestCase):
+
+    def test_cluster_frame(self):
+        frame = [[0, 1000, 0, 10, 0], [10, 1020, 0, 30, 0], [-50, 3000, 0, 20, 0], [50, 3010, 0, 20, 0],
+                 [0, 6000, 0, 5, 0]]
+        clusters = targets.cluster_frame(frame)
+        self.assertEqual(2, len(clusters))  # the lone point at 6000 is noise
+        self.assertAlmostEqual(1015, clusters[0][0])
+        self.assertAlmostEqual(3005, clusters[1][0])
+        self.assertListEqual([2, 2], clusters[:, 2].tolist())
+
+    def test_cluster_empty_frame(self):
+        self.assertEqual((0, 3), targets.cluster_frame([]).shape)
+
+    def test_calculate_targets(self):
+        rng = np.random.default_rng(1)
+        data = []
+        for _ in range(100):
+            frame = []
+            for distance in (800, 2500, 5000):
+                for _ in range(5):
+                    frame.append([rng.normal(0, 100), rng.normal(distance, 10), 0, rng.uniform(1, 50), 0])
+            data.append(frame)
+
+        results = targets.calculate_targets(data)
+        self.assertEqual(3, len(results))
+        for result, expected in zip(results, (800, 2500, 5000)):
+            self.assertAlmostEqual(expected, result['distance'], delta=10)
+            self.assertLess(result['spread'], 20)
+            self.assertEqual(100, result['frames'])
+
+    def test_target_moves_between_frames(self):
+        tracker = targets.TargetTracker(gate=200)
+        for distance in range(1000, 2000, 100):
+            tracker.update(np.array([[distance, 0, 5]]))
+        results = tracker.results()
+        self.assertEqual(1, len(results))
+        self.assertAlmostEqual(1450, results[0]['distance'])
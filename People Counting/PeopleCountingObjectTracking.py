@@ -1,5 +1,9 @@
-from math import tan, radians
+from math import tan, radians, atan, degrees
+import numpy as np
 from radariq import RadarIQ, MODE_OBJECT_TRACKING, OUTPUT_LIST, OBJECT_TYPE_PERSON
+from zones import ZoneIndex, SectorZone, load_zones
+from crossings import CrossingCounter, CrossingLine, load_lines
+from occupancy import CountStore
 
 """
 Demonstration program counting people walking along a footpath etc.
@@ -9,9 +13,9 @@ and walk out the other side. This works best when the person is about 5m away fr
 
 This implementation uses the object tracking application to count people.
 
-This program sets up a zone on the left boundary of the sensor and a similar zone on the right side of the sensor.
-When a person enters or exits one of these this gets recorded as a Left or Right. A person must walk from one side to the
-other to count with this application.
+This program sets up a virtual line down the middle of the sensors field of view. A person is counted when their
+tracked path crosses the line, and the direction they crossed it in is recorded. The number of times people enter and
+exit a zone on the left boundary and a zone on the right boundary is also counted.
 
 Tips for usage:
 1. Run this application once. This will set the relevant parameters on the sensor.
@@ -25,6 +29,10 @@ MIN_DISTANCE = 1000  # Closest distance to look (mm)
 MAX_DISTANCE = 10000  # Furthermost distance to look (mm)
 MIN_ANGLE = -30  # Minimum angle to look
 MAX_ANGLE = 30  # Maximum angle to look
+TOLERANCE = 0.2  # How far either side of the boundary the boundary zones extend (fraction of the boundary x)
+ZONES_FILE = None  # JSON file defining the zones and lines (see zones.example.json). If None the defaults are used
+TRACK_TTL = 5  # Number of seconds after a person was last seen that they are forgotten
+COUNTS_FILE = 'counts.sqlite'  # Database the counts are saved to (view them with python occupancy.py)
 
 
 class CountPeople:
@@ -32,10 +40,27 @@ class CountPeople:
     Count people
     """
 
-    def __init__(self):
+    def __init__(self, counts_file=COUNTS_FILE):
         self.riq = None
-        self.people = {}  # In the form {<object id> : 'left|right'}
-        self.counter = 0
+        if ZONES_FILE is not None:
+            self.zones = load_zones(ZONES_FILE)
+            self.crossings = CrossingCounter(load_lines(ZONES_FILE), TRACK_TTL)
+        else:
+            self.zones = ZoneIndex([boundary_zone('left', MIN_ANGLE), boundary_zone('right', MAX_ANGLE)])
+            self.crossings = CrossingCounter([CrossingLine('centre', [0, MIN_DISTANCE], [0, MAX_DISTANCE])], TRACK_TTL)
+        self.zone_counter = {}
+        for zone in self.zones.names:
+            self.zone_counter[f'{zone}-enter'] = 0
+            self.zone_counter[f'{zone}-exit'] = 0
+        self.in_zones = {}  # In the form {<object id> : {<zone name>, ...}}
+
+        # Carry on from the counts saved by previous runs
+        self.store = CountStore(counts_file)
+        totals = self.store.totals()
+        self.counter = totals.get('people', 0)
+        for counter in (self.zone_counter, self.crossings.counter):
+            for name in counter:
+                counter[name] = totals.get(name, 0)
 
     def start(self):
         """
@@ -69,68 +94,63 @@ class CountPeople:
 
     def run_counter(self):
         for frames in self.riq.get_data():  # loop goes round once per frame
-            if frames is not None and len(frames) > 0:
-                for frame in frames:
-                    if frame['tracking_id'] in self.people.keys():  # has the person previously been detected
-                        # person start on the left and is now at the right of the sensors field of view
-                        if self.people[frame['tracking_id']] == 'left' and self.is_at_right_boundary(frame['x_pos'], frame['y_pos']):
-                            self.people[frame['tracking_id']] = 'right'
-                            self.count()
-                        # person start on the right and is now at the left of the sensors field of view
-                        elif self.people[frame['tracking_id']] == 'right' and self.is_at_left_boundary(frame['x_pos'], frame['y_pos']):
-                            self.people[frame['tracking_id']] = 'left'
-                            self.count()
-
-                    else:  # New person
-                        # If they are at the left boundary, begin counting them
-                        if self.is_at_left_boundary(frame['x_pos'], frame['y_pos']):
-                            self.people[frame['tracking_id']] = 'left'
-                        # If they are at the right boundary, begin counting them
-                        elif self.is_at_right_boundary(frame['x_pos'], frame['y_pos']):
-                            self.people[frame['tracking_id']] = 'right'
-                        # don't count at all until the object touches a boundary.
-                        else:
-                            pass
-
-    def count(self):
-        self.counter += 1
-        print(f"Number of people {self.counter}")
+            if frames is not None:
+                self.process_frame(frames)
+            self.store.tick()  # save the counts every FLUSH_INTERVAL, even when nobody is about
 
-    def is_at_left_boundary(self, x, y):
+    def process_frame(self, frames, now=None, tracked=None):
         """
-        See if the object is on the left boundary.
+        Update the zones each person is in and count people crossing the lines.
 
-        :param x: X coordinate of the object
-        :param y: Y coordinate of the object
-        :return:
+        :param frames: List of tracked objects from the RadarIQ module
+        :param now: Time the frame was received (seconds). Defaults to now
+        :param tracked: Tracking IDs of everyone still being tracked, when that is more than the people in the frame
+            (eg. with several modules). Defaults to the people in the frame
         """
-        x_boundary = tan(radians(MIN_ANGLE)) * y  # find where the x boundary would be for the objects y position
-        x_boundary_1 = x_boundary * 0.8
-        x_boundary_2 = x_boundary * 1.2
-
-        # if the object is within the tolerance of the boundary
-        result = x_boundary_1 > x > x_boundary_2
-        if result:
-            print("Person detected at LEFT boundary")
-        return result
-
-    def is_at_right_boundary(self, x, y):
+        tracking_ids = [frame['tracking_id'] for frame in frames]
+        x = np.array([frame['x_pos'] for frame in frames], dtype=float)
+        y = np.array([frame['y_pos'] for frame in frames], dtype=float)
+
+        in_zones = {tracking_id: set() for tracking_id in tracking_ids}
+        if len(frames) > 0:
+            objects, zones = self.zones.locate(x, y)
+            for obj, zone in zip(objects.tolist(), zones.tolist()):
+                in_zones[tracking_ids[obj]].add(self.zones.names[zone])
+
+        # People who are no longer tracked have left every zone they were in
+        for tracking_id in self.in_zones.keys() - in_zones.keys() - set(() if tracked is None else tracked):
+            self.update_zones(tracking_id, set())
+        for tracking_id, zones in in_zones.items():
+            self.update_zones(tracking_id, zones)
+
+        for _, line, direction in self.crossings.update(tracking_ids, x, y, now):
+            self.count(f'{line}-{direction}')
+
+    def update_zones(self, tracking_id, zones):
         """
-        See if the object is on the right boundary.
+        Count a person entering or exiting zones.
 
-        :param x: X coordinate of the object
-        :param y: Y coordinate of the object
-        :return:
+        :param tracking_id: Tracking ID of the person
+        :param zones: Names of the zones the person is now in
         """
-        x_boundary = tan(radians(MAX_ANGLE)) * y  # find where the x boundary would be for the objects y position
-        x_boundary_1 = x_boundary * 0.8
-        x_boundary_2 = x_boundary * 1.2
-
-        # if the object is within the tolerance of the boundary
-        result = x_boundary_1 < x < x_boundary_2
-        if result:
-            print("Person detected at RIGHT boundary")
-        return result
+        previous = self.in_zones.get(tracking_id, set())
+        for zone in zones - previous:
+            self.zone_counter[f'{zone}-enter'] += 1
+            self.store.add(f'{zone}-enter')
+        for zone in previous - zones:
+            self.zone_counter[f'{zone}-exit'] += 1
+            self.store.add(f'{zone}-exit')
+
+        if len(zones) > 0:
+            self.in_zones[tracking_id] = zones
+        else:
+            self.in_zones.pop(tracking_id, None)
+
+    def count(self, crossing):
+        self.counter += 1
+        self.store.add('people')
+        self.store.add(crossing)
+        print(f"Number of people {self.counter} {self.crossings.counter}")
 
     def exit_handler(self):
         """
@@ -140,6 +160,20 @@ class CountPeople:
             self.riq.close()  # this will stop the sensor which will stop the run_counter loop
         except Exception:
             pass
+        self.store.close()
+
+
+def boundary_zone(name, angle):
+    """
+    Create a zone either side of the boundary at an angle, within TOLERANCE of the boundary line.
+
+    :param name: Name of the zone
+    :param angle: Angle of the boundary (degrees)
+    :rtype: SectorZone
+    """
+    boundary_tan = tan(radians(angle))
+    return SectorZone(name, degrees(atan(boundary_tan * (1 - TOLERANCE))), degrees(atan(boundary_tan * (1 + TOLERANCE))),
+                      MIN_DISTANCE, MAX_DISTANCE)
 
 
 if __name__ == '__main__':
@@ -1,5 +1,7 @@
-from math import tan, radians
-from radariq import RadarIQ, MODE_POINT_CLOUD, OUTPUT_LIST, MOVING_OBJECTS_ONLY, DENSITY_VERY_DENSE
+from radariq import RadarIQ, MODE_POINT_CLOUD, OUTPUT_NUMPY, MOVING_OBJECTS_ONLY, DENSITY_VERY_DENSE
+from zones import ZoneIndex, BoundaryZone, load_zones
+from occupancy import CountStore
+from debounce import ZoneDebouncer
 
 """
 Demonstration program counting people walking along a footpath etc.
@@ -12,6 +14,9 @@ This implementation uses the point cloud application to count people.
 This program sets up a zone on the left boundary of the sensor and a similar zone on the right side of the sensor.
 When a person enters or exits one of these this gets recorded as a 'left-enter', 'left-exit', 'right-enter', 'right-exit'
 
+A zone is only entered once CONFIRM_FRAMES of the last WINDOW_FRAMES frames have more than ON_THRESHOLD points in it, and
+only exited once as many frames have fewer than OFF_THRESHOLD points, so a noisy frame does not count as an enter or exit.
+
 Tips for usage:
 1. Run this application once. This will set the relevant parameters on the sensor.
 2. Open the RadarIQ Controller Application to visualise what the sensor is seeing. This will allow you to see the 
@@ -25,7 +30,12 @@ MAX_DISTANCE = 8000  # Furthermost distance to look (mm)
 MIN_ANGLE = -30  # Minimum angle to look
 MAX_ANGLE = 30  # Maximum angle to look
 MARGIN = 500
-THRESHOLD = 10
+ON_THRESHOLD = 10  # Number of points in a zone above which a frame counts towards entering it
+OFF_THRESHOLD = 5  # Number of points in a zone below which a frame counts towards exiting it
+CONFIRM_FRAMES = 3  # Number of frames (out of the last WINDOW_FRAMES) needed to enter or exit a zone
+WINDOW_FRAMES = 5
+COUNTS_FILE = 'counts.sqlite'  # Database the counts are saved to (view them with python occupancy.py)
+ZONES_FILE = None  # JSON file defining the zones (see zones.example.json). If None the left and right boundaries are used
 
 
 class CountPeople:
@@ -33,17 +43,21 @@ class CountPeople:
     Count people
     """
 
-    def __init__(self):
+    def __init__(self, counts_file=COUNTS_FILE):
         self.riq = None
-        self.counter = {'left-enter': 0,
-                        'left-exit': 0,
-                        'right-enter': 0,
-                        'right-exit': 0
-                        }
-        self.left_detected = False
-        self.right_detected = False
-        self.min_angle_tan = tan(radians(MIN_ANGLE))
-        self.max_angle_tan = tan(radians(MAX_ANGLE))
+        if ZONES_FILE is not None:
+            self.zones = load_zones(ZONES_FILE)
+        else:
+            self.zones = ZoneIndex([BoundaryZone('left', MIN_ANGLE, MARGIN, MAX_DISTANCE),
+                                    BoundaryZone('right', MAX_ANGLE, MARGIN, MAX_DISTANCE)])
+        # Carry on from the counts saved by previous runs
+        self.store = CountStore(counts_file)
+        totals = self.store.totals()
+        self.counter = {}
+        for zone in self.zones.names:
+            self.counter[f'{zone}-enter'] = totals.get(f'{zone}-enter', 0)
+            self.counter[f'{zone}-exit'] = totals.get(f'{zone}-exit', 0)
+        self.debouncer = ZoneDebouncer(self.zones.names, ON_THRESHOLD, OFF_THRESHOLD, CONFIRM_FRAMES, WINDOW_FRAMES)
 
     def start(self):
         """
@@ -64,7 +78,7 @@ class CountPeople:
         Set up the RadarIQ module.
         """
         try:
-            self.riq = RadarIQ(output_format=OUTPUT_LIST)
+            self.riq = RadarIQ(output_format=OUTPUT_NUMPY)
             self.riq.set_mode(MODE_POINT_CLOUD)
             self.riq.set_units('mm', 'mm/s')
             self.riq.set_frame_rate(FRAME_RATE)
@@ -80,59 +94,28 @@ class CountPeople:
     def run_counter(self):
         for points in self.riq.get_data():  # loop goes round once per frame
             if points is not None:
-                left = self.count_at_left_boundary(points)
-                if self.left_detected is False and left > THRESHOLD:
-                    self.left_detected = True
-                    self.count('left-enter')
-                elif self.left_detected is True and left < THRESHOLD:
-                    self.left_detected = False
-                    self.count('left-exit')
-
-                right = self.count_at_right_boundary(points)
-                if self.right_detected is False and right > THRESHOLD:
-                    self.right_detected = True
-                    self.count('right-enter')
-                elif self.right_detected is True and right < THRESHOLD:
-                    self.right_detected = False
-                    self.count('right-exit')
-
-    def count(self, state):
-        self.counter[state] += 1
-
-        print(self.counter)
+                self.process_frame(points)
+            self.store.tick()  # save the counts every FLUSH_INTERVAL, even when nobody is about
 
-    def count_at_left_boundary(self, points):
+    def process_frame(self, points):
         """
-        Count the number of points at the left boundary
-        """
-        count = 0
-        for point in points:
-            y = point[1]
-            x = point[0]
-            x_boundary = self.min_angle_tan * y  # find where the x boundary would be for the objects y position
-            x_boundary_1 = x_boundary - MARGIN
-            x_boundary_2 = x_boundary + MARGIN
-            if x_boundary_1 < x < x_boundary_2:
-                count += 1
-
-        return count
-
-    def count_at_right_boundary(self, points):
-        """
-        Count the number of points at the right boundary
+        Count the enters and exits of the zones for one frame of points.
+
+        :param points: Point cloud frame from the RadarIQ module, in the form [[x, y, z, intensity, velocity], ...]
+        :return: The confirmed transitions in the form [(<zone name>, 'enter' or 'exit'), ...]
+        :rtype: list
         """
-        count = 0
-        for point in points:
-            y = point[1]
-            x = point[0]
-            x_boundary = self.max_angle_tan * y  # find where the x boundary would be for the objects y position
-            x_boundary_1 = x_boundary - MARGIN
-            x_boundary_2 = x_boundary + MARGIN
+        counts = self.zones.count(points)
+        events = self.debouncer.update([counts[zone] for zone in self.zones.names])
+        for zone, transition in events:
+            self.count(f'{zone}-{transition}')
+        return events
 
-            if x_boundary_1 < x < x_boundary_2:
-                count += 1
+    def count(self, state):
+        self.counter[state] += 1
+        self.store.add(state)
 
-        return count
+        print(self.counter)
 
     def exit_handler(self):
         """
@@ -142,6 +125,7 @@ class CountPeople:
             self.riq.close()  # this will stop the sensor which will stop the run_counter loop
         except Exception:
             pass
+        self.store.close()
 
 
 if __name__ == '__main__':
@@ -0,0 +1,92 @@
+import timeit
+from math import tan, radians
+import numpy as np
+from zones import ZoneIndex, BoundaryZone, PolygonZone
+
+"""
+Benchmark of counting points in the boundary zones for synthetic dense point cloud frames.
+
+Usage: python benchmark_zones.py
+"""
+
+MIN_ANGLE = -30
+MAX_ANGLE = 30
+MARGIN = 500
+MAX_DISTANCE = 8000
+FRAME_SIZES = [64, 256, 1024, 4096]
+REPEATS = 200
+
+
+def loop_count(points, angle, margin):
+    """
+    The original per point implementation, run once per zone.
+    """
+    angle_tan = tan(radians(angle))
+    count = 0
+    for point in points:
+        x_boundary = angle_tan * point[1]
+        if x_boundary - margin < point[0] < x_boundary + margin:
+            count += 1
+    return count
+
+
+def synthetic_frame(n, rng):
+    """
+    Frame of n points spread over the field of view, as a list like the RadarIQ module returns.
+    """
+    y = rng.uniform(2000, 8000, n)
+    x = rng.uniform(tan(radians(MIN_ANGLE)), tan(radians(MAX_ANGLE)), n) * y
+    return np.column_stack((x, y, rng.uniform(-500, 500, n), rng.uniform(0, 50, n), rng.uniform(-1000, 1000, n))).tolist()
+
+
+def run(zones, frame):
+    """
+    Time the loop and vectorized implementations of the boundary zones for one frame.
+
+    :return: Milliseconds per frame for the loop, the vectorized counter given a list and given an array
+    """
+    counter = ZoneIndex([BoundaryZone(name, angle, margin, MAX_DISTANCE) for name, (angle, margin) in zones.items()])
+    array = np.asarray(frame)
+
+    def loop():
+        for angle, margin in zones.values():
+            loop_count(frame, angle, margin)
+
+    loop_ms = timeit.timeit(loop, number=REPEATS) / REPEATS * 1000
+    list_ms = timeit.timeit(lambda: counter.count(frame), number=REPEATS) / REPEATS * 1000
+    array_ms = timeit.timeit(lambda: counter.count(array), number=REPEATS) / REPEATS * 1000
+    return loop_ms, list_ms, array_ms
+
+
+def main():
+    rng = np.random.default_rng(0)
+    zone_sets = {
+        2: {'left': (MIN_ANGLE, MARGIN), 'right': (MAX_ANGLE, MARGIN)},
+        8: {str(angle): (angle, MARGIN) for angle in np.linspace(MIN_ANGLE, MAX_ANGLE, 8)},
+    }
+    print(f"{'zones':>6} {'points':>8} {'loop (ms)':>10} {'list (ms)':>10} {'array (ms)':>11}")
+    for n_zones, zones in zone_sets.items():
+        for n in FRAME_SIZES:
+            loop_ms, list_ms, array_ms = run(zones, synthetic_frame(n, rng))
+            print(f"{n_zones:>6} {n:>8} {loop_ms:>10.3f} {list_ms:>10.3f} {array_ms:>11.3f}")
+
+    # Broadcasting tests every point against every zone, the grid only against the zones near it. Below the crossover
+    # the broadcast is faster, above it the grid is (ZoneIndex switches at GRID_MIN_ZONES)
+    print()
+    print(f"{'zones':>6} {'points':>8} {'broadcast (ms)':>15} {'grid (ms)':>10}")
+    for n in (FRAME_SIZES[0], FRAME_SIZES[-1]):
+        frame = np.asarray(synthetic_frame(n, rng))
+        for n_side in (1, 2, 3, 4, 6, 8, 12):
+            size = 10000 / n_side
+            tiles = [PolygonZone(f"{i}-{j}", [[x, y], [x + size, y], [x + size, y + size], [x, y + size]])
+                     for i, x in enumerate(np.arange(n_side) * size - 5000)
+                     for j, y in enumerate(np.arange(n_side) * size)]
+            broadcast = ZoneIndex(tiles, grid_min_zones=len(tiles) + 1)
+            grid = ZoneIndex(tiles, cell_size=size, grid_min_zones=0)
+            broadcast_ms = timeit.timeit(lambda: broadcast.count(frame), number=REPEATS) / REPEATS * 1000
+            grid_ms = timeit.timeit(lambda: grid.count(frame), number=REPEATS) / REPEATS * 1000
+            print(f"{len(tiles):>6} {n:>8} {broadcast_ms:>15.3f} {grid_ms:>10.3f}")
+
+
+if __name__ == '__main__':
+    main()
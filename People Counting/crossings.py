@@ -0,0 +1,159 @@
+import json
+import time
+import numpy as np
+from tracks import TrackStore, TRACK_TTL
+
+"""
+Counts people crossing virtual lines.
+
+The last few positions of each tracked person are kept in one NumPy array. Each frame the (smoothed) step every person
+took is tested against every line at once using segment intersection, and the side of the line they came from gives
+the direction of the crossing.
+"""
+
+SMOOTHING = 3  # Number of positions averaged to smooth out jitter in the tracked position
+DIRECTIONS = ('left-to-right', 'right-to-left')  # Relative to the line, looking from its start to its end
+
+
+class CrossingLine:
+    """
+    A virtual line which is counted when a person crosses it.
+    """
+
+    def __init__(self, name, start, end):
+        """
+        :param name: Name of the line
+        :param start: Start of the line [x, y]
+        :param end: End of the line [x, y]
+        """
+        self.name = name
+        self.start = np.asarray(start, dtype=float)
+        self.end = np.asarray(end, dtype=float)
+
+
+def load_lines(filename):
+    """
+    Load crossing lines from a JSON file.
+
+    The file is in the form {"lines": [{"name": "footpath", "start": [x, y], "end": [x, y]}, ...]}. This may be the
+    same file as the zones (see zones.example.json).
+
+    :param filename: Path to the file
+    :return: List of CrossingLine objects
+    :rtype: list
+    """
+    with open(filename) as f:
+        config = json.load(f)
+    return [CrossingLine(line['name'], line['start'], line['end']) for line in config.get('lines', [])]
+
+
+class CrossingCounter:
+    """
+    Counts the number of times tracked people cross each line, in each direction.
+    """
+
+    def __init__(self, lines, ttl=TRACK_TTL, smoothing=SMOOTHING, capacity=16):
+        """
+        :param lines: List of CrossingLine objects
+        :param ttl: Seconds after a person was last seen that their trajectory is forgotten
+        :param smoothing: Number of positions averaged to smooth the trajectory
+        :param capacity: Number of trajectories to allocate space for initially (grows as needed)
+        """
+        self.lines = list(lines)
+        self.line_start = np.array([line.start for line in self.lines], dtype=float).reshape(-1, 2)
+        self.line_vector = np.array([line.end for line in self.lines], dtype=float).reshape(-1, 2) - self.line_start
+        self.counter = {}
+        for line in self.lines:
+            for direction in DIRECTIONS:
+                self.counter[f'{line.name}-{direction}'] = 0
+
+        # Ring buffer of the last `smoothing + 1` positions of each track, one row per track
+        self.smoothing = smoothing
+        self.history = smoothing + 1
+        self.positions = np.zeros((capacity, self.history, 2))
+        self.samples = np.zeros(capacity, dtype=int)  # Number of positions recorded for each row
+        self.free = list(range(capacity - 1, -1, -1))
+        self.slots = TrackStore(ttl, on_expire=self._release)  # In the form {<tracking id>: <row>}
+
+    def update(self, tracking_ids, x, y, now=None):
+        """
+        Add the latest positions of the tracked people and count any line crossings.
+
+        :param tracking_ids: Tracking IDs of the people in the frame
+        :param x: X positions of the people
+        :param y: Y positions of the people
+        :param now: Time the frame was received (seconds). Defaults to now
+        :return: The crossings in the form [(<tracking id>, <line name>, <direction>), ...]
+        :rtype: list
+        """
+        now = time.monotonic() if now is None else now
+        self.slots.expire(now)  # before looking up the tracks, so a recycled tracking ID starts a new trajectory
+        crossings = []
+        if len(tracking_ids) > 0:
+            rows = np.array([self._row(tracking_id, now) for tracking_id in tracking_ids], dtype=int)
+            self.positions[rows, self.samples[rows] % self.history] = np.column_stack((x, y))
+            self.samples[rows] += 1
+
+            ready = np.flatnonzero(self.samples[rows] >= self.history)
+            if len(ready) > 0 and len(self.lines) > 0:
+                for track, line, direction in zip(*self._cross(rows[ready])):
+                    tracking_id = tracking_ids[ready[track]]
+                    name = self.lines[line].name
+                    self.counter[f'{name}-{DIRECTIONS[direction]}'] += 1
+                    crossings.append((tracking_id, name, DIRECTIONS[direction]))
+        return crossings
+
+    def _cross(self, rows):
+        """
+        Find which lines the last step of each track crossed.
+
+        :param rows: Rows of the tracks with a full history
+        :return: Three arrays (track index, line index, direction index), one entry per crossing
+        """
+        positions = self.positions[rows]
+        newest = positions[np.arange(len(rows)), (self.samples[rows] - 1) % self.history]
+        oldest = positions[np.arange(len(rows)), self.samples[rows] % self.history]
+        total = positions.sum(axis=1)
+        previous = (total - newest) / self.smoothing
+        current = (total - oldest) / self.smoothing
+
+        # Side of each line the step starts and ends on, shape (tracks, lines)
+        start_side = cross(self.line_vector, previous[:, None] - self.line_start) > 0
+        end_side = cross(self.line_vector, current[:, None] - self.line_start) > 0
+
+        # Which side of the step the ends of each line are on
+        step = (current - previous)[:, None]
+        line_end = self.line_start + self.line_vector
+        step_sides = cross(step, self.line_start - previous[:, None]) * cross(step, line_end - previous[:, None])
+
+        tracks, lines = np.nonzero((start_side != end_side) & (step_sides <= 0))
+        directions = np.where(start_side[tracks, lines], 0, 1)  # from the left side is left-to-right
+        return tracks, lines, directions
+
+    def _row(self, tracking_id, now):
+        self.slots.seen(tracking_id, now)
+        row = self.slots.get(tracking_id)
+        if row is None:
+            if len(self.free) == 0:
+                self._grow()
+            row = self.free.pop()
+            self.samples[row] = 0
+            self.slots[tracking_id] = row
+        return row
+
+    def _grow(self):
+        capacity = len(self.samples)
+        self.positions = np.concatenate((self.positions, np.zeros_like(self.positions)))
+        self.samples = np.concatenate((self.samples, np.zeros_like(self.samples)))
+        self.free.extend(range(2 * capacity - 1, capacity - 1, -1))
+
+    def _release(self, tracking_id, row):
+        if row is not None:
+            self.free.append(row)
+
+
+def cross(a, b):
+    """
+    2D cross product of the last axis of two arrays.
+    """
+    return a[..., 0] * b[..., 1] - a[..., 1] * b[..., 0]
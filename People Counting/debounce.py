@@ -0,0 +1,88 @@
+import numpy as np
+
+"""
+Debounces the number of points detected in each zone into confirmed enter and exit events.
+
+A single frame going over a threshold is not enough to change the state of a zone. A frame only votes for a zone
+being occupied when its count is above the on threshold, and only votes for the zone being empty when its count is
+below the (lower) off threshold. The state changes once N of the last M frames voted for the change. The votes are kept
+in a fixed size ring buffer per zone with running totals, so each frame is O(number of zones) whatever M is.
+"""
+
+ON_THRESHOLD = 10  # A frame with more points than this in a zone votes for the zone being occupied
+OFF_THRESHOLD = 5  # A frame with fewer points than this in a zone votes for the zone being empty
+CONFIRM_FRAMES = 3  # Number of votes needed to change the state of a zone (N)
+WINDOW_FRAMES = 5  # Number of recent frames the votes are counted over (M)
+
+
+class ZoneDebouncer:
+    """
+    Hysteresis and N-of-M debounce for the point counts of several zones.
+    """
+
+    def __init__(self, names, on_threshold=ON_THRESHOLD, off_threshold=OFF_THRESHOLD,
+                 confirm_frames=CONFIRM_FRAMES, window_frames=WINDOW_FRAMES):
+        """
+        :param names: Names of the zones
+        :param on_threshold: A frame with more points than this votes for the zone being occupied
+        :param off_threshold: A frame with fewer points than this votes for the zone being empty
+        :param confirm_frames: Number of votes within the window needed to change state
+        :param window_frames: Number of recent frames the votes are counted over
+        """
+        if off_threshold > on_threshold:
+            raise ValueError("off_threshold must not be more than on_threshold")
+        if not 0 < confirm_frames <= window_frames:
+            raise ValueError("confirm_frames must be between 1 and window_frames")
+        self.names = list(names)
+        self.on_threshold = on_threshold
+        self.off_threshold = off_threshold
+        self.confirm_frames = confirm_frames
+        self.window_frames = window_frames
+
+        n_zones = len(self.names)
+        self.on_votes = np.zeros((window_frames, n_zones), dtype=bool)  # Ring buffers, one column per zone
+        self.off_votes = np.zeros((window_frames, n_zones), dtype=bool)
+        self.on_total = np.zeros(n_zones, dtype=int)
+        self.off_total = np.zeros(n_zones, dtype=int)
+        self.frame = 0
+        self.detected = np.zeros(n_zones, dtype=bool)
+
+    def update(self, counts):
+        """
+        Add a frame of counts.
+
+        :param counts: Number of points in each zone, in the same order as names
+        :return: Confirmed transitions in the form [(<zone name>, 'enter' or 'exit'), ...]
+        :rtype: list
+        """
+        counts = np.asarray(counts)
+        slot = self.frame % self.window_frames
+        self.frame += 1
+
+        on = counts > self.on_threshold
+        off = counts < self.off_threshold
+        self.on_total += on.astype(int) - self.on_votes[slot]
+        self.off_total += off.astype(int) - self.off_votes[slot]
+        self.on_votes[slot] = on
+        self.off_votes[slot] = off
+
+        enter = ~self.detected & (self.on_total >= self.confirm_frames)
+        leave = self.detected & (self.off_total >= self.confirm_frames)
+        if not (enter.any() or leave.any()):
+            return []
+
+        changed = enter | leave
+        self.detected ^= changed
+        # Start counting votes afresh after a change, so old votes can not immediately reverse it
+        self.on_votes[:, changed] = False
+        self.off_votes[:, changed] = False
+        self.on_total[changed] = 0
+        self.off_total[changed] = 0
+        return [(self.names[i], 'enter' if enter[i] else 'exit') for i in np.flatnonzero(changed)]
+
+    def state(self):
+        """
+        :return: Whether each zone is currently occupied, in the form {<zone name>: <bool>, ...}
+        :rtype: dict
+        """
+        return dict(zip(self.names, self.detected.tolist()))
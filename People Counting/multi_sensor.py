@@ -0,0 +1,281 @@
+import queue
+import threading
+import time
+from math import sin, cos, radians
+import numpy as np
+from radariq import RadarIQ, MODE_OBJECT_TRACKING, OUTPUT_LIST, OBJECT_TYPE_PERSON
+from tracks import TrackStore
+import PeopleCountingObjectTracking as ObjectTracking
+
+"""
+People counting with several RadarIQ modules covering the same area.
+
+Each module is read by its own thread. Detections are moved from each module's coordinates into one shared site
+coordinate frame, people seen by more than one module are merged into a single site track, and the site tracks are
+counted with the same zones and lines as PeopleCountingObjectTracking.py (which are in site coordinates).
+
+Set SENSORS below to the port and position of each module, then run: python multi_sensor.py
+"""
+
+# Position of each module in site coordinates. Rotation is the direction the module faces, in degrees to the right of
+# the site y axis.
+SENSORS = [
+    {'port': 'COM3', 'x': 0, 'y': 0, 'rotation': 0},
+    {'port': 'COM4', 'x': 4000, 'y': 0, 'rotation': 0},
+]
+MERGE_DISTANCE = 600  # Detections from different modules closer than this are the same person (mm)
+STALE_TIME = 0.5  # Site tracks not updated by any module for this long are left out of the count (seconds)
+QUEUE_LENGTH = 100  # Number of frames which may be waiting to be processed
+TICK_INTERVAL = 1  # Longest time between checks whether the counts are due to be saved (seconds)
+
+
+class SensorPose:
+    """
+    Position and direction of a module in site coordinates.
+    """
+
+    def __init__(self, x=0, y=0, rotation=0):
+        """
+        :param x: X position of the module (mm)
+        :param y: Y position of the module (mm)
+        :param rotation: Direction the module faces (degrees to the right of the site y axis)
+        """
+        self.x = x
+        self.y = y
+        self.rotation = rotation
+        self._sin = sin(radians(rotation))
+        self._cos = cos(radians(rotation))
+
+    def to_site(self, x, y):
+        """
+        Transform positions from the module's coordinates to site coordinates.
+
+        :param x: Array of x positions relative to the module
+        :param y: Array of y positions relative to the module
+        :return: Arrays of x and y positions in site coordinates
+        :rtype: tuple
+        """
+        return self.x + x * self._cos + y * self._sin, self.y - x * self._sin + y * self._cos
+
+
+class SensorReader(threading.Thread):
+    """
+    Reads frames from one module and puts them on a queue shared with the other readers.
+    """
+
+    def __init__(self, index, data_getter, frames):
+        """
+        :param index: Index of the module
+        :param data_getter: Function returning an iterator of frames (eg. RadarIQ.get_data)
+        :param frames: Queue to put (<index>, <time received>, <frame>) on
+        """
+        threading.Thread.__init__(self, daemon=True)
+        self.index = index
+        self.data_getter = data_getter
+        self.frames = frames
+        self.running = True
+
+    def run(self):
+        for frame in self.data_getter():
+            if not self.running:
+                break
+            if frame is not None:
+                self.frames.put((self.index, time.monotonic(), frame))
+
+    def stop(self):
+        self.running = False
+
+
+class SiteTracker:
+    """
+    Merges the tracks from several modules into site tracks.
+
+    A module's track is linked to a site track the first time it is seen, either to the nearest site track within
+    MERGE_DISTANCE which that module is not currently following, or to a new site track.
+    """
+
+    def __init__(self, merge_distance=MERGE_DISTANCE, ttl=ObjectTracking.TRACK_TTL):
+        self.merge_distance = merge_distance
+        self.links = TrackStore(ttl)  # In the form {(<module index>, <tracking id>): <site id>}
+        # In the form {<site id>: [<x>, <y>, <last updated>, {<module index>: <last updated by the module>, ...}]}
+        self.tracks = TrackStore(ttl)
+        self.next_id = 0
+
+    def update(self, sensor, tracking_ids, x, y, now):
+        """
+        Update the site tracks with a frame from one module.
+
+        :param sensor: Index of the module
+        :param tracking_ids: Tracking IDs from the module
+        :param x: Array of x positions in site coordinates
+        :param y: Array of y positions in site coordinates
+        :param now: Time the frame was received (seconds)
+        :return: Site IDs of the tracks updated by the frame
+        :rtype: list
+        """
+        self.links.expire(now)
+        self.tracks.expire(now)
+
+        unlinked = []
+        for i, tracking_id in enumerate(tracking_ids):
+            site_id = self.links.get((sensor, tracking_id))
+            if site_id is not None and site_id in self.tracks:
+                self._move(site_id, sensor, x[i], y[i], now)
+            else:
+                unlinked.append(i)
+
+        if len(unlinked) > 0:
+            self._link(sensor, [tracking_ids[i] for i in unlinked], x[unlinked], y[unlinked], now)
+        return [self.links[(sensor, tracking_id)] for tracking_id in tracking_ids]
+
+    def _link(self, sensor, tracking_ids, x, y, now):
+        # Site tracks another module is following which this one is not, as candidates for the same person
+        candidates = [(site_id, track) for site_id, track in self.tracks.items()
+                      if now - track[3].get(sensor, -STALE_TIME - 1) > STALE_TIME]
+        taken = set()
+        if len(candidates) > 0:
+            positions = np.array([track[:2] for _, track in candidates], dtype=float)
+            distance = np.hypot(x[:, None] - positions[None, :, 0], y[:, None] - positions[None, :, 1])
+        for i, tracking_id in enumerate(tracking_ids):
+            site_id = None
+            if len(candidates) > 0:
+                for j in np.argsort(distance[i]):
+                    if distance[i, j] > self.merge_distance:
+                        break
+                    if j not in taken:
+                        taken.add(j)
+                        site_id = candidates[j][0]
+                        break
+            if site_id is None:
+                site_id = self.next_id
+                self.next_id += 1
+                self.tracks.seen(site_id, now)
+                self.tracks[site_id] = [x[i], y[i], now, {}]
+            self.links.seen((sensor, tracking_id), now)
+            self.links[(sensor, tracking_id)] = site_id
+            self._move(site_id, sensor, x[i], y[i], now)
+
+    def _move(self, site_id, sensor, x, y, now):
+        self.tracks.seen(site_id, now)
+        track = self.tracks[site_id]
+        track[0], track[1], track[2] = x, y, now
+        track[3][sensor] = now
+
+    def current(self, now, stale_time=STALE_TIME):
+        """
+        Site tracks which have been updated recently.
+
+        :return: List of tracks in the same form as the RadarIQ module [{'tracking_id': .., 'x_pos': .., 'y_pos': ..}]
+        :rtype: list
+        """
+        return [{'tracking_id': site_id, 'x_pos': track[0], 'y_pos': track[1]}
+                for site_id, track in self.tracks.items() if now - track[2] <= stale_time]
+
+
+class MultiSensorCounter:
+    """
+    Counts people using several modules, producing a single count.
+    """
+
+    def __init__(self, poses, counter=None, merge_distance=MERGE_DISTANCE):
+        """
+        :param poses: List of SensorPose objects, one for each module
+        :param counter: CountPeople object which counts the site tracks
+        :param merge_distance: Detections from different modules closer than this are the same person (mm)
+        """
+        self.poses = poses
+        self.counter = ObjectTracking.CountPeople() if counter is None else counter
+        self.tracker = SiteTracker(merge_distance)
+        self.frames = queue.Queue(QUEUE_LENGTH)
+        self.readers = []
+        self.processed = 0
+
+    def start(self, data_getters):
+        """
+        Start a reader thread for each module.
+
+        :param data_getters: List of functions returning an iterator of frames, one for each module
+        """
+        for index, data_getter in enumerate(data_getters):
+            reader = SensorReader(index, data_getter, self.frames)
+            reader.start()
+            self.readers.append(reader)
+
+    def stop(self):
+        for reader in self.readers:
+            reader.stop()
+
+    def run(self, max_frames=None, timeout=None):
+        """
+        Count the frames from the modules as they arrive.
+
+        :param max_frames: Stop after this many frames (None to run until the readers stop)
+        :param timeout: Stop if no frame arrives within this many seconds (None to wait forever)
+        """
+        waited = 0
+        while max_frames is None or self.processed < max_frames:
+            # Wake up at least every TICK_INTERVAL so the counts are saved even when no frames arrive
+            wait = TICK_INTERVAL if timeout is None else min(timeout - waited, TICK_INTERVAL)
+            try:
+                sensor, received, frame = self.frames.get(timeout=wait)
+            except queue.Empty:
+                self.counter.store.tick()
+                waited += wait
+                if timeout is not None and waited >= timeout:
+                    break
+                continue
+            waited = 0
+            self.process(sensor, received, frame)
+            self.counter.store.tick()
+
+    def process(self, sensor, received, frame):
+        """
+        Merge a frame from one module into the site tracks and count them.
+        """
+        tracking_ids = [obj['tracking_id'] for obj in frame]
+        x = np.array([obj['x_pos'] for obj in frame], dtype=float)
+        y = np.array([obj['y_pos'] for obj in frame], dtype=float)
+        x, y = self.poses[sensor].to_site(x, y)
+        updated = set(self.tracker.update(sensor, tracking_ids, x, y, received))
+        current = self.tracker.current(received)
+        # Only the tracks this frame moved are counted, so a track is not fed its unchanged position again by the
+        # frames of modules which cannot see it. The rest are still tracked, so have not left their zones
+        self.counter.process_frame([track for track in current if track['tracking_id'] in updated], received,
+                                   tracked=[track['tracking_id'] for track in current])
+        self.processed += 1
+
+
+def setup_radariq(port):
+    """
+    Set up a RadarIQ module the same way as PeopleCountingObjectTracking.py.
+    """
+    riq = RadarIQ(port, output_format=OUTPUT_LIST)
+    riq.set_mode(MODE_OBJECT_TRACKING)
+    riq.set_units('mm', 'mm/s')
+    riq.set_frame_rate(ObjectTracking.FRAME_RATE)
+    riq.set_object_type_mode(OBJECT_TYPE_PERSON)
+    riq.set_distance_filter(ObjectTracking.MIN_DISTANCE, ObjectTracking.MAX_DISTANCE)
+    riq.set_angle_filter(ObjectTracking.MIN_ANGLE, ObjectTracking.MAX_ANGLE)
+    return riq
+
+
+if __name__ == '__main__':
+    modules = []
+    service = MultiSensorCounter([SensorPose(s['x'], s['y'], s['rotation']) for s in SENSORS])
+    try:
+        for sensor in SENSORS:
+            riq = setup_radariq(sensor['port'])
+            riq.start()
+            modules.append(riq)
+        service.start([riq.get_data for riq in modules])
+        service.run()
+    except Exception as err:
+        print(err)
+    finally:
+        service.stop()
+        for riq in modules:
+            try:
+                riq.close()
+            except Exception:
+                pass
+        service.counter.exit_handler()
@@ -0,0 +1,133 @@
+import argparse
+import sqlite3
+import time
+from collections import defaultdict
+from datetime import datetime
+
+"""
+Stores people counts as a time series.
+
+Counts are added up in memory in fixed time windows (one minute by default) and written to a local SQLite database
+in batches, so nothing is written per person counted. Rows are only ever appended to the database and it is read
+back when a counter starts, so the totals survive restarts.
+
+Usage: python occupancy.py counts.sqlite --window 3600  (prints the hourly totals)
+"""
+
+COUNTS_FILE = 'counts.sqlite'
+WINDOW = 60  # Length of each time window (seconds)
+FLUSH_INTERVAL = 60  # How often the counts are written to the database (seconds)
+
+
+class CountStore:
+    """
+    Time series of counts, aggregated into windows and written to SQLite in batches.
+    """
+
+    def __init__(self, filename=COUNTS_FILE, window=WINDOW, flush_interval=FLUSH_INTERVAL, clock=time.time):
+        """
+        :param filename: Path to the SQLite database
+        :param window: Length of each time window (seconds)
+        :param flush_interval: How often the counts are written to the database (seconds)
+        :param clock: Function returning the current time in seconds since the epoch
+        """
+        self.window = window
+        self.flush_interval = flush_interval
+        self.clock = clock
+        self.pending = defaultdict(int)  # In the form {(<window start>, <name>): <count>}
+        self.last_flush = clock()
+
+        self.connection = sqlite3.connect(filename)
+        self.connection.execute('PRAGMA journal_mode=WAL')
+        self.connection.execute('CREATE TABLE IF NOT EXISTS counts (period INTEGER, name TEXT, count INTEGER)')
+        self.connection.execute('CREATE INDEX IF NOT EXISTS counts_period ON counts (period)')
+        self.connection.commit()
+
+    def add(self, name, count=1, now=None):
+        """
+        Add to a count.
+
+        :param name: Name of the count (eg. 'left-enter')
+        :param count: Amount to add
+        :param now: Time of the event (seconds since the epoch). Defaults to now
+        """
+        now = self.clock() if now is None else now
+        self.pending[(int(now // self.window * self.window), name)] += count
+        self.tick(now)
+
+    def tick(self, now=None):
+        """
+        Write the pending counts if the flush interval has passed. Call this regularly (eg. once per frame) so counts
+        are saved even when nothing is being counted.
+
+        :param now: The current time (seconds since the epoch). Defaults to now
+        """
+        now = self.clock() if now is None else now
+        if now - self.last_flush >= self.flush_interval:
+            self.flush(now)
+
+    def flush(self, now=None):
+        """
+        Write the pending counts to the database in one transaction.
+        """
+        self.last_flush = self.clock() if now is None else now
+        if len(self.pending) == 0:
+            return
+        with self.connection:
+            self.connection.executemany('INSERT INTO counts (period, name, count) VALUES (?, ?, ?)',
+                                        [(window, name, count) for (window, name), count in self.pending.items()])
+        self.pending.clear()
+
+    def totals(self):
+        """
+        Total of each count, including counts which have not been written yet.
+
+        :return: Totals in the form {<name>: <count>, ...}
+        :rtype: dict
+        """
+        totals = defaultdict(int)
+        for name, count in self.connection.execute('SELECT name, SUM(count) FROM counts GROUP BY name'):
+            totals[name] += count
+        for (_, name), count in self.pending.items():
+            totals[name] += count
+        return dict(totals)
+
+    def series(self, window=3600, start=None, end=None):
+        """
+        Counts added up into windows, eg. hourly footfall.
+
+        :param window: Length of each window (seconds). Should be a multiple of the window counts are stored in
+        :param start: Only include counts from this time onwards (seconds since the epoch)
+        :param end: Only include counts before this time (seconds since the epoch)
+        :return: List in the form [(<window start>, <name>, <count>), ...] ordered by time
+        :rtype: list
+        """
+        self.flush()
+        start = 0 if start is None else start
+        end = 2 ** 62 if end is None else end
+        return self.connection.execute('SELECT period / ? * ?, name, SUM(count) FROM counts '
+                                       'WHERE period >= ? AND period < ? GROUP BY 1, 2 ORDER BY 1, 2',
+                                       (int(window), int(window), start, end)).fetchall()
+
+    def close(self):
+        """
+        Write any pending counts and close the database.
+        """
+        self.flush()
+        self.connection.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Print the people counts recorded by the people counters.')
+    parser.add_argument('filename', nargs='?', default=COUNTS_FILE, help='The counts database.')
+    parser.add_argument('--window', type=int, default=3600, help='Length of each period in seconds. Default is 1 hour')
+    args = parser.parse_args()
+
+    store = CountStore(args.filename)
+    for window, name, count in store.series(args.window):
+        print(f"{datetime.fromtimestamp(window):%Y-%m-%d %H:%M}  {name:<24} {count}")
+    store.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,62 @@
+import os
+import unittest
+import crossings
+import numpy as np
+
+"""
+Unit tests for line crossings
+"""
+
+
+class TestCrossingCounter(unittest.TestCase):
+
+    def setUp(self):
+        self.counter = crossings.CrossingCounter([crossings.CrossingLine('centre', [0, 1000], [0, 10000])],
+                                                 ttl=5, smoothing=1)
+
+    def walk(self, tracking_id, positions, start=0):
+        events = []
+        for i, (x, y) in enumerate(positions):
+            events += self.counter.update([tracking_id], [x], [y], now=start + i)
+        return events
+
+    def test_direction(self):
+        events = self.walk(1, [(-1000, 5000), (-200, 5000), (300, 5000), (1000, 5000)])
+        self.assertListEqual([(1, 'centre', 'left-to-right')], events)
+        events = self.walk(1, [(200, 5000), (-500, 5000)], start=4)
+        self.assertListEqual([(1, 'centre', 'right-to-left')], events)
+        self.assertDictEqual({'centre-left-to-right': 1, 'centre-right-to-left': 1}, self.counter.counter)
+
+    def test_passing_beyond_the_end_of_the_line(self):
+        self.assertListEqual([], self.walk(1, [(-1000, 500), (1000, 500)]))
+
+    def test_stopping_on_the_line(self):
+        events = self.walk(1, [(-1000, 5000), (0, 5000), (0, 5000), (1000, 5000)])
+        self.assertEqual(1, len(events))
+
+    def test_smoothing_ignores_jitter(self):
+        counter = crossings.CrossingCounter([crossings.CrossingLine('centre', [0, 1000], [0, 10000])], smoothing=3)
+        events = []
+        for i, x in enumerate([-300, -250, 50, -300, -250, 50, -300]):  # standing next to the line
+            events += counter.update([1], [x], [5000], now=i)
+        self.assertListEqual([], events)
+
+    def test_many_people(self):
+        counter = crossings.CrossingCounter([crossings.CrossingLine('centre', [0, 1000], [0, 10000]),
+                                             crossings.CrossingLine('far', [-5000, 8000], [5000, 8000])],
+                                            smoothing=1, capacity=2)
+        ids = list(range(100))
+        y = np.linspace(2000, 7000, 100)
+        counter.update(ids, np.full(100, -500.0), y, now=0)
+        events = counter.update(ids, np.full(100, 500.0), y, now=1)
+        self.assertEqual(100, len(events))
+        self.assertEqual(100, counter.counter['centre-left-to-right'])
+        self.assertEqual(0, counter.counter['far-left-to-right'] + counter.counter['far-right-to-left'])
+
+    def test_expired_track_starts_again(self):
+        self.walk(1, [(-1000, 5000), (-500, 5000)])
+        self.assertListEqual([], self.walk(1, [(500, 5000), (1000, 5000)], start=60))
+
+    def test_load_lines(self):
+        lines = crossings.load_lines(os.path.join(os.path.dirname(__file__), '..', 'zones.example.json'))
+        self.assertListEqual(['footpath'], [line.name for line in lines])
@@ -0,0 +1,103 @@
+import unittest
+import numpy as np
+import debounce
+import PeopleCountingPointCloud
+
+"""
+Unit tests for debouncing zone counts
+"""
+
+SETTLE_FRAMES = 20  # Frames after a person leaves the zone by which the exit must have been seen
+
+
+def noisy_recording(n_passes=30, seed=4):
+    """
+    A recording of point cloud frames with one person at a time walking through the left boundary zone, every 10
+    seconds or so.
+
+    Besides the person there is background clutter in the zone, the odd frame with a burst of clutter points and the odd
+    frame where most of the person's points drop out.
+    """
+    rng = np.random.default_rng(seed)
+    passes = [(start, start + rng.integers(10, 20)) for start in range(50, 100 * n_passes, 100)]
+    frames = []
+    for frame in range(100 * n_passes):
+        n_points = rng.poisson(4)
+        if rng.random() < 0.05:
+            n_points += 12  # burst of clutter
+        if any(start <= frame < end for start, end in passes):
+            n_points += 2 if rng.random() < 0.1 else rng.poisson(20)  # the person, sometimes dropping out
+        y = rng.uniform(3000, 7000, n_points)
+        x = np.tan(np.radians(PeopleCountingPointCloud.MIN_ANGLE)) * y + rng.uniform(-400, 400, n_points)
+        frames.append([[x[i], y[i], 0, 20, 0] for i in range(n_points)])
+    return frames, passes
+
+
+def single_threshold(counts, threshold):
+    """
+    The previous behaviour, changing state on a single frame crossing the threshold.
+    """
+    detected = False
+    events = []
+    for count in counts:
+        if not detected and count > threshold:
+            detected = True
+            events.append('enter')
+        elif detected and count < threshold:
+            detected = False
+            events.append('exit')
+    return events
+
+
+class TestZoneDebouncer(unittest.TestCase):
+
+    def test_needs_n_of_m_frames(self):
+        debouncer = debounce.ZoneDebouncer(['a'], on_threshold=10, off_threshold=5, confirm_frames=3,
+                                           window_frames=5)
+        self.assertListEqual([], debouncer.update([20]))
+        self.assertListEqual([], debouncer.update([0]))
+        self.assertListEqual([], debouncer.update([20]))
+        self.assertListEqual([('a', 'enter')], debouncer.update([20]))
+        self.assertTrue(debouncer.state()['a'])
+
+    def test_hysteresis(self):
+        debouncer = debounce.ZoneDebouncer(['a', 'b'], on_threshold=10, off_threshold=5, confirm_frames=1,
+                                           window_frames=1)
+        self.assertListEqual([('a', 'enter')], debouncer.update([11, 0]))
+        # Between the thresholds nothing changes
+        self.assertListEqual([], debouncer.update([7, 7]))
+        self.assertListEqual([('a', 'exit'), ('b', 'enter')], debouncer.update([4, 11]))
+
+    def test_invalid_thresholds(self):
+        with self.assertRaises(ValueError):
+            debounce.ZoneDebouncer(['a'], on_threshold=5, off_threshold=10)
+        with self.assertRaises(ValueError):
+            debounce.ZoneDebouncer(['a'], confirm_frames=6, window_frames=5)
+
+
+class TestReplay(unittest.TestCase):
+
+    def test_false_event_rate(self):
+        frames, passes = noisy_recording()
+        counter = PeopleCountingPointCloud.CountPeople(':memory:')
+        events = []
+        for frame, points in enumerate(frames):
+            events.extend((frame, zone, action) for zone, action in counter.process_frame(points))
+        self.assertTrue(all(zone == 'left' for _, zone, _ in events))
+        self.assertEqual(counter.counter['left-enter'], counter.counter['left-exit'])
+
+        # Each pass is seen as exactly one enter and one exit. Clutter between the thresholds can hold off the exit for
+        # a while after the person has gone
+        for start, end in passes:
+            actions = [action for frame, _, action in events if start <= frame < end + SETTLE_FRAMES]
+            self.assertListEqual(['enter', 'exit'], actions, f"pass from frame {start} to {end}")
+
+        # The previous single threshold behaviour on the same recording
+        counts = [counter.zones.count(points)['left'] for points in frames]
+        previous = single_threshold(counts, debounce.ON_THRESHOLD)
+
+        # Every event beyond one enter and one exit per pass is a false event
+        debounced_rate = 1000 * (len(events) - 2 * len(passes)) / len(frames)
+        previous_rate = 1000 * (len(previous) - 2 * len(passes)) / len(frames)
+        self.assertLess(debounced_rate, previous_rate)
+        self.assertLess(debounced_rate, previous_rate / 10)
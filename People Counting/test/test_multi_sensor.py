@@ -0,0 +1,85 @@
+import time
+import unittest
+import numpy as np
+import multi_sensor
+import PeopleCountingObjectTracking
+
+"""
+Unit and throughput tests for multi sensor people counting
+"""
+
+
+def obj(tracking_id, x, y):
+    return {'tracking_id': tracking_id, 'x_pos': x, 'y_pos': y}
+
+
+class TestSensorPose(unittest.TestCase):
+
+    def test_to_site(self):
+        pose = multi_sensor.SensorPose(1000, 500, 90)  # facing along the site x axis
+        x, y = pose.to_site(np.array([0.0, 100.0]), np.array([2000.0, 0.0]))
+        np.testing.assert_allclose([3000, 1000], x)
+        np.testing.assert_allclose([500, 400], y)
+
+
+class TestMultiSensorCounter(unittest.TestCase):
+
+    def setUp(self):
+        # Two modules 2m apart, both facing the same way and both seeing the path
+        self.service = multi_sensor.MultiSensorCounter([multi_sensor.SensorPose(0, 0, 0),
+                                                        multi_sensor.SensorPose(2000, 0, 0)],
+                                                       PeopleCountingObjectTracking.CountPeople(':memory:'))
+        self.rng = np.random.default_rng(0)
+
+    def walk(self, people, frames=40):
+        """
+        People walk from x=-3000 to x=3000 (site coordinates), each seen by both modules with their own tracking ID.
+        """
+        for frame in range(frames):
+            now = frame / 10
+            site_x = -3000 + 6000 * frame / (frames - 1)
+            for sensor, pose in enumerate(self.service.poses):
+                objects = [obj(100 * sensor + person, site_x - pose.x + self.rng.normal(0, 50), y)
+                           for person, y in enumerate(people)]
+                self.service.process(sensor, now + sensor * 0.05, objects)
+
+    def test_person_seen_by_two_modules_is_counted_once(self):
+        self.walk([5000])
+        self.assertEqual(1, self.service.counter.counter)
+        self.assertEqual(1, self.service.tracker.next_id)
+
+    def test_people_apart_are_counted_separately(self):
+        self.walk([3000, 5000, 7000])
+        self.assertEqual(3, self.service.counter.counter)
+
+    def test_tracks_only_fed_by_frames_which_update_them(self):
+        # Each person is only seen by one module, the other module's frames don't include them
+        for frame in range(20):
+            now = frame / 10
+            self.service.process(0, now, [obj(1, -3000 + 300 * frame, 3000)])
+            self.service.process(1, now + 0.05, [obj(1, -3000 + 300 * frame, 7000)])
+        crossings = self.service.counter.crossings
+        for site_id in range(2):
+            self.assertEqual(20, crossings.samples[crossings.slots[site_id]])
+
+    def test_throughput(self):
+        n_frames = 2000
+        n_people = 10
+
+        def simulated_sensor(sensor):
+            def get_data():
+                for frame in range(n_frames):
+                    yield [obj(person, -3000 + 6000 * (frame % 100) / 99, 1000 + 800 * person)
+                           for person in range(n_people)]
+            return get_data
+
+        service = multi_sensor.MultiSensorCounter([multi_sensor.SensorPose(0, 0, 0) for _ in range(3)],
+                                                  PeopleCountingObjectTracking.CountPeople(':memory:'))
+        start = time.perf_counter()
+        service.start([simulated_sensor(sensor) for sensor in range(3)])
+        service.run(max_frames=3 * n_frames, timeout=5)
+        elapsed = time.perf_counter() - start
+        service.stop()
+
+        self.assertEqual(3 * n_frames, service.processed)
+        self.assertGreater(service.processed / elapsed, 3 * PeopleCountingObjectTracking.FRAME_RATE)
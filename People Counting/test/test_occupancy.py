@@ -0,0 +1,75 @@
+import os
+import tempfile
+import unittest
+import occupancy
+import PeopleCountingPointCloud
+
+"""
+Unit tests for the occupancy time series
+"""
+
+
+class TestCountStore(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.filename = os.path.join(self.directory.name, 'counts.sqlite')
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def rows(self):
+        store = occupancy.CountStore(self.filename)
+        rows = store.connection.execute('SELECT COUNT(*) FROM counts').fetchone()[0]
+        store.close()
+        return rows
+
+    def test_batches_writes(self):
+        store = occupancy.CountStore(self.filename, window=60, flush_interval=60, clock=lambda: 0)
+        for second in range(59):
+            store.add('people', now=second)
+        self.assertEqual(0, self.rows())  # nothing written yet
+        store.add('people', now=60)  # flush interval reached
+        self.assertEqual(2, self.rows())  # one row for each minute
+        store.add('people', now=61)
+        self.assertEqual(2, self.rows())
+        store.close()
+        self.assertEqual(3, self.rows())
+
+    def test_tick_flushes_without_events(self):
+        store = occupancy.CountStore(self.filename, window=60, flush_interval=60, clock=lambda: 0)
+        store.add('people', now=5)
+        store.tick(now=30)
+        self.assertEqual(0, self.rows())
+        store.tick(now=60)  # no more events, but the flush interval has passed
+        self.assertEqual(1, self.rows())
+        store.close()
+
+    def test_totals_survive_restart(self):
+        store = occupancy.CountStore(self.filename, clock=lambda: 0)
+        store.add('left-enter', now=10)
+        store.add('left-enter', now=20)
+        store.add('right-exit', now=30)
+        self.assertDictEqual({'left-enter': 2, 'right-exit': 1}, store.totals())
+        store.close()
+
+        store = occupancy.CountStore(self.filename)
+        self.assertDictEqual({'left-enter': 2, 'right-exit': 1}, store.totals())
+        store.close()
+
+    def test_series(self):
+        store = occupancy.CountStore(self.filename, window=60, clock=lambda: 0)
+        for second in (0, 59, 60, 3599, 3600, 7300):
+            store.add('people', now=second)
+        self.assertListEqual([(0, 'people', 4), (3600, 'people', 1), (7200, 'people', 1)], store.series(3600))
+        self.assertListEqual([(0, 'people', 2), (60, 'people', 1), (3540, 'people', 1)], store.series(60, end=3600))
+        store.close()
+
+    def test_counter_resumes(self):
+        counter = PeopleCountingPointCloud.CountPeople(self.filename)
+        counter.count('left-enter')
+        counter.exit_handler()
+
+        counter = PeopleCountingPointCloud.CountPeople(self.filename)
+        self.assertEqual(1, counter.counter['left-enter'])
+        counter.exit_handler()
@@ -0,0 +1,90 @@
+import unittest
+import sys
+import tracks
+import PeopleCountingObjectTracking
+
+"""
+Unit and soak tests for track eviction
+"""
+
+
+def obj(tracking_id, x, y):
+    return {'tracking_id': tracking_id, 'x_pos': x, 'y_pos': y}
+
+
+class TestTrackStore(unittest.TestCase):
+
+    def test_expire(self):
+        store = tracks.TrackStore(ttl=5)
+        store.seen(1, now=0)
+        store[1] = 'left'
+        store.seen(2, now=3)
+        store[2] = 'right'
+        self.assertListEqual([], store.expire(now=5))
+        self.assertListEqual([1], store.expire(now=6))
+        self.assertNotIn(1, store)
+        self.assertEqual('right', store[2])
+
+    def test_seen_keeps_track_alive(self):
+        store = tracks.TrackStore(ttl=5)
+        store.seen(1, now=0)
+        store[1] = 'left'
+        store.seen(2, now=1)
+        store.seen(1, now=4)
+        self.assertListEqual([2], store.expire(now=7))
+        self.assertEqual('left', store[1])
+
+    def test_seen_without_value(self):
+        store = tracks.TrackStore(ttl=5)
+        store.seen(1, now=0)
+        self.assertNotIn(1, store)
+        self.assertIsNone(store.get(1))
+        self.assertEqual(1, len(store))
+
+    def test_soak(self):
+        """
+        Feed millions of events for ever changing tracking IDs and check the store does not grow.
+        """
+        store = tracks.TrackStore(ttl=5)
+        sizes = []
+        memory = []
+        for event in range(2000000):
+            now = event / 100  # 100 events per second
+            tracking_id = event // 20  # each track is seen for 20 events
+            store.seen(tracking_id, now)
+            store[tracking_id] = 'left'
+            if event % 100 == 0:
+                store.expire(now)
+            if event % 200000 == 0:
+                sizes.append(len(store))
+                memory.append(sys.getsizeof(store._tracks))
+
+        self.assertLessEqual(max(sizes), 5 * 100 // 20 + 10)
+        self.assertEqual(1, len(set(memory[1:])))  # the dictionary never needs to grow
+
+
+class TestCountPeopleEviction(unittest.TestCase):
+
+    def test_recycled_id_is_not_counted(self):
+        counter = PeopleCountingObjectTracking.CountPeople(':memory:')
+        for x in (-3000, -2500, -2000, -1500):
+            counter.process_frame([obj(1, x, 5000)], now=0)  # walks towards the middle
+        counter.process_frame([], now=60)  # the person leaves and is forgotten
+        for x in (1500, 2000, 2500, 3000):
+            counter.process_frame([obj(1, x, 5000)], now=61)  # a new person is given the same ID on the right
+        self.assertEqual(0, counter.counter)
+
+    def test_soak(self):
+        counter = PeopleCountingObjectTracking.CountPeople(':memory:')
+        sizes = []
+        for frame in range(10000):
+            now = frame / 10  # 10 frames per second
+            # A new person every second, walking across for 3 seconds
+            people = range(max(0, frame // 10 - 2), frame // 10 + 1)
+            frames = [obj(person, -2887 + 2887 * 2 * ((frame - person * 10) / 30), 5000) for person in people]
+            counter.process_frame(frames, now)
+            if frame % 1000 == 0:
+                sizes.append(len(counter.crossings.slots))
+        self.assertLessEqual(max(sizes), (PeopleCountingObjectTracking.TRACK_TTL + 3) * 1 + 2)
+        self.assertLessEqual(len(counter.crossings.samples), 16)  # trajectory rows are reused
+        self.assertEqual(999, counter.counter)
@@ -0,0 +1,127 @@
+import os
+import json
+import tempfile
+import unittest
+from math import tan, radians
+import zones
+import numpy as np
+
+"""
+Unit tests for zones
+"""
+
+
+def loop_count(points, angle, margin):
+    """
+    Reference implementation, counting one point at a time.
+    """
+    count = 0
+    for point in points:
+        x_boundary = tan(radians(angle)) * point[1]
+        if x_boundary - margin < point[0] < x_boundary + margin:
+            count += 1
+    return count
+
+
+class TestZones(unittest.TestCase):
+
+    def test_boundary(self):
+        zone = zones.BoundaryZone('left', -30, 500, 8000)
+        x = np.array([-2887, -2500, 0, -2887])
+        y = np.array([5000, 5000, 5000, 9000])
+        self.assertListEqual([True, True, False, False], zone.contains(x, y).tolist())
+
+    def test_sector(self):
+        zone = zones.SectorZone('centre', -10, 10, 2000, 6000)
+        x = np.array([0, 0, 0, 500, 2000])
+        y = np.array([1000, 3000, 7000, 5000, 3000])
+        self.assertListEqual([False, True, False, True, False], zone.contains(x, y).tolist())
+
+    def test_polygon(self):
+        zone = zones.PolygonZone('l-shape', [[0, 0], [2, 0], [2, 1], [1, 1], [1, 2], [0, 2]])
+        x = np.array([0.5, 1.5, 1.5, 0.5, 3])
+        y = np.array([0.5, 0.5, 1.5, 1.5, 0.5])
+        self.assertListEqual([True, True, False, True, False], zone.contains(x, y).tolist())
+
+    def test_line(self):
+        zone = zones.LineZone('crossing', [-1000, 3000], [1000, 3000], 400)
+        x = np.array([0, 0, 1100, 1300])
+        y = np.array([3100, 3300, 3000, 3000])
+        self.assertListEqual([True, False, True, False], zone.contains(x, y).tolist())
+
+    def test_missing_override(self):
+        class NoBounds(zones.Zone):
+            def params(self):
+                return np.zeros(1)
+
+            @staticmethod
+            def test(p, x, y):
+                return np.zeros(len(x), dtype=bool)
+
+        with self.assertRaises(TypeError):
+            NoBounds('incomplete')
+
+
+class TestZoneIndex(unittest.TestCase):
+
+    def test_count(self):
+        index = zones.ZoneIndex([zones.BoundaryZone('left', -30, 500, 8000),
+                                 zones.BoundaryZone('right', 30, 500, 8000)])
+        points = [[-2887, 5000, 0, 10, 0],  # on the left boundary
+                  [-2500, 5000, 0, 10, 0],  # inside the left margin
+                  [0, 5000, 0, 10, 0],  # in the middle
+                  [2887, 5000, 0, 10, 0]]  # on the right boundary
+        self.assertDictEqual({'left': 2, 'right': 1}, index.count(points))
+
+    def test_empty_frame(self):
+        index = zones.ZoneIndex([zones.BoundaryZone('left', -30, 500, 8000)])
+        self.assertDictEqual({'left': 0}, index.count([]))
+
+    def test_matches_loop(self):
+        rng = np.random.default_rng(0)
+        points = np.column_stack((rng.uniform(-5000, 5000, 2000), rng.uniform(0, 8000, 2000), np.zeros((2000, 3))))
+        definitions = {'a': (-30, 500), 'b': (30, 500), 'c': (0, 250), 'd': (-10, 1000)}
+        index = zones.ZoneIndex([zones.BoundaryZone(name, angle, margin, 8000)
+                                 for name, (angle, margin) in definitions.items()], cell_size=300)
+        counts = index.count(points)
+        for name, (angle, margin) in definitions.items():
+            self.assertEqual(loop_count(points.tolist(), angle, margin), counts[name])
+
+    def test_locate_matches_contains(self):
+        rng = np.random.default_rng(1)
+        x = rng.uniform(-6000, 6000, 5000)
+        y = rng.uniform(-500, 9000, 5000)
+        zone_list = [zones.SectorZone('s', -20, 5, 1000, 7000),
+                     zones.PolygonZone('p', [[-3000, 2000], [0, 6000], [2000, 1000]]),
+                     zones.LineZone('l', [-4000, 4000], [4000, 5000], 600),
+                     zones.BoundaryZone('b', 30, 500, 8000)]
+        for grid_min_zones in (0, len(zone_list) + 1):  # with and without the grid
+            index = zones.ZoneIndex(zone_list, cell_size=700, grid_min_zones=grid_min_zones)
+            self.assertEqual(grid_min_zones == 0, index.use_grid)
+            points, zone_indexes = index.locate(x, y)
+            for zone_index, zone in enumerate(zone_list):
+                expected = np.flatnonzero(zone.contains(x, y))
+                self.assertListEqual(expected.tolist(), sorted(points[zone_indexes == zone_index].tolist()))
+
+    def test_grid_and_broadcast_counts_match(self):
+        rng = np.random.default_rng(2)
+        points = np.column_stack((rng.uniform(-5000, 5000, 3000), rng.uniform(0, 9000, 3000), np.zeros((3000, 3))))
+        tiles = [zones.PolygonZone(f"{x}-{y}", [[x, y], [x + 2500, y], [x + 2500, y + 2500], [x, y + 2500]])
+                 for x in range(-5000, 5000, 2500) for y in range(0, 10000, 2500)]
+        grid = zones.ZoneIndex(tiles, cell_size=2500, grid_min_zones=0)
+        broadcast = zones.ZoneIndex(tiles, grid_min_zones=len(tiles) + 1)
+        self.assertDictEqual(broadcast.count(points), grid.count(points))
+        self.assertEqual(len(points), sum(grid.count(points).values()))
+
+    def test_load_zones(self):
+        index = zones.load_zones(os.path.join(os.path.dirname(__file__), '..', 'zones.example.json'))
+        self.assertListEqual(['left', 'right', 'centre', 'doorway', 'crossing'], index.names)
+        self.assertEqual(1, index.count([[0, 4500, 0, 0, 0]])['doorway'])
+
+    def test_load_unknown_zone(self):
+        with tempfile.TemporaryDirectory() as directory:
+            filename = os.path.join(directory, 'zones.json')
+            with open(filename, 'w') as f:
+                json.dump({'zones': [{'name': 'circle', 'type': 'circle'}]}, f)
+            with self.assertRaises(ValueError):
+                zones.load_zones(filename)
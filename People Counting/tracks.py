@@ -0,0 +1,95 @@
+import time
+from collections import OrderedDict
+
+"""
+Per track state which is forgotten once a track has not been seen for a while.
+
+The sensor recycles tracking IDs, so state kept for an ID which has not been seen recently must be dropped, otherwise a
+new person given the same ID inherits it (and a long running counter grows without bound).
+"""
+
+TRACK_TTL = 5  # Number of seconds after a track was last seen that it is forgotten
+
+
+class TrackStore:
+    """
+    Dictionary of per track values which expire when a track has not been seen for `ttl` seconds.
+
+    Tracks are kept in the order they were last seen, so the oldest are always at the front and expiring them is O(1)
+    amortised. A track which has been seen but not given a value is treated as not being in the store.
+    """
+
+    def __init__(self, ttl=TRACK_TTL, clock=time.monotonic, on_expire=None):
+        """
+        :param ttl: Seconds after a track was last seen that it is forgotten
+        :param clock: Function returning the current time in seconds
+        :param on_expire: Function called with (tracking_id, value) when a track is forgotten
+        """
+        self.ttl = ttl
+        self.clock = clock
+        self.on_expire = on_expire
+        self._tracks = OrderedDict()  # In the form {<tracking id>: [<last seen>, <value>]}
+
+    def seen(self, tracking_id, now=None):
+        """
+        Record that a track has been seen.
+
+        :param tracking_id: Tracking ID of the object
+        :param now: Current time (seconds). Defaults to the clock
+        """
+        now = self.clock() if now is None else now
+        entry = self._tracks.get(tracking_id)
+        if entry is None:
+            self._tracks[tracking_id] = [now, None]
+        else:
+            entry[0] = now
+            self._tracks.move_to_end(tracking_id)
+
+    def expire(self, now=None):
+        """
+        Forget every track which has not been seen within the TTL.
+
+        :param now: Current time (seconds). Defaults to the clock
+        :return: List of the tracking IDs which were forgotten
+        :rtype: list
+        """
+        now = self.clock() if now is None else now
+        expired = []
+        while self._tracks:
+            tracking_id, (last_seen, value) = next(iter(self._tracks.items()))
+            if now - last_seen <= self.ttl:
+                break
+            self._tracks.popitem(last=False)
+            expired.append(tracking_id)
+            if self.on_expire is not None:
+                self.on_expire(tracking_id, value)
+        return expired
+
+    def get(self, tracking_id, default=None):
+        entry = self._tracks.get(tracking_id)
+        return default if entry is None or entry[1] is None else entry[1]
+
+    def items(self):
+        """
+        :return: (tracking id, value) for every track which has a value, oldest first
+        """
+        return [(tracking_id, entry[1]) for tracking_id, entry in self._tracks.items() if entry[1] is not None]
+
+    def __setitem__(self, tracking_id, value):
+        entry = self._tracks.get(tracking_id)
+        if entry is None:
+            self._tracks[tracking_id] = [self.clock(), value]
+        else:
+            entry[1] = value
+
+    def __getitem__(self, tracking_id):
+        value = self.get(tracking_id)
+        if value is None:
+            raise KeyError(tracking_id)
+        return value
+
+    def __contains__(self, tracking_id):
+        return self.get(tracking_id) is not None
+
+    def __len__(self):
+        return len(self._tracks)
@@ -0,0 +1,402 @@
+import json
+from abc import ABC, abstractmethod
+from math import tan, radians, sin, cos
+from itertools import chain
+import numpy as np
+
+"""
+Zones used for counting people.
+
+Zones may be boundary bands, sectors, polygons or lines and can be loaded from a JSON file (see zones.example.json).
+All the points in a frame are classified at once using NumPy. With only a few zones every point is tested against every
+zone in one broadcast. With many zones the points are looked up in a grid of buckets covering the zones instead, so each
+point is only tested against the zones whose bounding box overlaps its bucket.
+"""
+
+CELL_SIZE = 500  # Size of each grid bucket (mm)
+GRID_MIN_ZONES = 16  # Number of zones from which the grid is used (see benchmark_zones.py for the crossover)
+
+
+class Zone(ABC):
+    """
+    Base class which all zones inherit.
+
+    Each type of zone describes itself with a row of parameters so that the ZoneIndex can test points against many
+    zones of the same type in one vectorized call to test().
+    """
+
+    def __init__(self, name):
+        self.name = name
+
+    def contains(self, x, y):
+        """
+        Test which points are inside the zone.
+
+        :param x: Array of x coordinates
+        :param y: Array of y coordinates
+        :return: Boolean array, True where the point is inside the zone
+        :rtype: ndarray
+        """
+        x = np.asarray(x, dtype=float)
+        return self.test(self.params()[None, :], x, np.asarray(y, dtype=float))
+
+    @abstractmethod
+    def params(self):
+        """
+        :return: The parameters describing the zone
+        :rtype: ndarray
+        """
+
+    @abstractmethod
+    def bounds(self):
+        """
+        :return: Bounding box of the zone in the form (x_min, y_min, x_max, y_max)
+        :rtype: tuple
+        """
+
+    @staticmethod
+    def stack(params):
+        """
+        Stack the parameters of several zones of this type into one array.
+
+        :param params: List of arrays as returned by params()
+        :rtype: ndarray
+        """
+        return np.vstack(params)
+
+    @staticmethod
+    @abstractmethod
+    def test(p, x, y):
+        """
+        Test points against zones of this type.
+
+        :param p: Parameters of the zone to test each point against, one row per point (or a single row). Given
+            parameters of shape (zones, 1, parameters) every point is tested against every zone
+        :param x: Array of x coordinates
+        :param y: Array of y coordinates
+        :return: Boolean array, True where the point is inside its zone, of shape (zones, points) when testing every
+            point against every zone
+        :rtype: ndarray
+        """
+
+
+class BoundaryZone(Zone):
+    """
+    A band either side of a line running out from the sensor at an angle.
+    """
+
+    def __init__(self, name, angle, margin, max_distance):
+        """
+        :param angle: Angle of the boundary line (degrees)
+        :param margin: Distance either side of the boundary line (in x) which is inside the zone (mm)
+        :param max_distance: Furthermost distance of the zone (mm)
+        """
+        Zone.__init__(self, name)
+        self.angle_tan = tan(radians(angle))
+        self.margin = margin
+        self.max_distance = max_distance
+
+    def params(self):
+        return np.array([self.angle_tan, self.margin, self.max_distance], dtype=float)
+
+    @staticmethod
+    def test(p, x, y):
+        return (np.abs(x - p[..., 0] * y) < p[..., 1]) & (y >= 0) & (y <= p[..., 2])
+
+    def bounds(self):
+        x_end = self.angle_tan * self.max_distance
+        return (min(0, x_end) - self.margin, 0, max(0, x_end) + self.margin, self.max_distance)
+
+
+class SectorZone(Zone):
+    """
+    The area between two angles and two distances from the sensor.
+    """
+
+    def __init__(self, name, min_angle, max_angle, min_distance, max_distance):
+        """
+        :param min_angle: Minimum angle (degrees)
+        :param max_angle: Maximum angle (degrees)
+        :param min_distance: Closest distance (mm)
+        :param max_distance: Furthermost distance (mm)
+        """
+        Zone.__init__(self, name)
+        self.min_angle = min(min_angle, max_angle)
+        self.max_angle = max(min_angle, max_angle)
+        self.min_distance = min_distance
+        self.max_distance = max_distance
+
+    def params(self):
+        return np.array([self.min_angle, self.max_angle, self.min_distance, self.max_distance], dtype=float)
+
+    @staticmethod
+    def test(p, x, y):
+        angle = np.degrees(np.arctan2(x, y))  # angle from the y axis, positive to the right
+        distance = np.hypot(x, y)
+        return (angle >= p[..., 0]) & (angle <= p[..., 1]) & (distance >= p[..., 2]) & (distance <= p[..., 3])
+
+    def bounds(self):
+        # The extremes lie at the ends of the arcs or where an arc crosses an axis
+        angles = [self.min_angle, self.max_angle] + [a for a in (-90, 0, 90) if self.min_angle < a < self.max_angle]
+        xs = [r * sin(radians(a)) for a in angles for r in (self.min_distance, self.max_distance)]
+        ys = [r * cos(radians(a)) for a in angles for r in (self.min_distance, self.max_distance)]
+        return min(xs), min(ys), max(xs), max(ys)
+
+
+class PolygonZone(Zone):
+    """
+    The area inside a polygon.
+    """
+
+    def __init__(self, name, points):
+        """
+        :param points: Vertices of the polygon in the form [[x, y], ...]
+        """
+        Zone.__init__(self, name)
+        self.points = np.asarray(points, dtype=float)
+
+    def params(self):
+        return self.points.ravel()
+
+    @staticmethod
+    def stack(params):
+        # Pad shorter polygons by repeating their last vertex. The extra edges have no length so never cross a ray.
+        n_values = max(len(p) for p in params)
+        return np.vstack([np.concatenate((p, np.tile(p[-2:], (n_values - len(p)) // 2))) for p in params])
+
+    @staticmethod
+    def test(p, x, y):
+        # Even-odd rule, casting a ray in the +x direction from each point
+        inside = np.zeros(np.broadcast_shapes(p[..., 0].shape, np.shape(x)), dtype=bool)
+        x1, y1 = p[..., -2], p[..., -1]
+        for i in range(0, p.shape[-1], 2):
+            x2, y2 = p[..., i], p[..., i + 1]
+            crosses = (y1 > y) != (y2 > y)
+            with np.errstate(divide='ignore', invalid='ignore'):
+                x_cross = x1 + (y - y1) * (x2 - x1) / (y2 - y1)
+            inside ^= crosses & (x < x_cross)
+            x1, y1 = x2, y2
+        return inside
+
+    def bounds(self):
+        x_min, y_min = self.points.min(axis=0)
+        x_max, y_max = self.points.max(axis=0)
+        return x_min, y_min, x_max, y_max
+
+
+class LineZone(Zone):
+    """
+    A line to cross, the zone being every point within half the width of the line.
+    """
+
+    def __init__(self, name, start, end, width):
+        """
+        :param start: Start of the line [x, y]
+        :param end: End of the line [x, y]
+        :param width: Width of the line (mm)
+        """
+        Zone.__init__(self, name)
+        self.start = np.asarray(start, dtype=float)
+        self.end = np.asarray(end, dtype=float)
+        self.width = width
+
+    def params(self):
+        return np.concatenate((self.start, self.end, [self.width]))
+
+    @staticmethod
+    def test(p, x, y):
+        dx_line = p[..., 2] - p[..., 0]
+        dy_line = p[..., 3] - p[..., 1]
+        length_sq = np.maximum(dx_line * dx_line + dy_line * dy_line, 1e-9)
+        # Position of the closest point along the line, clamped to the ends
+        t = np.clip(((x - p[..., 0]) * dx_line + (y - p[..., 1]) * dy_line) / length_sq, 0, 1)
+        dx = x - (p[..., 0] + t * dx_line)
+        dy = y - (p[..., 1] + t * dy_line)
+        return dx * dx + dy * dy <= (p[..., 4] / 2) ** 2
+
+    def bounds(self):
+        half_width = self.width / 2
+        x_min, y_min = np.minimum(self.start, self.end) - half_width
+        x_max, y_max = np.maximum(self.start, self.end) + half_width
+        return x_min, y_min, x_max, y_max
+
+
+ZONE_TYPES = {
+    'boundary': lambda d: BoundaryZone(d['name'], d['angle'], d['margin'], d['max_distance']),
+    'sector': lambda d: SectorZone(d['name'], d['min_angle'], d['max_angle'], d['min_distance'], d['max_distance']),
+    'polygon': lambda d: PolygonZone(d['name'], d['points']),
+    'line': lambda d: LineZone(d['name'], d['start'], d['end'], d['width']),
+}
+
+
+def load_zones(filename):
+    """
+    Load zones from a JSON file.
+
+    The file is in the form {"cell_size": 500, "zones": [{"name": "door", "type": "polygon", ...}, ...]}
+    See zones.example.json for the parameters of each type of zone.
+
+    :param filename: Path to the file
+    :return: A ZoneIndex of the zones
+    :rtype: ZoneIndex
+    """
+    with open(filename) as f:
+        config = json.load(f)
+
+    zones = []
+    for definition in config['zones']:
+        if definition.get('type') not in ZONE_TYPES:
+            raise ValueError("Zone '{}' has an unknown type '{}'".format(definition.get('name'),
+                                                                         definition.get('type')))
+        zones.append(ZONE_TYPES[definition['type']](definition))
+    return ZoneIndex(zones, config.get('cell_size', CELL_SIZE))
+
+
+class ZoneIndex:
+    """
+    Finds which zones points are in.
+
+    With fewer than grid_min_zones zones every point is tested against every zone in one broadcast, which has the
+    lowest fixed cost. With more, a grid of buckets is built, each holding the zones whose bounding box overlaps it
+    (stored in compressed sparse row form), so the cost of a lookup depends on the number of points and how many zones
+    overlap rather than the total number of zones.
+    """
+
+    def __init__(self, zones, cell_size=CELL_SIZE, grid_min_zones=GRID_MIN_ZONES):
+        """
+        :param zones: List of Zone objects
+        :param cell_size: Size of each grid bucket (mm)
+        :param grid_min_zones: Number of zones from which the grid is used
+        """
+        self.zones = list(zones)
+        self.names = [zone.name for zone in self.zones]
+        self.cell_size = float(cell_size)
+        self.use_grid = len(self.zones) >= grid_min_zones
+
+        # Zones are tested a type at a time, so number each zone within its type
+        self.types = []  # In the form [(<zone class>, <stacked parameters>, <zone indexes>), ...]
+        self.zone_type = np.zeros(len(self.zones), dtype=int)
+        self.zone_row = np.zeros(len(self.zones), dtype=int)
+        for zone_class in dict.fromkeys(type(zone) for zone in self.zones):
+            members = [i for i, zone in enumerate(self.zones) if type(zone) is zone_class]
+            self.zone_type[members] = len(self.types)
+            self.zone_row[members] = np.arange(len(members))
+            self.types.append((zone_class, zone_class.stack([self.zones[i].params() for i in members]),
+                               np.array(members)))
+
+        if self.use_grid:
+            self._build_grid()
+
+    def _build_grid(self):
+        bounds = np.array([zone.bounds() for zone in self.zones], dtype=float).reshape(-1, 4)
+        self.origin = bounds[:, :2].min(axis=0) if len(bounds) else np.zeros(2)
+        extent = bounds[:, 2:].max(axis=0) - self.origin if len(bounds) else np.zeros(2)
+        self.shape = np.floor(extent / self.cell_size).astype(int) + 1
+
+        buckets = [[] for _ in range(int(self.shape.prod()))]
+        for index, (x_min, y_min, x_max, y_max) in enumerate(bounds):
+            ix_min, iy_min = self._cell(x_min, y_min)
+            ix_max, iy_max = self._cell(x_max, y_max)
+            for ix in range(ix_min, ix_max + 1):
+                for iy in range(iy_min, iy_max + 1):
+                    buckets[ix * self.shape[1] + iy].append(index)
+
+        self.bucket_start = np.cumsum([0] + [len(bucket) for bucket in buckets])
+        self.bucket_zones = np.array(list(chain.from_iterable(buckets)), dtype=int)
+
+    def _cell(self, x, y):
+        ix = min(max(int((x - self.origin[0]) // self.cell_size), 0), self.shape[0] - 1)
+        iy = min(max(int((y - self.origin[1]) // self.cell_size), 0), self.shape[1] - 1)
+        return ix, iy
+
+    def inside(self, x, y):
+        """
+        Test every point against every zone.
+
+        :param x: Array of x coordinates
+        :param y: Array of y coordinates
+        :return: Boolean array of shape (zones, points), True where the point is inside the zone
+        :rtype: ndarray
+        """
+        x = np.asarray(x, dtype=float)
+        y = np.asarray(y, dtype=float)
+        inside = np.empty((len(self.zones), len(x)), dtype=bool)
+        for zone_class, params, members in self.types:
+            inside[members] = zone_class.test(params[:, None, :], x, y)
+        return inside
+
+    def locate(self, x, y):
+        """
+        Find which zones each point is in.
+
+        :param x: Array of x coordinates
+        :param y: Array of y coordinates
+        :return: Two arrays (point indexes, zone indexes), one entry for every point which is inside a zone
+        :rtype: tuple
+        """
+        if not self.use_grid:
+            zones, points = np.nonzero(self.inside(x, y))
+            return points, zones
+
+        x = np.asarray(x, dtype=float)
+        y = np.asarray(y, dtype=float)
+        ix = np.floor((x - self.origin[0]) / self.cell_size).astype(int)
+        iy = np.floor((y - self.origin[1]) / self.cell_size).astype(int)
+        on_grid = np.flatnonzero((ix >= 0) & (ix < self.shape[0]) & (iy >= 0) & (iy < self.shape[1]))
+        cells = ix[on_grid] * self.shape[1] + iy[on_grid]
+
+        # Expand every point into one candidate pair per zone in its bucket
+        starts = self.bucket_start[cells]
+        lengths = self.bucket_start[cells + 1] - starts
+        pair_points = np.repeat(on_grid, lengths)
+        offsets = np.arange(len(pair_points)) - np.repeat(np.cumsum(lengths) - lengths, lengths)
+        pair_zones = self.bucket_zones[np.repeat(starts, lengths) + offsets]
+
+        # Test the candidates a type of zone at a time, each against the parameters of its own zone
+        inside = np.zeros(len(pair_points), dtype=bool)
+        pair_types = self.zone_type[pair_zones]
+        for type_index, (zone_class, params, _) in enumerate(self.types):
+            pairs = np.flatnonzero(pair_types == type_index) if len(self.types) > 1 else np.arange(len(pair_points))
+            if len(pairs) == 0:
+                continue
+            points = pair_points[pairs]
+            inside[pairs] = zone_class.test(params[self.zone_row[pair_zones[pairs]]], x[points], y[points])
+
+        return pair_points[inside], pair_zones[inside]
+
+    def count(self, points):
+        """
+        Count the number of points in each zone.
+
+        :param points: Points in the form [[x, y, z, intensity, velocity], ...]
+        :type points: list or ndarray
+        :return: Counts in the form {<name>: <count>, ...}
+        :rtype: dict
+        """
+        if len(points) == 0:
+            return dict.fromkeys(self.names, 0)
+        points = as_array(points)
+
+        if self.use_grid:
+            _, zones = self.locate(points[:, 0], points[:, 1])
+            counts = np.bincount(zones, minlength=len(self.zones))
+        else:
+            counts = np.count_nonzero(self.inside(points[:, 0], points[:, 1]), axis=1)
+        return dict(zip(self.names, counts.tolist()))
+
+
+def as_array(points):
+    """
+    Convert a frame of points to a 2D NumPy array.
+
+    Flattening the rows and reading them with fromiter is around twice as fast as np.asarray for the list of lists
+    returned by the RadarIQ module.
+
+    :param points: Points in the form [[x, y, z, intensity, velocity], ...]
+    :type points: list or ndarray
+    :rtype: ndarray
+    """
+    if isinstance(points, np.ndarray):
+        return points
+    width = len(points[0])
+    return np.fromiter(chain.from_iterable(points), dtype=float, count=len(points) * width).reshape(-1, width)
@@ -0,0 +1,79 @@
+import io
+import timeit
+from contextlib import redirect_stdout
+import numpy as np
+import matplotlib
+matplotlib.use('Agg')
+import matplotlib.pyplot as plt
+import speed
+
+"""
+Benchmark of Visualize.update_plot for synthetic point cloud frames of different sizes.
+
+Compares the previous implementation (list comprehensions, np.c_ and printing every frame) with the current one, for
+frames given as lists (OUTPUT_LIST) and as arrays (OUTPUT_NUMPY). Also compares the time to draw the latest frame as a
+scatter plot with the time to draw the range-Doppler histogram (the artists which are redrawn each frame when blitting).
+
+Usage: python benchmark_update_plot.py
+"""
+
+FRAME_SIZES = [16, 64, 256, 1024, 4096]
+REPEATS = 500
+DRAW_REPEATS = 50
+
+
+def previous_update_plot(scat, frame):
+    """
+    The original update_plot.
+    """
+    ys = [row[1] for row in frame]
+    vs = [row[4] for row in frame]
+    data = np.c_[ys, vs]
+    print(data)
+    scat.set_offsets(data)
+
+
+def synthetic_frame(n, rng):
+    """
+    Frame of n points in the form [[x, y, z, intensity, velocity], ...].
+    """
+    return np.column_stack((rng.uniform(-1000, 1000, n), rng.uniform(10, speed.MAX_DISTANCE, n),
+                            rng.uniform(-500, 500, n), rng.uniform(0, 50, n), rng.uniform(-3000, 3000, n)))
+
+
+def main():
+    rng = np.random.default_rng(0)
+    vis = speed.Visualize()
+    vis.fig, ax = plt.subplots()
+    vis.scat = ax.scatter([], [])
+    vis.image = ax.imshow(vis.histogram.grid, origin='lower', extent=vis.histogram.extent(), aspect='auto',
+                          interpolation='nearest')
+    stdout = io.StringIO()  # the printing is still paid for, without flooding the terminal
+
+    print(f"{'points':>8} {'previous (ms)':>14} {'list (ms)':>10} {'array (ms)':>11}")
+    for n in FRAME_SIZES:
+        array = synthetic_frame(n, rng)
+        frame = array.tolist()
+        with redirect_stdout(stdout):
+            previous_ms = timeit.timeit(lambda: previous_update_plot(vis.scat, frame), number=REPEATS) / REPEATS * 1000
+        stdout.seek(0)
+        stdout.truncate()
+        list_ms = timeit.timeit(lambda: vis.update_plot(frame), number=REPEATS) / REPEATS * 1000
+        array_ms = timeit.timeit(lambda: vis.update_plot(array), number=REPEATS) / REPEATS * 1000
+        print(f"{n:>8} {previous_ms:>14.3f} {list_ms:>10.3f} {array_ms:>11.3f}")
+
+    # Drawing: one scatter marker per point against one image whatever the number of points
+    print()
+    print(f"{'points':>8} {'scatter draw (ms)':>18} {'histogram draw (ms)':>20}")
+    vis.fig.canvas.draw()
+    renderer = vis.fig.canvas.get_renderer()
+    for n in FRAME_SIZES:
+        vis.update_plot(synthetic_frame(n, rng))
+        vis.scat.set_offsets(vis.offsets[:n])
+        scatter_ms = timeit.timeit(lambda: vis.scat.draw(renderer), number=DRAW_REPEATS) / DRAW_REPEATS * 1000
+        histogram_ms = timeit.timeit(lambda: vis.image.draw(renderer), number=DRAW_REPEATS) / DRAW_REPEATS * 1000
+        print(f"{n:>8} {scatter_ms:>18.2f} {histogram_ms:>20.2f}")
+
+
+if __name__ == '__main__':
+    main()
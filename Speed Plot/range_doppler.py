@@ -0,0 +1,61 @@
+import numpy as np
+
+"""
+Range-Doppler histogram: how many points have been seen at each distance and velocity, fading over time.
+
+The histogram is one preallocated NumPy grid. Each frame the grid is decayed in place and the frame's points are binned
+into it, so it keeps the recent history without storing any points.
+"""
+
+DISTANCE_BINS = 100  # Number of bins along the distance axis
+VELOCITY_BINS = 120  # Number of bins along the velocity axis
+HALF_LIFE = 2  # Time for the count in a bin to fade to half (seconds)
+
+
+class RangeDoppler:
+    """
+    Exponentially decaying 2D histogram of distance against velocity.
+    """
+
+    def __init__(self, distance_range, velocity_range, distance_bins=DISTANCE_BINS, velocity_bins=VELOCITY_BINS,
+                 half_life=HALF_LIFE, frame_rate=10):
+        """
+        :param distance_range: (min, max) distance covered (mm)
+        :param velocity_range: (min, max) velocity covered (mm/s)
+        :param distance_bins: Number of bins along the distance axis
+        :param velocity_bins: Number of bins along the velocity axis
+        :param half_life: Time for the count in a bin to fade to half (seconds). 0 to only show the latest frame
+        :param frame_rate: Frames per second, used to work out how much to decay each frame
+        """
+        self.distance_range = distance_range
+        self.velocity_range = velocity_range
+        self.distance_scale = distance_bins / (distance_range[1] - distance_range[0])
+        self.velocity_scale = velocity_bins / (velocity_range[1] - velocity_range[0])
+        self.decay = 0.5 ** (1 / (half_life * frame_rate)) if half_life > 0 else 0
+        self.grid = np.zeros((velocity_bins, distance_bins))  # One row per velocity bin, for imshow
+        self._flat = self.grid.reshape(-1)
+
+    def add(self, distances, velocities):
+        """
+        Decay the histogram and add a frame of points to it.
+
+        :param distances: Array of the distances of the points (mm)
+        :param velocities: Array of the velocities of the points (mm/s)
+        """
+        self.grid *= self.decay
+        column = ((distances - self.distance_range[0]) * self.distance_scale).astype(int)
+        row = ((velocities - self.velocity_range[0]) * self.velocity_scale).astype(int)
+        rows, columns = self.grid.shape
+        inside = (column >= 0) & (column < columns) & (row >= 0) & (row < rows) & \
+                 (distances >= self.distance_range[0]) & (velocities >= self.velocity_range[0])
+        np.add.at(self._flat, row[inside] * columns + column[inside], 1)
+
+    def extent(self):
+        """
+        :return: The area covered by the histogram in the form (left, right, bottom, top), for imshow
+        :rtype: tuple
+        """
+        return self.distance_range + self.velocity_range
+
+    def clear(self):
+        self.grid[:] = 0
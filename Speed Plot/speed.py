@@ -1,11 +1,19 @@
 import matplotlib.lines as mlines
-from radariq import RadarIQ, MODE_POINT_CLOUD, OUTPUT_LIST
+import numpy as np
+from radariq import RadarIQ, MODE_POINT_CLOUD, OUTPUT_NUMPY
 import matplotlib.pyplot as plt
 from matplotlib import animation
-from numpy import c_
+from frame_reader import FrameReader, RenderRate
+from range_doppler import RangeDoppler
 
 """
 Demonstration program plotting the doppler velocity against x position
+
+The points are added to a range-Doppler histogram which fades over HALF_LIFE seconds, so recent movement stays visible
+rather than only the latest frame. Set SHOW_POINTS to also draw the points of the latest frame.
+
+The sensor is read in a background thread and the window is redrawn with the latest frame every RENDER_INTERVAL, so it
+stays responsive however slowly the frames arrive.
 """
 
 FRAME_RATE = 10  # frames per second
@@ -14,6 +22,13 @@ MAX_DISTANCE = 2000  # Furthermost distance to look (mm)
 MIN_ANGLE = -45  # Minimum angle to look - focus right in front of the sensor
 MAX_ANGLE = 45  # Maximum angle to look - focus right in front of the sensor
 SENSITIVITY = 8 # Low sensitivity
+RENDER_INTERVAL = 50  # Time between redraws of the window (ms)
+MAX_POINTS = 1024  # Number of points to allocate space for initially (grows as needed)
+DEBUG = False  # Print the points of every frame
+MIN_VELOCITY = -3000  # Lowest velocity shown (mm/s)
+MAX_VELOCITY = 3000  # Highest velocity shown (mm/s)
+HALF_LIFE = 2  # Time for the history in the histogram to fade to half (seconds)
+SHOW_POINTS = False  # Draw the points of the latest frame over the histogram
 
 
 class Visualize:
@@ -26,7 +41,13 @@ class Visualize:
         self.fig = None
         self.anim = None
         self.scat = None
-        self.data = [[], []]
+        self.image = None
+        self.histogram = RangeDoppler((0, MAX_DISTANCE), (MIN_VELOCITY, MAX_VELOCITY), half_life=HALF_LIFE,
+                                      frame_rate=FRAME_RATE)
+        self.status = None
+        self.reader = None
+        self.render_rate = RenderRate()
+        self.offsets = np.zeros((MAX_POINTS, 2))  # Reused every frame, in the form [[<distance>, <velocity>], ...]
 
     def start(self):
         """
@@ -48,7 +69,7 @@ class Visualize:
         """
 
         try:
-            self.riq = RadarIQ(output_format=OUTPUT_LIST)
+            self.riq = RadarIQ(output_format=OUTPUT_NUMPY)
             self.riq.set_mode(MODE_POINT_CLOUD)
             self.riq.set_units('mm', 'mm/s')
             self.riq.set_frame_rate(FRAME_RATE)
@@ -60,35 +81,59 @@ class Visualize:
             print(error)
 
     def start_animation(self):
-        frame_speed = (1000 / FRAME_RATE) / 2  # run the animation faster than the module
         self.fig, ax = plt.subplots()
         plt.subplots_adjust(bottom=0.2)
 
-        ax.axis([0, MAX_DISTANCE, -3000, 3000])
+        ax.axis([0, MAX_DISTANCE, MIN_VELOCITY, MAX_VELOCITY])
         ax.set_ylabel(f"Velocity (m/s)")
         ax.set_xlabel(f"Distance from Sensor (mm)")
 
         line1 = mlines.Line2D([0, MAX_DISTANCE], [0, 0], color="silver", linewidth=1)
         ax.add_line(line1)
 
-        self.scat = ax.scatter([], [])
+        self.image = ax.imshow(self.histogram.grid, origin='lower', extent=self.histogram.extent(), aspect='auto',
+                               cmap='viridis', interpolation='nearest')
+        self.scat = ax.scatter([], [], s=10, color='white', visible=SHOW_POINTS)
+        self.status = ax.text(0.02, 0.97, '', transform=ax.transAxes, va='top', fontsize=8, color='grey')
+
         self.riq.start()
-        self.anim = animation.FuncAnimation(self.fig, self.update_plot, frames=self.riq.get_data, interval=frame_speed,
-                                            init_func=self.init_plot, blit=True)
+        self.reader = FrameReader(self.riq.get_data)
+        self.reader.start()
+        self.anim = animation.FuncAnimation(self.fig, self.animate, interval=RENDER_INTERVAL, init_func=self.init_plot,
+                                            blit=True, cache_frame_data=False)
         plt.show()
 
     def init_plot(self):
-        return self.scat,
+        return self.image, self.scat, self.status
+
+    def animate(self, i):
+        """
+        Redraw the window with the latest frame, if a new one has arrived.
+        """
+        frame, _ = self.reader.take()
+        artists = self.update_plot(frame)
+        self.render_rate.tick()
+        self.status.set_text(self.render_rate.label(self.reader))
+        return artists + (self.status,)
 
     def update_plot(self, frame):
         if frame is not None:
-            ys = [row[1] for row in frame]
-            vs = [row[4] for row in frame]
-            data = c_[ys, vs]
-            print(data)
-            self.scat.set_offsets(data)
-
-        return self.scat,
+            frame = np.asarray(frame, dtype=float).reshape(-1, 5)  # rows of [x, y, z, intensity, velocity]
+            n_points = len(frame)
+            if n_points > len(self.offsets):
+                self.offsets = np.zeros((2 * n_points, 2))
+            self.offsets[:n_points, 0] = frame[:, 1]
+            self.offsets[:n_points, 1] = frame[:, 4]
+            if DEBUG:
+                print(self.offsets[:n_points])
+
+            self.histogram.add(self.offsets[:n_points, 0], self.offsets[:n_points, 1])
+            self.image.set_data(self.histogram.grid)
+            self.image.set_clim(0, max(self.histogram.grid.max(), 1))
+            if SHOW_POINTS:
+                self.scat.set_offsets(self.offsets[:n_points])
+
+        return self.image, self.scat
 
     def exit_handler(self):
         """
@@ -98,6 +143,8 @@ class Visualize:
             self.riq.close()
         except Exception:
             pass
+        if self.reader is not None:
+            self.reader.stop()
 
 
 if __name__ == '__main__':
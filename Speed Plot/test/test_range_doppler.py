@@ -0,0 +1,37 @@
+import unittest
+import numpy as np
+import range_doppler
+
+"""
+Unit tests for the range-Doppler histogram
+"""
+
+
+class TestRangeDoppler(unittest.TestCase):
+
+    def test_matches_histogram2d(self):
+        rng = np.random.default_rng(0)
+        distances = rng.uniform(-100, 2100, 1000)  # some outside the range
+        velocities = rng.uniform(-3500, 3500, 1000)
+        histogram = range_doppler.RangeDoppler((0, 2000), (-3000, 3000), distance_bins=40, velocity_bins=60,
+                                               half_life=0)
+        histogram.add(distances, velocities)
+        expected, _, _ = np.histogram2d(velocities, distances, bins=(60, 40), range=((-3000, 3000), (0, 2000)))
+        # histogram2d includes the top edge in the last bin
+        at_edge = (distances == 2000) | (velocities == 3000)
+        self.assertFalse(at_edge.any())
+        np.testing.assert_array_equal(expected, histogram.grid)
+
+    def test_decay(self):
+        histogram = range_doppler.RangeDoppler((0, 2000), (-3000, 3000), half_life=2, frame_rate=10)
+        histogram.add(np.array([1000.0]), np.array([500.0]))
+        for _ in range(20):
+            histogram.add(np.array([]), np.array([]))
+        self.assertAlmostEqual(0.5, histogram.grid.sum())
+        self.assertEqual(1, np.count_nonzero(histogram.grid))
+
+    def test_only_latest_frame(self):
+        histogram = range_doppler.RangeDoppler((0, 2000), (-3000, 3000), half_life=0)
+        histogram.add(np.array([1000.0, 1000.0]), np.array([500.0, 500.0]))
+        histogram.add(np.array([100.0]), np.array([0.0]))
+        self.assertEqual(1, histogram.grid.sum())
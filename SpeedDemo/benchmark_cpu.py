@@ -0,0 +1,98 @@
+"""
+Compares the CPU used by the speed demo with and without the window.
+
+A simulated sensor feeds both the same frames (a few objects crossing the view) in real time, and the CPU time used by
+the process is compared with the time taken. Needs a display for the window; without one only the headless runner is
+measured.
+
+Usage: python benchmark_cpu.py --seconds 30 --rate 10
+"""
+import argparse
+import os
+import time
+import numpy as np
+from speed_engine import SpeedEngine, FRAME_RATE
+from headless import StreamOutput
+
+OBJECTS = 3  # Number of objects in view at once
+
+
+class SimulatedSensor:
+    """
+    Stands in for the RadarIQ module, giving object tracking frames of objects crossing the view.
+    """
+
+    def __init__(self, seconds, rate=FRAME_RATE, objects=OBJECTS, seed=0):
+        self.seconds = seconds
+        self.rate = rate
+        self.objects = objects
+        self.rng = np.random.default_rng(seed)
+        self.running = False
+
+    def start(self):
+        self.running = True
+
+    def get_data(self):
+        end = time.time() + self.seconds
+        next_frame = time.time()
+        frame_number = 0
+        while self.running and time.time() < end:
+            next_frame += 1 / self.rate
+            time.sleep(max(0.0, next_frame - time.time()))
+            frame_number += 1
+            # Each object is in view for 3 seconds, then replaced by a new one
+            yield [{'tracking_id': int(frame_number // (3 * self.rate)) * self.objects + i,
+                    'x_pos': 0.0, 'y_pos': 2.0, 'z_pos': 0.0,
+                    'x_vel': float(self.rng.normal(2 + i, 0.1)), 'y_vel': 0.0, 'z_vel': 0.0}
+                   for i in range(self.objects)]
+
+    def close(self):
+        self.running = False
+
+
+def measure(run):
+    """
+    :return: CPU time used by run as a percentage of the time it took
+    :rtype: float
+    """
+    wall, cpu = time.perf_counter(), time.process_time()
+    run()
+    return 100 * (time.process_time() - cpu) / (time.perf_counter() - wall)
+
+
+def run_headless(seconds, rate):
+    engine = SpeedEngine(log_file=None)
+    engine.riq = SimulatedSensor(seconds, rate)
+    with open(os.devnull, 'w') as devnull:
+        engine.run(StreamOutput(json_lines=True, stream=devnull))
+    engine.close()
+
+
+def run_window(seconds, rate):
+    from speed import SpeedMeasurement
+
+    class TimedSpeedMeasurement(SpeedMeasurement):
+        def setup_radariq(self):
+            super().setup_radariq()
+            self.window.after(int(seconds * 1000), self.on_closing)
+
+    engine = SpeedEngine(log_file=None)
+    engine.riq = SimulatedSensor(seconds, rate)
+    TimedSpeedMeasurement(engine)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare the CPU used with and without the window.')
+    parser.add_argument('--seconds', type=float, default=30, help='Time to run each for.')
+    parser.add_argument('--rate', type=float, default=FRAME_RATE, help='Frames per second.')
+    args = parser.parse_args()
+
+    print(f"Headless: {measure(lambda: run_headless(args.seconds, args.rate)):.1f}% CPU")
+    try:
+        print(f"Window:   {measure(lambda: run_window(args.seconds, args.rate)):.1f}% CPU")
+    except Exception as error:
+        print(f"Window:   not measured ({error})")
+
+
+if __name__ == '__main__':
+    main()
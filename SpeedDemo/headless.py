@@ -0,0 +1,118 @@
+"""
+Runs the speed demo without a window, writing the speeds to stdout as text or JSON lines, or sending them over UDP.
+
+Uses the same engine as the window (speed_engine.py), so the same filters apply: a speed is only output while the
+fastest object is moving faster than MINIMUM_SPEED, along with the maximum speed over the last AVERAGING_PERIOD
+seconds, and each pass is output once the object has left the view. Suits a Raspberry Pi or server with no display.
+
+Usage: python headless.py                     (text to stdout)
+       python headless.py --json              (one JSON object per line to stdout)
+       python headless.py --udp 10.0.0.2:5005 (one JSON object per datagram)
+"""
+import argparse
+import json
+import socket
+import sys
+from speed_engine import SpeedEngine, UNITS, MINIMUM_SPEED, PASS_LOG_FILE
+
+
+def messages(update):
+    """
+    Turn an update from the engine into the messages to output.
+
+    :param update: Update from SpeedEngine.process_frame
+    :return: List of messages, in the form {'type': 'speed', 'speed': <speed>, 'max_speed': <max speed>, 'units': ..}
+        or {'type': 'pass', 'start': <time>, 'end': <time>, 'peak': <speed>, 'average': <speed>, 'direction': ..}
+    :rtype: list
+    """
+    output = []
+    for record in update['passes']:
+        output.append({'type': 'pass', 'start': float(record['start']), 'end': float(record['end']),
+                       'tracking_id': int(record['tracking_id']), 'peak': round(float(record['peak']), 3),
+                       'average': round(float(record['average']), 3),
+                       'direction': round(float(record['direction']), 1), 'units': UNITS})
+    if update['speed'] is not None and update['speed'] > MINIMUM_SPEED:
+        max_speed = None if update['max_speed'] is None else round(float(update['max_speed']), 3)
+        output.append({'type': 'speed', 'speed': round(float(update['speed']), 3), 'max_speed': max_speed,
+                       'units': UNITS})
+    return output
+
+
+def as_text(message):
+    """
+    :return: A message as a line of text
+    :rtype: str
+    """
+    if message['type'] == 'pass':
+        return f"Pass: peak {message['peak']:.2f} {UNITS}, average {message['average']:.2f} {UNITS}, " \
+               f"direction {message['direction']:.0f}°"
+    max_speed = '-' if message['max_speed'] is None else f"{message['max_speed']:.2f}"
+    return f"{message['speed']:.2f} {UNITS} (max {max_speed} {UNITS})"
+
+
+class StreamOutput:
+    """
+    Writes messages to a stream (stdout by default) as text or JSON lines.
+    """
+
+    def __init__(self, json_lines=False, stream=None):
+        self.json_lines = json_lines
+        self.stream = sys.stdout if stream is None else stream
+
+    def __call__(self, update):
+        for message in messages(update):
+            self.stream.write((json.dumps(message) if self.json_lines else as_text(message)) + '\n')
+        self.stream.flush()
+
+    def close(self):
+        pass
+
+
+class UdpOutput:
+    """
+    Sends each message as a JSON datagram.
+    """
+
+    def __init__(self, host, port):
+        self.address = (host, port)
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+
+    def __call__(self, update):
+        for message in messages(update):
+            self.sock.sendto(json.dumps(message).encode(), self.address)
+
+    def close(self):
+        self.sock.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Run the speed demo without a window.')
+    parser.add_argument('--json', action='store_true', help='Write one JSON object per line instead of text.')
+    parser.add_argument('--udp', metavar='HOST:PORT', help='Send each message as a JSON datagram to this address.')
+    parser.add_argument('--log', default=PASS_LOG_FILE, help='File to save the passes to.')
+    parser.add_argument('--no-log', action='store_true', help="Don't save the passes.")
+    args = parser.parse_args()
+
+    if args.udp is not None:
+        host, port = args.udp.rsplit(':', 1)
+        output = UdpOutput(host, int(port))
+    else:
+        output = StreamOutput(args.json)
+
+    engine = SpeedEngine(None if args.no_log else args.log)
+    try:
+        engine.setup_radariq()
+        engine.run(output)
+
+    except KeyboardInterrupt:
+        pass
+    except Exception as error:
+        print(error, file=sys.stderr)
+    finally:
+        engine.stop()
+        engine.close()
+        output.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,150 @@
+"""
+Log of the passes recorded by the speed trap, and a summary of them.
+
+Each pass is appended to the log as a 32 byte record (see PASS_RECORD in speed_trap.py). Records are collected and
+written in batches, and the log is only ever appended to, so it can be left running for months. The summary reads the
+log a chunk at a time and works out the speed percentiles with a QuantileSketch, so any size of log can be summarised.
+
+Usage: python pass_log.py passes.bin --hours 24  (summary of the last 24 hours)
+"""
+import argparse
+import time
+from datetime import datetime
+import numpy as np
+from speed_trap import PASS_RECORD
+from quantiles import QuantileSketch
+
+PASS_LOG_FILE = 'passes.bin'
+BATCH_SIZE = 100  # Number of passes collected before writing them to the log
+FLUSH_INTERVAL = 60  # Maximum time passes are held before writing them to the log (seconds)
+CHUNK_SIZE = 1000000  # Number of passes read at a time
+PERCENTILES = (50, 85, 95)
+
+
+class PassLog:
+    """
+    Appends passes to a log in batches.
+    """
+
+    def __init__(self, filename=PASS_LOG_FILE, batch_size=BATCH_SIZE, flush_interval=FLUSH_INTERVAL,
+                 clock=time.time):
+        """
+        :param filename: Path to the log. Passes are added to the end if it already exists
+        :param batch_size: Number of passes collected before writing them
+        :param flush_interval: Maximum time passes are held before writing them (seconds)
+        :param clock: Function returning the current time in seconds since the epoch
+        """
+        self.file = open(filename, 'ab')
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.clock = clock
+        self.pending = []
+        self.length = 0
+        self.last_flush = clock()
+
+    def write(self, passes, now=None):
+        """
+        Add passes to the log.
+
+        :param passes: Array of PASS_RECORD
+        :param now: Current time (seconds since the epoch). Defaults to now
+        """
+        now = self.clock() if now is None else now
+        if len(passes) > 0:
+            self.pending.append(passes)
+            self.length += len(passes)
+        if self.length >= self.batch_size or now - self.last_flush >= self.flush_interval:
+            self.flush(now)
+
+    def flush(self, now=None):
+        """
+        Write the collected passes to the log.
+        """
+        self.last_flush = self.clock() if now is None else now
+        if self.length > 0:
+            self.file.write(np.concatenate(self.pending).astype(PASS_RECORD).tobytes())
+            self.file.flush()
+            self.pending = []
+            self.length = 0
+
+    def close(self):
+        self.flush()
+        self.file.close()
+
+
+def read_chunks(filename, chunk_size=CHUNK_SIZE):
+    """
+    Read a log a chunk at a time. A partly written pass at the end of the log is ignored.
+
+    :return: Iterator of arrays of PASS_RECORD
+    """
+    with open(filename, 'rb') as f:
+        f.seek(0, 2)
+        n_passes = f.tell() // PASS_RECORD.itemsize
+    if n_passes == 0:
+        return
+    passes = np.memmap(filename, dtype=PASS_RECORD, mode='r', shape=(n_passes,))
+    for start in range(0, n_passes, chunk_size):
+        yield np.array(passes[start:start + chunk_size])
+    del passes
+
+
+def summarise(filename, since=None, chunk_size=CHUNK_SIZE):
+    """
+    Summarise the passes in a log.
+
+    :param filename: Path to the log
+    :param since: Only include passes which ended at or after this time (seconds since the epoch)
+    :param chunk_size: Number of passes read at a time
+    :return: Summary in the form {'passes': .., 'first': .., 'last': .., 'max': .., 'mean': .., 'p50': .., ...,
+        'left': .., 'right': ..} where left and right count the passes moving in each direction across the sensor
+    :rtype: dict
+    """
+    sketch = QuantileSketch()
+    summary = {'passes': 0, 'first': None, 'last': None, 'max': None, 'mean': None, 'left': 0, 'right': 0}
+    total = 0.0
+    for passes in read_chunks(filename, chunk_size):
+        if since is not None:
+            passes = passes[passes['end'] >= since]
+        if len(passes) == 0:
+            continue
+        sketch.add(passes['peak'])
+        summary['passes'] += len(passes)
+        total += passes['peak'].sum(dtype=float)
+        first, last, fastest = passes['start'].min(), passes['end'].max(), passes['peak'].max()
+        summary['first'] = first if summary['first'] is None else min(summary['first'], first)
+        summary['last'] = last if summary['last'] is None else max(summary['last'], last)
+        summary['max'] = fastest if summary['max'] is None else max(summary['max'], fastest)
+        rightwards = np.count_nonzero(np.abs(passes['direction']) < 90)
+        summary['right'] += rightwards
+        summary['left'] += len(passes) - rightwards
+
+    if summary['passes'] > 0:
+        summary['mean'] = total / summary['passes']
+        for percentile, value in zip(PERCENTILES, sketch.quantile(np.array(PERCENTILES) / 100)):
+            summary[f'p{percentile}'] = value
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Summarise the passes recorded by the speed demo.')
+    parser.add_argument('filename', nargs='?', default=PASS_LOG_FILE, help='The pass log.')
+    parser.add_argument('--hours', type=float, help='Only include the passes from the last this many hours.')
+    args = parser.parse_args()
+
+    since = None if args.hours is None else time.time() - args.hours * 3600
+    summary = summarise(args.filename, since)
+    if summary['passes'] == 0:
+        print("No passes")
+        return
+    print(f"Passes:   {summary['passes']} ({summary['right']} to the right, {summary['left']} to the left)")
+    print(f"From:     {datetime.fromtimestamp(summary['first']):%Y-%m-%d %H:%M}")
+    print(f"To:       {datetime.fromtimestamp(summary['last']):%Y-%m-%d %H:%M}")
+    print(f"Mean:     {summary['mean']:.2f}")
+    for percentile in PERCENTILES:
+        print(f"{percentile}th:     {summary[f'p{percentile}']:.2f}")
+    print(f"Max:      {summary['max']:.2f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,86 @@
+"""
+Streaming quantile sketch for speeds.
+
+Values are counted in logarithmically sized buckets, so any quantile can be read back to within a fixed relative error
+(1% by default) using a fixed, small amount of memory however many values are added. With a half life the counts fade
+over time, giving rolling quantiles of the recent values (eg. the 85th percentile speed over about the last hour).
+"""
+import math
+import numpy as np
+
+RELATIVE_ACCURACY = 0.01  # Maximum relative error of a quantile
+MIN_VALUE = 0.01  # Values below this are counted as this
+MAX_VALUE = 1000  # Values above this are counted as this
+
+
+class QuantileSketch:
+    """
+    Log bucketed histogram giving quantiles with a bounded relative error.
+    """
+
+    def __init__(self, relative_accuracy=RELATIVE_ACCURACY, min_value=MIN_VALUE, max_value=MAX_VALUE, half_life=None):
+        """
+        :param relative_accuracy: Maximum relative error of a quantile
+        :param min_value: Values below this are counted as this
+        :param max_value: Values above this are counted as this
+        :param half_life: Time for the count of a value to fade to half (seconds). None to never fade
+        """
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self.log_gamma = math.log(self.gamma)
+        self.min_value = min_value
+        self.max_value = max_value
+        self.half_life = half_life
+        self.counts = np.zeros(int(math.ceil(math.log(max_value / min_value) / self.log_gamma)) + 1)
+        self.updated = None  # Time the counts were last faded to
+
+    def add(self, values, now=None):
+        """
+        Add values to the sketch.
+
+        :param values: Array of values
+        :param now: Time the values were measured (seconds). Only used with a half life
+        """
+        self.fade(now)
+        values = np.clip(np.asarray(values, dtype=float), self.min_value, self.max_value)
+        buckets = np.ceil(np.log(values / self.min_value) / self.log_gamma).astype(int)
+        self.counts += np.bincount(np.minimum(buckets, len(self.counts) - 1), minlength=len(self.counts))
+
+    def fade(self, now):
+        """
+        Fade the counts to a time. Does nothing without a half life.
+        """
+        if self.half_life is None or now is None:
+            return
+        if self.updated is not None and now > self.updated:
+            self.counts *= 0.5 ** ((now - self.updated) / self.half_life)
+        if self.updated is None or now > self.updated:
+            self.updated = now
+
+    def quantile(self, q):
+        """
+        :param q: Quantile (0 to 1), or an array of them
+        :return: The value(s) at the quantile, or None if the sketch is empty
+        """
+        total = self.counts.sum()
+        if total == 0:
+            return None
+        cumulative = np.cumsum(self.counts)
+        rank = np.maximum(np.asarray(q) * total, total * 1e-12)  # so the 0th quantile is the smallest value
+        buckets = np.minimum(np.searchsorted(cumulative, rank), len(self.counts) - 1)
+        # Middle of each bucket in relative terms, so the error is at most the relative accuracy either way
+        return self.min_value * 2 * self.gamma ** buckets / (self.gamma + 1)
+
+    def merge(self, other):
+        """
+        Add the counts of another sketch with the same settings.
+        """
+        if len(other.counts) != len(self.counts) or other.gamma != self.gamma:
+            raise ValueError("Sketches must have the same accuracy and range to be merged")
+        self.counts += other.counts
+
+    def count(self):
+        """
+        :return: Number of values in the sketch (faded, with a half life)
+        :rtype: float
+        """
+        return self.counts.sum()
@@ -1,26 +1,30 @@
 """
-This sample application records the speed in the X direction of the first detected object from the RadarIQ sensor
+This sample application records the speed of the objects detected by the RadarIQ sensor
+
+The large number is the speed of the fastest object in view. Each tracked object is followed through its pass across
+the field of view (see speed_trap.py) and the peak and average speed of the last pass is shown once the object leaves,
+along with the 85th percentile of the recent peak speeds. Every pass is saved to PASS_LOG_FILE (summarise it with
+python pass_log.py). The measuring is done by speed_engine.py; to run without a window use headless.py.
+
+The sensor is read in a background thread which only ever stores the latest speeds. The window checks for new speeds
+every DISPLAY_INTERVAL ms (Tk widgets must only be touched from the thread running the window), so a burst of frames
+results in one redraw and the reader never waits on the window.
 """
-import time
 import tkinter as tk
 import tkinter.font as tkFont
 import threading
-from radariq import RadarIQ, MODE_OBJECT_TRACKING, OUTPUT_LIST, find_com_port
+from speed_engine import SpeedEngine, UNITS, MINIMUM_SPEED
 
 RADAR_BLUE = "#0033A0"
-FRAME_RATE = 3  # frames per second
-MIN_DISTANCE = 0.5  # Closest distance to look (m)
-MAX_DISTANCE = 10  # Furthermost distance to look (m)
-MIN_ANGLE = -45  # Minimum angle to look
-MAX_ANGLE = 45  # Maximum angle to look
-AVERAGING_PERIOD = 10  # number of seconds to run the averaging/max filter
-UNITS = "m/s"
-MINIMUM_SPEED = 0.5  # Minimum speed
+DISPLAY_INTERVAL = 100  # How often the window checks for new speeds (ms)
 
 
 class SpeedMeasurement():
-    def __init__(self):
-        self.riq = None
+    def __init__(self, engine=None):
+        """
+        :param engine: SpeedEngine to show the speeds of. By default one reading the RadarIQ module
+        """
+        self.engine = SpeedEngine() if engine is None else engine
         self.window = tk.Tk()
         self.window.title("Speed Measurement")
         self.window.geometry('900x200')
@@ -33,81 +37,77 @@ class SpeedMeasurement():
         self.speedLabel = tk.Label(text=f"0 {UNITS}", font=large_font, fg="white", bg=RADAR_BLUE)
         self.maxSpeedLabel = tk.Label(text=f"Max speed: 0 {UNITS}", font=small_font, anchor=tk.NW, fg="white",
                                       bg=RADAR_BLUE)
+        self.passLabel = tk.Label(text="", font=small_font, anchor=tk.NW, fg="white", bg=RADAR_BLUE)
         self.speedLabel.pack()
         self.maxSpeedLabel.pack()
-
-        self.speedBuffer = CircularList(FRAME_RATE * AVERAGING_PERIOD)
+        self.passLabel.pack()
+
+        self.reader_thread = None
+        # Latest speeds from the reader thread, in the form (<frame number>, <speed>, <max speed>, <last pass>). The
+        # reader only ever replaces the whole tuple, which is atomic, so no lock is needed
+        self.latest = None
+        self.shown = None  # Frame number of the speeds on display
+        self.refresh_job = None
         self.setup_radariq()
         self.window.protocol("WM_DELETE_WINDOW", self.on_closing)
-        self.run_thread = False
+        self.refresh()
         self.window.mainloop()
 
     def on_closing(self):
-        self.run_thread = False
-        self.riq.close()
+        if self.refresh_job is not None:
+            self.window.after_cancel(self.refresh_job)
+        self.engine.stop()
+        if self.reader_thread is not None:
+            self.reader_thread.join(timeout=2)
+        self.engine.close()
         self.window.destroy()
 
+    def refresh(self):
+        """
+        Show the latest speeds, if there are new ones. Runs every DISPLAY_INTERVAL ms in the window's thread.
+        """
+        latest = self.latest
+        if latest is not None and latest[0] != self.shown:
+            self.shown, speed, max_speed, last_pass = latest
+            if speed is None:
+                pass  # only a pass finished, keep showing the last speed
+            elif speed > MINIMUM_SPEED:
+                self.speedLabel.configure(text=f"{speed:.2f} {UNITS}")
+            else:
+                self.speedLabel.configure(text=f"- {UNITS}")
+
+            if max_speed is not None and max_speed > MINIMUM_SPEED:
+                self.maxSpeedLabel.configure(text=f"Max speed: {max_speed:.2f} {UNITS}")
+            else:
+                self.maxSpeedLabel.configure(text=f"- {UNITS}")
+
+            if last_pass is not None:
+                self.passLabel.configure(text=f"Last pass: peak {last_pass['peak']:.2f} {UNITS}, "
+                                              f"average {last_pass['average']:.2f} {UNITS}. "
+                                              f"85th percentile {last_pass['p85']:.2f} {UNITS}")
+        self.refresh_job = self.window.after(DISPLAY_INTERVAL, self.refresh)
+
     def setup_radariq(self):
         """
         Setup the RadarIQ module.
         """
-        self.run_thread = True
-        x = threading.Thread(target=self.run_radar)
-        x.start()
+        self.reader_thread = threading.Thread(target=self.run_radar, daemon=True)
+        self.reader_thread.start()
 
     def run_radar(self):
         try:
-            port = find_com_port()
-            self.riq = RadarIQ(port.device, output_format=OUTPUT_LIST)
-            self.riq.set_mode(MODE_OBJECT_TRACKING)
-            self.riq.set_units('m', UNITS)
-            self.riq.set_frame_rate(FRAME_RATE)
-            self.riq.set_distance_filter(MIN_DISTANCE, MAX_DISTANCE)
-            self.riq.set_angle_filter(MIN_ANGLE, MAX_ANGLE)
-            self.riq.start()
-
-            for frame in self.riq.get_data():
-                if frame is not None and len(frame) > 0:
-                    speed = frame[0]['x_vel']
-                    self.speedBuffer.append(speed)
-                    if speed > MINIMUM_SPEED:
-                        self.speedLabel.configure(text=f"{speed} {UNITS}")
-                    else:
-                        self.speedLabel.configure(text=f"- {UNITS}")
-
-                    max_speed = self.speedBuffer.max()
-                    if max_speed > MINIMUM_SPEED:
-                        self.maxSpeedLabel.configure(text=f"Max speed: {max_speed} {UNITS}")
-                    else:
-                        self.maxSpeedLabel.configure(text=f"- {UNITS}")
-                    time.sleep(0.01)  # release control of the loop to the rest of the program
+            if self.engine.riq is None:
+                self.engine.setup_radariq()
+            self.engine.run(self.on_update)
 
         except Exception as error:
             print(error)
 
-
-class CircularList:
-    """
-    Circular buffer of values
-    """
-
-    def __init__(self, size):
-        self.index = 0
-        self.size = size
-        self._data = list()[-size:]
-
-    def append(self, value):
-        if len(self._data) == self.size:
-            self._data[self.index] = value
-        else:
-            self._data.append(value)
-        self.index = (self.index + 1) % self.size
-
-    def max(self):
-        return max(self._data)
-
-    def average(self):
-        return sum(self._data) / self.size
+    def on_update(self, update):
+        """
+        Store the latest speeds for the window. Runs in the reader thread.
+        """
+        self.latest = (update['frame'], update['speed'], update['max_speed'], update['last_pass'])
 
 
 if __name__ == '__main__':
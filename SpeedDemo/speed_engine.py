@@ -0,0 +1,257 @@
+"""
+Speed measurement engine, without a user interface.
+
+Reads the RadarIQ sensor, follows each tracked object through its pass (see speed_trap.py), keeps the maximum speed
+over the last AVERAGING_PERIOD seconds and saves every pass to PASS_LOG_FILE. It is used by both the window (speed.py)
+and the headless runner (headless.py), so they measure speeds in exactly the same way.
+"""
+import time
+from collections import deque
+import numpy as np
+from radariq import RadarIQ, MODE_OBJECT_TRACKING, OUTPUT_LIST, find_com_port
+from speed_trap import SpeedTrap
+from pass_log import PassLog
+from quantiles import QuantileSketch
+
+FRAME_RATE = 3  # frames per second
+MIN_DISTANCE = 0.5  # Closest distance to look (m)
+MAX_DISTANCE = 10  # Furthermost distance to look (m)
+MIN_ANGLE = -45  # Minimum angle to look
+MAX_ANGLE = 45  # Maximum angle to look
+AVERAGING_PERIOD = 10  # number of seconds to run the averaging/max filter
+UNITS = "m/s"
+MINIMUM_SPEED = 0.5  # Minimum speed
+TRACK_TIMEOUT = 1  # Number of seconds after an object was last seen that its pass is finished
+PASS_LOG_FILE = 'passes.bin'  # File every pass is saved to. None to not save them
+ROLLING_HALF_LIFE = 3600  # Time for a pass to count half as much towards the recent percentile (seconds)
+
+
+class SpeedEngine:
+    """
+    Measures the speeds of the objects seen by the sensor.
+    """
+
+    def __init__(self, log_file=PASS_LOG_FILE, clock=time.time):
+        """
+        :param log_file: File every pass is saved to. None to not save them
+        :param clock: Function returning the current time in seconds since the epoch
+        """
+        self.riq = None
+        self.clock = clock
+        self.speedBuffer = CircularList(AVERAGING_PERIOD, FRAME_RATE * AVERAGING_PERIOD, clock)
+        self.trap = SpeedTrap(TRACK_TIMEOUT, MINIMUM_SPEED)
+        self.recent = QuantileSketch(half_life=ROLLING_HALF_LIFE)  # peak speeds of the recent passes
+        self.log = None if log_file is None else PassLog(log_file)
+        self.last_pass = None
+        self.speed = None
+        self.frames = 0  # Number of updates so far
+        self.running = False
+
+    def setup_radariq(self):
+        """
+        Setup the RadarIQ module.
+        """
+        port = find_com_port()
+        self.riq = RadarIQ(port.device, output_format=OUTPUT_LIST)
+        self.riq.set_mode(MODE_OBJECT_TRACKING)
+        self.riq.set_units('m', UNITS)
+        self.riq.set_frame_rate(FRAME_RATE)
+        self.riq.set_distance_filter(MIN_DISTANCE, MAX_DISTANCE)
+        self.riq.set_angle_filter(MIN_ANGLE, MAX_ANGLE)
+
+    def run(self, on_update):
+        """
+        Measure speeds until stopped.
+
+        :param on_update: Function called with each update (see process_frame)
+        """
+        self.running = True
+        self.riq.start()
+        for frame in self.riq.get_data():
+            if not self.running:
+                break
+            update = self.process_frame(frame)
+            if update is not None:
+                on_update(update)
+
+    def process_frame(self, frame, now=None):
+        """
+        Measure the speeds in a frame.
+
+        :param frame: Object tracking frame from the RadarIQ module, or None if no frame arrived
+        :param now: Time the frame was received (seconds since the epoch). Defaults to the clock
+        :return: None if nothing changed, otherwise an update in the form {'frame': <update number>,
+            'speed': <speed of the fastest object in the frame, None if there were none>, 'max_speed': <max speed over
+            the averaging period, None if no speeds were measured in it>, 'passes': <array of the passes which
+            finished>, 'last_pass': <summary of the last pass>}
+        :rtype: dict
+        """
+        now = self.clock() if now is None else now
+        passes = self.trap.expire(now) if frame is None else self.trap.update(frame, now)
+        self.record(passes, now)
+
+        if frame is not None and len(frame) > 0:
+            self.speed = self.trap.current.max()  # the fastest object
+            self.speedBuffer.append(self.speed, now)
+            speed = self.speed
+        elif len(passes) == 0 or self.speed is None:
+            return None
+        else:
+            speed = None  # only a pass finished, there is no new speed
+        self.frames += 1
+        return {'frame': self.frames, 'speed': speed, 'max_speed': self.speedBuffer.max(now), 'passes': passes,
+                'last_pass': self.last_pass}
+
+    def record(self, passes, now):
+        """
+        Save finished passes and add them to the recent percentile.
+        """
+        if self.log is not None:
+            self.log.write(passes, now)
+        if len(passes) > 0:
+            self.recent.add(passes['peak'], now)
+            self.last_pass = {'peak': passes['peak'][-1], 'average': passes['average'][-1],
+                              'p85': self.recent.quantile(0.85)}
+
+    def stop(self):
+        """
+        Stop the sensor (which stops run).
+        """
+        self.running = False
+        if self.riq is not None:
+            try:
+                self.riq.close()
+            except Exception:
+                pass
+
+    def close(self):
+        """
+        Save any passes still in progress and close the log. Call after run has returned.
+        """
+        if self.log is not None:
+            self.log.write(self.trap.close_all())
+            self.log.close()
+
+
+class CircularList:
+    """
+    Values from the last `period` seconds, with their max, min and mean.
+
+    The values are kept in a NumPy ring buffer along with the time each was added. Max and min are kept in monotonic
+    deques and the mean from a running sum, so adding a value and reading any of them is O(1) amortised, whatever the
+    size of the window.
+    """
+
+    def __init__(self, period, capacity=64, clock=time.monotonic):
+        """
+        :param period: Length of the window (seconds)
+        :param capacity: Number of values to allocate space for initially (grows as needed)
+        :param clock: Function returning the current time in seconds
+        """
+        self.period = period
+        self.clock = clock
+        self._values = np.zeros(capacity)
+        self._times = np.zeros(capacity)
+        self.start = 0  # Sequence number of the oldest value in the window
+        self.end = 0  # Sequence number the next value will be given
+        self._sum = 0.0
+        self._max = deque()  # (sequence number, value), values decreasing from the front
+        self._min = deque()  # (sequence number, value), values increasing from the front
+
+    def append(self, value, now=None):
+        """
+        Add a value, dropping values older than the window.
+
+        :param value: The value
+        :param now: Time the value was measured (seconds). Defaults to the clock
+        """
+        now = self.clock() if now is None else now
+        self.expire(now)
+        if self.end - self.start == len(self._values):
+            self._grow()
+        index = self.end % len(self._values)
+        self._values[index] = value
+        self._times[index] = now
+        self._sum += value
+
+        while self._max and self._max[-1][1] <= value:
+            self._max.pop()
+        self._max.append((self.end, value))
+        while self._min and self._min[-1][1] >= value:
+            self._min.pop()
+        self._min.append((self.end, value))
+        self.end += 1
+
+    def expire(self, now=None):
+        """
+        Drop the values older than the window.
+        """
+        now = self.clock() if now is None else now
+        capacity = len(self._values)
+        while self.start < self.end and now - self._times[self.start % capacity] > self.period:
+            self._sum -= self._values[self.start % capacity]
+            if self._max[0][0] == self.start:
+                self._max.popleft()
+            if self._min[0][0] == self.start:
+                self._min.popleft()
+            self.start += 1
+        if self.start == self.end:
+            self._sum = 0.0  # do not carry rounding errors over
+
+    def max(self, now=None):
+        """
+        :param now: Current time (seconds), values older than the window are dropped first. Defaults to the clock
+        :return: The largest value in the window, or None if it is empty
+        """
+        self.expire(now)
+        return self._max[0][1] if self._max else None
+
+    def min(self, now=None):
+        """
+        :param now: Current time (seconds), values older than the window are dropped first. Defaults to the clock
+        :return: The smallest value in the window, or None if it is empty
+        """
+        self.expire(now)
+        return self._min[0][1] if self._min else None
+
+    def average(self, now=None):
+        """
+        :param now: Current time (seconds), values older than the window are dropped first. Defaults to the clock
+        :return: The mean of the values in the window, or None if it is empty
+        """
+        self.expire(now)
+        return self._sum / len(self) if len(self) > 0 else None
+
+    def percentile(self, q, now=None):
+        """
+        Percentile of the values in the window. Unlike max, min and average this is O(number of values).
+
+        :param q: Percentile (0 to 100), or a list of them
+        :param now: Current time (seconds), values older than the window are dropped first. Defaults to the clock
+        :return: The percentile(s), or None if the window is empty
+        """
+        values = self.values(now)
+        return np.percentile(values, q) if len(values) > 0 else None
+
+    def values(self, now=None):
+        """
+        :param now: Current time (seconds), values older than the window are dropped first. Defaults to the clock
+        :return: The values in the window, oldest first
+        :rtype: np.ndarray
+        """
+        self.expire(now)
+        return self._values[np.arange(self.start, self.end) % len(self._values)]
+
+    def _grow(self):
+        values = self._values[np.arange(self.start, self.end) % len(self._values)]
+        times = self._times[np.arange(self.start, self.end) % len(self._times)]
+        capacity = 2 * len(self._values)
+        self._values = np.zeros(capacity)
+        self._times = np.zeros(capacity)
+        # Keep each value at its sequence number modulo the new capacity
+        indexes = np.arange(self.start, self.end) % capacity
+        self._values[indexes] = values
+        self._times[indexes] = times
+
+    def __len__(self):
+        return self.end - self.start
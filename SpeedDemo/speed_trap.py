@@ -0,0 +1,131 @@
+"""
+Speed trap measuring every tracked object separately.
+
+Each tracked object's pass through the field of view is followed by its tracking ID. The statistics of all the objects
+in a frame are updated at once in NumPy arrays (one row per object). When an object has not been seen for TRACK_TIMEOUT
+seconds its pass is closed and returned as a compact record with its peak and average speed and its direction.
+"""
+import time
+import numpy as np
+
+TRACK_TIMEOUT = 1  # Number of seconds after an object was last seen that its pass is closed
+MINIMUM_SPEED = 0.5  # Passes with a lower peak speed than this are not recorded
+
+# A completed pass. Direction is the angle of the average velocity, in degrees anticlockwise from the sensor's x axis
+# (0 is moving to the right, 90 is moving away from the sensor)
+PASS_RECORD = np.dtype([('start', '<f8'), ('end', '<f8'), ('tracking_id', '<u2'), ('samples', '<u2'),
+                        ('peak', '<f4'), ('average', '<f4'), ('direction', '<f4')])
+
+
+class SpeedTrap:
+    """
+    Peak and average speed of each tracked object for each pass.
+    """
+
+    def __init__(self, timeout=TRACK_TIMEOUT, minimum_speed=MINIMUM_SPEED, capacity=16):
+        """
+        :param timeout: Seconds after an object was last seen that its pass is closed
+        :param minimum_speed: Passes with a lower peak speed than this are not recorded
+        :param capacity: Number of objects to allocate space for initially (grows as needed)
+        """
+        self.timeout = timeout
+        self.minimum_speed = minimum_speed
+        self.rows = {}  # In the form {<tracking id>: <row>}
+        self.free = list(range(capacity - 1, -1, -1))
+        self.start = np.zeros(capacity)
+        self.last_seen = np.zeros(capacity)
+        self.samples = np.zeros(capacity, dtype=int)
+        self.peak = np.zeros(capacity)
+        self.total_speed = np.zeros(capacity)
+        self.total_velocity = np.zeros((capacity, 2))  # Sum of the x and y velocities, for the direction
+        self.current = np.zeros(0)  # Speed of each object in the latest frame
+
+    def update(self, frame, now=None):
+        """
+        Add a frame from the sensor.
+
+        :param frame: Object tracking frame from the RadarIQ module
+        :param now: Time the frame was received (seconds since the epoch). Defaults to now
+        :return: Passes which have finished, as an array of PASS_RECORD
+        :rtype: np.ndarray
+        """
+        now = time.time() if now is None else now
+        finished = self.expire(now)
+        if len(frame) > 0:
+            velocity = np.array([[obj['x_vel'], obj['y_vel'], obj['z_vel']] for obj in frame], dtype=float)
+            rows = np.array([self._row(obj['tracking_id'], now) for obj in frame], dtype=int)
+            self.current = np.sqrt(np.einsum('ij,ij->i', velocity, velocity))
+            self.last_seen[rows] = now
+            self.samples[rows] += 1
+            self.peak[rows] = np.maximum(self.peak[rows], self.current)
+            self.total_speed[rows] += self.current
+            self.total_velocity[rows] += velocity[:, :2]
+        else:
+            self.current = np.zeros(0)
+        return finished
+
+    def expire(self, now=None):
+        """
+        Close the passes of objects which have not been seen within the timeout.
+
+        :return: The closed passes, as an array of PASS_RECORD
+        :rtype: np.ndarray
+        """
+        now = time.time() if now is None else now
+        expired = [(tracking_id, row) for tracking_id, row in self.rows.items()
+                   if now - self.last_seen[row] > self.timeout]
+        return self._close(expired)
+
+    def close_all(self):
+        """
+        Close every open pass, eg. when stopping.
+
+        :return: The closed passes, as an array of PASS_RECORD
+        :rtype: np.ndarray
+        """
+        return self._close(list(self.rows.items()))
+
+    def _close(self, tracks):
+        if len(tracks) == 0:
+            return np.zeros(0, dtype=PASS_RECORD)
+        tracking_ids = np.array([tracking_id for tracking_id, _ in tracks])
+        rows = np.array([row for _, row in tracks], dtype=int)
+        for tracking_id, row in tracks:
+            del self.rows[tracking_id]
+            self.free.append(row)
+
+        fast_enough = self.peak[rows] >= self.minimum_speed
+        rows = rows[fast_enough]
+        tracking_ids = tracking_ids[fast_enough]
+        passes = np.zeros(len(rows), dtype=PASS_RECORD)
+        passes['start'] = self.start[rows]
+        passes['end'] = self.last_seen[rows]
+        passes['tracking_id'] = tracking_ids
+        passes['samples'] = self.samples[rows]
+        passes['peak'] = self.peak[rows]
+        passes['average'] = self.total_speed[rows] / self.samples[rows]
+        passes['direction'] = np.degrees(np.arctan2(self.total_velocity[rows, 1], self.total_velocity[rows, 0]))
+        return passes
+
+    def _row(self, tracking_id, now):
+        row = self.rows.get(tracking_id)
+        if row is None:
+            if len(self.free) == 0:
+                self._grow()
+            row = self.rows[tracking_id] = self.free.pop()
+            self.start[row] = now
+            self.samples[row] = 0
+            self.peak[row] = 0
+            self.total_speed[row] = 0
+            self.total_velocity[row] = 0
+        return row
+
+    def _grow(self):
+        capacity = len(self.start)
+        for name in ('start', 'last_seen', 'samples', 'peak', 'total_speed', 'total_velocity'):
+            array = getattr(self, name)
+            setattr(self, name, np.concatenate((array, np.zeros_like(array))))
+        self.free.extend(range(2 * capacity - 1, capacity - 1, -1))
+
+    def __len__(self):
+        return len(self.rows)
@@ -0,0 +1,60 @@
+import unittest
+import numpy as np
+from speed_engine import CircularList
+
+"""
+Unit tests for CircularList
+"""
+
+
+class TestCircularList(unittest.TestCase):
+
+    def test_matches_brute_force(self):
+        rng = np.random.default_rng(0)
+        times = np.cumsum(rng.uniform(0, 0.6, 2000))
+        values = rng.normal(1, 2, 2000)
+        window = CircularList(10, capacity=4)
+        for i, (now, value) in enumerate(zip(times, values)):
+            window.append(value, now)
+            expected = values[:i + 1][now - times[:i + 1] <= 10]
+            self.assertEqual(len(expected), len(window))
+            self.assertEqual(expected.max(), window.max(now))
+            self.assertEqual(expected.min(), window.min(now))
+            self.assertAlmostEqual(expected.mean(), window.average(now))
+            np.testing.assert_array_equal(expected, window.values(now))
+        self.assertAlmostEqual(np.percentile(expected, 85), window.percentile(85, now))
+
+    def test_average_before_full(self):
+        window = CircularList(10)
+        window.append(2, 0)
+        window.append(4, 1)
+        self.assertEqual(3, window.average(1))
+
+    def test_expire(self):
+        window = CircularList(10)
+        self.assertIsNone(window.max())
+        self.assertIsNone(window.average())
+        window.append(5, 0)
+        window.expire(10)
+        self.assertEqual(5, window.max(10))
+        window.expire(10.5)
+        self.assertEqual(0, len(window))
+        self.assertIsNone(window.min(10.5))
+        self.assertIsNone(window.percentile(50, 10.5))
+
+    def test_read_expires(self):
+        now = [0]
+        window = CircularList(10, clock=lambda: now[0])
+        window.append(5)
+        now[0] = 5
+        window.append(3)
+        self.assertEqual(5, window.max())
+        # Nothing added since, but the first value is now too old
+        now[0] = 12
+        self.assertEqual(3, window.max())
+        self.assertEqual(3, window.min())
+        self.assertEqual(3, window.average())
+        np.testing.assert_array_equal([3], window.values())
+        now[0] = 16
+        self.assertIsNone(window.max())
+        self.assertIsNone(window.average())
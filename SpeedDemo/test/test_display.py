@@ -0,0 +1,61 @@
+import unittest
+import speed
+
+"""
+Unit tests for showing the speeds in the window
+"""
+
+
+class Label:
+    def __init__(self):
+        self.texts = []
+
+    def configure(self, text):
+        self.texts.append(text)
+
+
+class Window:
+    def __init__(self):
+        self.scheduled = []
+
+    def after(self, interval, callback):
+        self.scheduled.append((interval, callback))
+        return len(self.scheduled)
+
+
+class TestRefresh(unittest.TestCase):
+
+    def setUp(self):
+        # A SpeedMeasurement without a real window or sensor
+        self.app = speed.SpeedMeasurement.__new__(speed.SpeedMeasurement)
+        self.app.window = Window()
+        self.app.speedLabel = Label()
+        self.app.maxSpeedLabel = Label()
+        self.app.passLabel = Label()
+        self.app.latest = None
+        self.app.shown = None
+
+    def test_burst_is_coalesced(self):
+        for frame, value in enumerate([1.0, 2.0, 3.0, 0.2]):
+            self.app.latest = (frame + 1, value, 3.0, None)
+        self.app.refresh()
+        self.assertListEqual([f"- {speed.UNITS}"], self.app.speedLabel.texts)
+        self.assertListEqual([f"Max speed: 3.00 {speed.UNITS}"], self.app.maxSpeedLabel.texts)
+        self.assertListEqual([], self.app.passLabel.texts)
+        self.assertEqual((speed.DISPLAY_INTERVAL, self.app.refresh), self.app.window.scheduled[-1])
+
+    def test_unchanged_not_redrawn(self):
+        self.app.refresh()
+        self.app.latest = (1, 1.5, 1.5, None)
+        self.app.refresh()
+        self.app.refresh()
+        self.assertListEqual([f"1.50 {speed.UNITS}"], self.app.speedLabel.texts)
+        self.assertEqual(3, len(self.app.window.scheduled))
+
+    def test_last_pass(self):
+        last_pass = {'peak': 4.25, 'average': 3.5, 'p85': 4}
+        self.app.latest = (1, 0, 4.25, last_pass)
+        self.app.refresh()
+        self.assertListEqual([f"Last pass: peak 4.25 {speed.UNITS}, average 3.50 {speed.UNITS}. "
+                              f"85th percentile 4.00 {speed.UNITS}"],
+                             self.app.passLabel.texts)
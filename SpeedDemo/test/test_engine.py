@@ -0,0 +1,75 @@
+import io
+import json
+import unittest
+import headless
+from speed_engine import SpeedEngine, MINIMUM_SPEED
+
+"""
+Unit tests for the speed engine and the headless runner
+"""
+
+
+def frame(*speeds):
+    return [{'tracking_id': i, 'x_pos': 0.0, 'y_pos': 2.0, 'z_pos': 0.0, 'x_vel': speed, 'y_vel': 0.0, 'z_vel': 0.0}
+            for i, speed in enumerate(speeds)]
+
+
+class TestSpeedEngine(unittest.TestCase):
+
+    def setUp(self):
+        self.engine = SpeedEngine(log_file=None, clock=lambda: 0)
+
+    def test_fastest_object_and_max(self):
+        self.engine.process_frame(frame(1.0, 3.0), now=0)
+        update = self.engine.process_frame(frame(2.0), now=1)
+        self.assertEqual(update['frame'], 2)
+        self.assertAlmostEqual(update['speed'], 2.0)
+        self.assertAlmostEqual(update['max_speed'], 3.0)
+
+    def test_no_update_without_objects(self):
+        self.assertIsNone(self.engine.process_frame([], now=0))
+        self.assertIsNone(self.engine.process_frame(None, now=0))
+
+    def test_pass_finishes(self):
+        self.engine.process_frame(frame(4.0), now=0)
+        self.engine.process_frame(frame(2.0), now=0.5)
+        update = self.engine.process_frame(None, now=5)
+        self.assertEqual(len(update['passes']), 1)
+        self.assertAlmostEqual(update['last_pass']['peak'], 4.0)
+        self.assertAlmostEqual(update['last_pass']['average'], 3.0)
+        self.assertIsNone(update['speed'])
+
+    def test_pass_finishes_after_window(self):
+        self.engine.process_frame(frame(4.0), now=0)
+        update = self.engine.process_frame(None, now=20)
+        self.assertEqual(len(update['passes']), 1)
+        self.assertIsNone(update['max_speed'])
+        self.assertEqual([message['type'] for message in headless.messages(update)], ['pass'])
+
+
+class TestHeadless(unittest.TestCase):
+
+    def setUp(self):
+        self.engine = SpeedEngine(log_file=None, clock=lambda: 0)
+
+    def test_slow_speeds_are_not_output(self):
+        update = self.engine.process_frame(frame(MINIMUM_SPEED / 2), now=0)
+        self.assertEqual(headless.messages(update), [])
+
+    def test_json_lines(self):
+        stream = io.StringIO()
+        output = headless.StreamOutput(json_lines=True, stream=stream)
+        output(self.engine.process_frame(frame(2.5), now=0))
+        output(self.engine.process_frame(None, now=5))
+        lines = [json.loads(line) for line in stream.getvalue().splitlines()]
+        # The update for the pass has no new speed, so the old one isn't output again
+        self.assertEqual([line['type'] for line in lines], ['speed', 'pass'])
+        self.assertEqual(lines[0]['speed'], 2.5)
+        self.assertEqual(lines[1]['peak'], 2.5)
+        self.assertEqual(lines[1]['direction'], 0)
+
+    def test_text(self):
+        stream = io.StringIO()
+        headless.StreamOutput(stream=stream)(self.engine.process_frame(frame(2.5), now=0))
+        self.assertEqual(stream.getvalue(), "2.50 m/s (max 2.50 m/s)\n")
+
@@ -0,0 +1,70 @@
+import os
+import tempfile
+import unittest
+import numpy as np
+import pass_log
+from speed_trap import PASS_RECORD
+
+"""
+Unit tests for the pass log
+"""
+
+
+def random_passes(n, rng, start=0):
+    passes = np.zeros(n, dtype=PASS_RECORD)
+    passes['start'] = start + np.arange(n) * 10
+    passes['end'] = passes['start'] + 2
+    passes['tracking_id'] = np.arange(n) % 50
+    passes['samples'] = 6
+    passes['peak'] = rng.lognormal(1.5, 0.3, n)
+    passes['average'] = passes['peak'] * 0.8
+    passes['direction'] = rng.choice([0, 180], n)
+    return passes
+
+
+class TestPassLog(unittest.TestCase):
+
+    def setUp(self):
+        self.filename = os.path.join(tempfile.mkdtemp(), 'passes.bin')
+
+    def tearDown(self):
+        os.remove(self.filename)
+
+    def test_batched_writes(self):
+        rng = np.random.default_rng(0)
+        log = pass_log.PassLog(self.filename, batch_size=5, flush_interval=60, clock=lambda: 0)
+        log.write(random_passes(3, rng), now=1)
+        self.assertEqual(0, os.path.getsize(self.filename))
+        log.write(random_passes(3, rng), now=2)
+        self.assertEqual(6 * PASS_RECORD.itemsize, os.path.getsize(self.filename))
+        log.write(random_passes(1, rng), now=3)
+        log.write(random_passes(0, rng), now=62)  # flush interval
+        self.assertEqual(7 * PASS_RECORD.itemsize, os.path.getsize(self.filename))
+        log.close()
+
+    def test_summary(self):
+        rng = np.random.default_rng(1)
+        passes = random_passes(20000, rng)
+        log = pass_log.PassLog(self.filename)
+        for chunk in np.array_split(passes, 40):
+            log.write(chunk)
+        log.close()
+        with open(self.filename, 'ab') as f:
+            f.write(b'\x01' * 7)  # a partly written pass
+
+        summary = pass_log.summarise(self.filename, chunk_size=3000)
+        self.assertEqual(20000, summary['passes'])
+        self.assertEqual(np.count_nonzero(passes['direction'] == 0), summary['right'])
+        self.assertAlmostEqual(passes['peak'].max(), summary['max'], places=5)
+        self.assertAlmostEqual(passes['peak'].astype(float).mean(), summary['mean'], places=5)
+        for percentile in pass_log.PERCENTILES:
+            expected = np.percentile(passes['peak'], percentile, method='inverted_cdf')
+            self.assertAlmostEqual(expected, summary[f'p{percentile}'], delta=expected * 0.0101)
+
+        recent = pass_log.summarise(self.filename, since=passes['end'][-100])
+        self.assertEqual(100, recent['passes'])
+        self.assertEqual(passes['start'][-100], recent['first'])
+
+    def test_empty(self):
+        pass_log.PassLog(self.filename).close()
+        self.assertEqual(0, pass_log.summarise(self.filename)['passes'])
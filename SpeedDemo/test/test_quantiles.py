@@ -0,0 +1,46 @@
+import unittest
+import numpy as np
+from quantiles import QuantileSketch
+
+"""
+Unit tests for the quantile sketch
+"""
+
+
+class TestQuantileSketch(unittest.TestCase):
+
+    def test_relative_accuracy(self):
+        rng = np.random.default_rng(0)
+        speeds = rng.lognormal(2, 0.5, 100000)
+        sketch = QuantileSketch(relative_accuracy=0.01)
+        size = sketch.counts.nbytes
+        for chunk in np.array_split(speeds, 100):
+            sketch.add(chunk)
+        self.assertEqual(size, sketch.counts.nbytes)
+        self.assertEqual(100000, sketch.count())
+
+        q = np.array([0.5, 0.85, 0.95])
+        expected = np.quantile(speeds, q, method='inverted_cdf')
+        np.testing.assert_allclose(expected, sketch.quantile(q), rtol=0.0101)
+        self.assertAlmostEqual(speeds.min(), sketch.quantile(0), delta=speeds.min() * 0.0101)
+
+    def test_empty(self):
+        self.assertIsNone(QuantileSketch().quantile(0.5))
+
+    def test_fade(self):
+        sketch = QuantileSketch(half_life=10)
+        sketch.add(np.full(100, 1.0), now=0)
+        sketch.add(np.full(100, 5.0), now=20)
+        self.assertAlmostEqual(125, sketch.count())
+        # The older, slower speeds now only count a quarter as much
+        self.assertAlmostEqual(5, sketch.quantile(0.5), delta=0.05)
+        self.assertAlmostEqual(1, sketch.quantile(0.1), delta=0.01)
+
+    def test_merge(self):
+        a, b = QuantileSketch(), QuantileSketch()
+        a.add([1, 2])
+        b.add([3])
+        a.merge(b)
+        self.assertEqual(3, a.count())
+        with self.assertRaises(ValueError):
+            a.merge(QuantileSketch(relative_accuracy=0.02))
@@ -0,0 +1,65 @@
+import unittest
+import numpy as np
+import speed_trap
+
+"""
+Unit tests for the speed trap
+"""
+
+
+def obj(tracking_id, x_vel, y_vel=0.0, z_vel=0.0):
+    return {'tracking_id': tracking_id, 'x_vel': x_vel, 'y_vel': y_vel, 'z_vel': z_vel}
+
+
+class TestSpeedTrap(unittest.TestCase):
+
+    def test_passes(self):
+        trap = speed_trap.SpeedTrap(timeout=1, minimum_speed=0.5)
+        self.assertEqual(0, len(trap.update([obj(1, 3, 4), obj(2, -1)], now=0)))
+        np.testing.assert_allclose([5, 1], trap.current)
+        trap.update([obj(2, -2), obj(1, 0, 3)], now=0.5)
+        trap.update([obj(2, -3)], now=1.2)
+        passes = trap.update([obj(2, -3)], now=1.6)  # tracking ID 1 last seen at 0.5
+
+        self.assertEqual(1, len(passes))
+        self.assertEqual(1, passes['tracking_id'][0])
+        self.assertEqual(2, passes['samples'][0])
+        self.assertEqual(5, passes['peak'][0])
+        self.assertEqual(4, passes['average'][0])
+        self.assertEqual((0, 0.5), (passes['start'][0], passes['end'][0]))
+        self.assertAlmostEqual(np.degrees(np.arctan2(7, 3)), passes['direction'][0], places=4)
+
+        passes = trap.close_all()
+        self.assertEqual(2, passes['tracking_id'][0])
+        self.assertEqual(3, passes['peak'][0])
+        self.assertAlmostEqual(180, passes['direction'][0])
+        self.assertEqual(0, len(trap))
+
+    def test_slow_passes_not_recorded(self):
+        trap = speed_trap.SpeedTrap(minimum_speed=0.5)
+        trap.update([obj(1, 0.1), obj(2, 2)], now=0)
+        passes = trap.expire(now=5)
+        self.assertListEqual([2], passes['tracking_id'].tolist())
+        self.assertEqual(0, len(trap.update([], now=6)))
+
+    def test_recycled_tracking_id_starts_new_pass(self):
+        trap = speed_trap.SpeedTrap(timeout=1, capacity=1)
+        trap.update([obj(1, 5)], now=0)
+        trap.update([obj(2, 1)], now=0.1)  # grows
+        passes = trap.update([obj(1, 2)], now=3)
+        self.assertListEqual([5, 1], passes['peak'].tolist())
+        passes = trap.close_all()
+        self.assertListEqual([2], passes['peak'].tolist())
+        self.assertEqual(3, passes['start'][0])
+
+    def test_many_objects(self):
+        rng = np.random.default_rng(0)
+        trap = speed_trap.SpeedTrap(timeout=0.5, minimum_speed=0)
+        velocity = rng.uniform(-10, 10, (30, 3))
+        for frame in range(10):
+            trap.update([obj(i, *velocity[i] * (1 + frame / 10)) for i in range(30)], now=frame * 0.1)
+        passes = trap.expire(now=2)
+        speeds = np.linalg.norm(velocity, axis=1)
+        np.testing.assert_allclose(speeds * 1.9, passes['peak'], rtol=1e-5)
+        np.testing.assert_allclose(speeds * 1.45, passes['average'], rtol=1e-5)
+        self.assertEqual(32, passes.itemsize)
@@ -0,0 +1,71 @@
+import argparse
+import threading
+import time
+from pathlib import Path
+import cv2
+import numpy as np
+from detect_person import DetectPerson
+
+"""
+Measures how many frames per second the person detector gets through on the CPU, with the frames from several cameras
+run through the network one at a time and in batches.
+
+Each camera is a thread calling DetectPerson.detect as fast as it can, on images from a folder or random noise. Must be
+run from the application root directory so the model can be found.
+
+Usage: python benchmark_batching.py --cameras 4 --seconds 20
+"""
+
+
+def load_frames(folder, count=16):
+    if folder is None:
+        rng = np.random.default_rng(0)
+        return [rng.integers(0, 255, (480, 640, 3), dtype=np.uint8) for _ in range(count)]
+    paths = sorted(Path(folder).glob('*.jpg')) + sorted(Path(folder).glob('*.png'))
+    return [cv2.imread(str(path)) for path in paths[:count]]
+
+
+def measure(detector, cameras, frames, seconds):
+    """
+    :return: Frames detected per second, with each camera calling detect in its own thread
+    :rtype: float
+    """
+    counts = [0] * cameras
+    end = time.perf_counter() + seconds
+
+    def camera(number):
+        while time.perf_counter() < end:
+            detector.detect(frames[(counts[number] + number) % len(frames)])
+            counts[number] += 1
+
+    threads = [threading.Thread(target=camera, args=(number,)) for number in range(cameras)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return sum(counts) / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Measure the throughput of the person detector with batching.')
+    parser.add_argument('--cameras', type=int, default=4, help='Number of cameras to simulate.')
+    parser.add_argument('--seconds', type=float, default=20, help='Time to run each test for.')
+    parser.add_argument('--images', help='Folder of images to use as the frames. Random noise by default.')
+    args = parser.parse_args()
+
+    frames = load_frames(args.images)
+    cv2.setNumThreads(cv2.getNumberOfCPUs())
+
+    single = DetectPerson(cameras=1)
+    print(f"One at a time: {measure(single, args.cameras, frames, args.seconds):.1f} frames/s")
+    single.stop()
+
+    batched = DetectPerson(cameras=args.cameras)
+    print(f"Batches of {args.cameras}:  {measure(batched, args.cameras, frames, args.seconds):.1f} frames/s "
+          f"(mean batch size {batched.server.mean_batch_size():.1f})")
+    batched.stop()
+
+
+if __name__ == '__main__':
+    main()
@@ -1,9 +1,15 @@
 import cv2
 import imutils
+from batch_inference import InferenceServer, split_detections, MAX_LATENCY, INFERENCE_TIMEOUT
 
 
 class DetectPerson:
-    def __init__(self):
+    def __init__(self, cameras=1, max_latency=MAX_LATENCY):
+        """
+        :param cameras: Number of cameras detect is called from at once. Their frames are run through the network
+            together in one batch
+        :param max_latency: Longest a frame waits for the frames from the other cameras (seconds)
+        """
         self.viewport = 400
 
         # Image Recognition
@@ -14,19 +20,40 @@ class DetectPerson:
         print("[INFO] loading model...")
         self.net = cv2.dnn.readNetFromCaffe(self.PROTOTXT, self.MODEL)
 
-    def detect(self, frame):
-        # Resize frame for faster detection
-        img_frame = imutils.resize(frame, width=self.viewport)
+        # Runs the frames from all the cameras through the network in batches
+        self.server = InferenceServer(self.forward_batch, max_batch=cameras, max_latency=max_latency)
+        self.server.start()
 
-        # Create blob to feed to the neural net
-        blob = cv2.dnn.blobFromImage(cv2.resize(img_frame, (300, 300)),
-                                     0.007843, (300, 300), 127.5)
+    def forward_batch(self, frames):
+        """
+        Run a batch of 300x300 frames through the neural net in one pass.
+
+        :return: List of the detections of each frame
+        :rtype: list
+        """
+        # Create one blob of all the frames to feed to the neural net
+        blob = cv2.dnn.blobFromImages(frames, 0.007843, (300, 300), 127.5)
 
         # Blob provided to neural net
         self.net.setInput(blob)
 
         # Neural network activated
-        detections = self.net.forward()
+        return split_detections(self.net.forward(), len(frames))
+
+    def detect(self, frame):
+        """
+        Detect whether there is a person in a frame. Can be called from several threads (one per camera) at once.
+
+        :return: True if a person was detected. False if the detections weren't ready within INFERENCE_TIMEOUT
+        """
+        # Resize frame for faster detection
+        img_frame = imutils.resize(frame, width=self.viewport)
+
+        # Neural network activated, along with the frames from any other cameras
+        detections = self.server.infer(cv2.resize(img_frame, (300, 300)), INFERENCE_TIMEOUT)
+        if detections is None:
+            print(f"[WARNING] no detections within {INFERENCE_TIMEOUT} s, skipping the frame")
+            return False
 
         # Removes unnecessary data from the detection and return only objects information
         obj_list = detections[0, 0].tolist()
@@ -43,3 +70,6 @@ class DetectPerson:
 
         else:
             return False
+
+    def stop(self):
+        self.server.stop()
@@ -0,0 +1,86 @@
+import threading
+import time
+import unittest
+import numpy as np
+from batch_inference import InferenceServer, split_detections
+
+"""
+Unit tests for running frames through the network in batches
+
+A copy of Image recognition/test/test_batch_inference.py, apart from the import. Keep the two in sync.
+"""
+
+
+class TestSplitDetections(unittest.TestCase):
+
+    def test_split(self):
+        detections = np.array([[[[1, 15, 0.9, 0.1, 0.1, 0.2, 0.2],
+                                 [0, 15, 0.8, 0.3, 0.3, 0.4, 0.4],
+                                 [1, 7, 0.5, 0.5, 0.5, 0.6, 0.6],
+                                 [0, 15, 0.4, 0.0, 0.0, 0.1, 0.1]]]])
+        frames = split_detections(detections, 3)
+        self.assertEqual([frame.shape for frame in frames], [(1, 1, 2, 7), (1, 1, 2, 7), (1, 1, 0, 7)])
+        self.assertEqual(frames[0][0, 0, :, 2].tolist(), [0.8, 0.4])
+        self.assertEqual(frames[1][0, 0, :, 1].tolist(), [15, 7])
+
+    def test_no_detections(self):
+        # The network gives one row with a frame number of -1 when nothing was detected
+        frames = split_detections(np.array([[[[-1, 0, 0, 0, 0, 0, 0]]]]), 2)
+        self.assertEqual([len(frame[0, 0]) for frame in frames], [0, 0])
+
+
+class TestInferenceServer(unittest.TestCase):
+
+    def setUp(self):
+        self.batches = []
+
+        def forward(frames):
+            self.batches.append(list(frames))
+            return [frame * 10 for frame in frames]
+
+        self.forward = forward
+
+    def test_full_batch_runs_at_once(self):
+        server = InferenceServer(self.forward, max_batch=3, max_latency=10)
+        requests = [server.submit(frame) for frame in range(3)]
+        server.start()
+        self.assertEqual([request.wait(timeout=2) for request in requests], [0, 10, 20])
+        server.stop()
+        self.assertEqual(self.batches, [[0, 1, 2]])
+
+    def test_partial_batch_after_latency(self):
+        server = InferenceServer(self.forward, max_batch=4, max_latency=0.05)
+        server.start()
+        start = time.monotonic()
+        self.assertEqual(server.infer(7, timeout=2), 70)
+        self.assertGreaterEqual(time.monotonic() - start, 0.04)
+        server.stop()
+        self.assertEqual(self.batches, [[7]])
+
+    def test_cameras_in_threads(self):
+        server = InferenceServer(self.forward, max_batch=4, max_latency=1)
+        server.start()
+        results = {}
+
+        def camera(number):
+            results[number] = [server.infer(number * 100 + i, timeout=5) for i in range(5)]
+
+        threads = [threading.Thread(target=camera, args=(number,)) for number in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        server.stop()
+        for number in range(4):
+            self.assertEqual(results[number], [(number * 100 + i) * 10 for i in range(5)])
+        self.assertGreater(server.mean_batch_size(), 1)
+
+    def test_error_is_raised_in_caller(self):
+        def forward(frames):
+            raise ValueError("bad frame")
+
+        server = InferenceServer(forward, max_batch=1)
+        server.start()
+        with self.assertRaises(ValueError):
+            server.infer(1, timeout=2)
+        server.stop()
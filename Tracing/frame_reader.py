@@ -0,0 +1,117 @@
+import threading
+import time
+
+"""
+Reads frames from the sensor in a background thread, so a slow read never holds up drawing.
+
+The reader only keeps the latest frame (a mailbox rather than a queue): the window draws whatever arrived most recently
+and older frames which were never drawn are dropped, so the display can not fall behind the sensor.
+"""
+
+
+class FrameReader(threading.Thread):
+    """
+    Background thread keeping the latest frame from the sensor.
+    """
+
+    def __init__(self, data_getter, on_frame=None, clock=time.monotonic):
+        """
+        :param data_getter: Function returning an iterator of frames (eg. RadarIQ.get_data)
+        :param on_frame: Function called (in the reader thread) with every frame, including frames which are never drawn
+        :param clock: Function returning the current time in seconds
+        """
+        threading.Thread.__init__(self, daemon=True)
+        self.data_getter = data_getter
+        self.on_frame = on_frame
+        self.clock = clock
+        self.lock = threading.Lock()
+        self.frame = None
+        self.received = None  # Time the latest frame was received
+        self.new = False
+        self.frames = 0  # Number of frames received
+        self.running = True
+
+    def run(self):
+        for frame in self.data_getter():
+            if not self.running:
+                break
+            if frame is not None:
+                if self.on_frame is not None:
+                    self.on_frame(frame)
+                self.put(frame)
+
+    def put(self, frame):
+        with self.lock:
+            self.frame = frame
+            self.received = self.clock()
+            self.new = True
+            self.frames += 1
+
+    def take(self):
+        """
+        Take the latest frame, without waiting.
+
+        :return: The latest frame and the time it was received, or (None, None) if there has not been a new frame since
+            the last call
+        :rtype: tuple
+        """
+        with self.lock:
+            if not self.new:
+                return None, None
+            self.new = False
+            return self.frame, self.received
+
+    def frame_age(self):
+        """
+        :return: Seconds since the latest frame was received, or None if no frame has been received
+        :rtype: float
+        """
+        received = self.received
+        return None if received is None else self.clock() - received
+
+    def stop(self):
+        self.running = False
+
+
+class RenderRate:
+    """
+    Measures how often the window is redrawn.
+    """
+
+    def __init__(self, smoothing=0.1, clock=time.monotonic):
+        """
+        :param smoothing: Weight given to the latest frame time in the moving average
+        :param clock: Function returning the current time in seconds
+        """
+        self.smoothing = smoothing
+        self.clock = clock
+        self.last = None
+        self.interval = None  # Moving average of the time between redraws
+
+    def tick(self):
+        """
+        Record a redraw.
+
+        :return: The number of redraws per second
+        :rtype: float
+        """
+        now = self.clock()
+        if self.last is not None:
+            interval = now - self.last
+            self.interval = interval if self.interval is None else \
+                self.interval + self.smoothing * (interval - self.interval)
+        self.last = now
+        return self.fps()
+
+    def fps(self):
+        return 0 if not self.interval else 1 / self.interval
+
+    def label(self, reader):
+        """
+        :param reader: The FrameReader the frames are coming from
+        :return: Text showing the render rate and the age of the latest frame
+        :rtype: str
+        """
+        age = reader.frame_age()
+        age = '-' if age is None else f'{age * 1000:.0f} ms'
+        return f'{self.fps():.1f} fps, frame age {age}'
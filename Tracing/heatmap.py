@@ -0,0 +1,127 @@
+import argparse
+from math import tan, radians
+import numpy as np
+import matplotlib.pyplot as plt
+from trace_log import read_chunks, CHUNK_SIZE
+from tracing import MIN_ANGLE, MAX_ANGLE, MAX_DISTANCE
+
+"""
+Builds a heatmap of where people walked from a trace log (recorded with python tracing.py --log <file>).
+
+The log is read a chunk at a time and each chunk is added to the heatmap with np.bincount, so logs covering days or
+weeks can be processed without loading them into memory.
+
+Usage: python heatmap.py trace.bin --mode dwell --output heatmap.png
+"""
+
+CELL_SIZE = 200  # Size of each heatmap cell (mm)
+MAX_GAP = 1  # Time between sightings of a person longer than this is not counted towards their dwell time (seconds)
+MAX_TRACKING_ID = 2 ** 16  # Tracking IDs are stored as 16 bit numbers in the log
+
+
+class Heatmap:
+    """
+    Occupancy (number of sightings) and dwell time (seconds) in each cell of a grid.
+    """
+
+    def __init__(self, x_range, y_range, cell_size=CELL_SIZE, max_gap=MAX_GAP):
+        """
+        :param x_range: (min, max) x position covered by the grid (mm)
+        :param y_range: (min, max) y position covered by the grid (mm)
+        :param cell_size: Size of each cell (mm)
+        :param max_gap: Longest time between sightings of a person which counts towards their dwell time (seconds)
+        """
+        self.x_min, self.y_min = x_range[0], y_range[0]
+        self.cell_size = cell_size
+        self.max_gap = max_gap
+        self.shape = (int(np.ceil((y_range[1] - y_range[0]) / cell_size)),
+                      int(np.ceil((x_range[1] - x_range[0]) / cell_size)))
+        self.occupancy = np.zeros(self.shape[0] * self.shape[1])
+        self.dwell = np.zeros(self.shape[0] * self.shape[1])
+        self.last_seen = np.full(MAX_TRACKING_ID, -np.inf)  # Time each tracking ID was last seen, carried across chunks
+        self.records = 0
+
+    def add(self, records):
+        """
+        Add a chunk of records from a trace log. Chunks must be added in the order they were recorded.
+
+        :param records: Record array with the fields time, tracking_id, x and y
+        """
+        self.records += len(records)
+        if len(records) == 0:
+            return
+
+        # Time since each person was previously seen, with the records grouped by person
+        order = np.lexsort((records['time'], records['tracking_id']))
+        tracking_ids = records['tracking_id'][order].astype(int)
+        times = records['time'][order]
+        first = np.ones(len(order), dtype=bool)
+        first[1:] = tracking_ids[1:] != tracking_ids[:-1]
+        previous = np.empty(len(order))
+        previous[1:] = times[:-1]
+        previous[first] = self.last_seen[tracking_ids[first]]
+        gap = times - previous
+        gap[gap > self.max_gap] = 0
+        last = np.ones(len(order), dtype=bool)
+        last[:-1] = first[1:]
+        self.last_seen[tracking_ids[last]] = times[last]
+
+        column = np.floor((records['x'][order] - self.x_min) / self.cell_size).astype(int)
+        row = np.floor((records['y'][order] - self.y_min) / self.cell_size).astype(int)
+        inside = (column >= 0) & (column < self.shape[1]) & (row >= 0) & (row < self.shape[0])
+        cells = row[inside] * self.shape[1] + column[inside]
+        self.occupancy += np.bincount(cells, minlength=len(self.occupancy))
+        self.dwell += np.bincount(cells, weights=gap[inside], minlength=len(self.dwell))
+
+    def grid(self, mode='dwell'):
+        """
+        :param mode: 'occupancy' or 'dwell'
+        :return: The heatmap as an array of shape (rows, columns), row 0 being the closest to the sensor
+        :rtype: np.ndarray
+        """
+        return (self.dwell if mode == 'dwell' else self.occupancy).reshape(self.shape)
+
+    def extent(self):
+        return (self.x_min, self.x_min + self.shape[1] * self.cell_size,
+                self.y_min, self.y_min + self.shape[0] * self.cell_size)
+
+
+def build_heatmap(filename, cell_size=CELL_SIZE, max_gap=MAX_GAP, chunk_size=CHUNK_SIZE):
+    """
+    Build a heatmap covering the sensor's field of view (as set in tracing.py) from a trace log.
+
+    :return: A Heatmap object
+    :rtype: Heatmap
+    """
+    x_range = (tan(radians(MIN_ANGLE)) * MAX_DISTANCE, tan(radians(MAX_ANGLE)) * MAX_DISTANCE)
+    heatmap = Heatmap(x_range, (0, MAX_DISTANCE), cell_size, max_gap)
+    for records in read_chunks(filename, chunk_size):
+        heatmap.add(records)
+    return heatmap
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Build a heatmap of where people walked from a trace log.')
+    parser.add_argument('filename', help='The trace log (recorded with python tracing.py --log <file>).')
+    parser.add_argument('--mode', choices=['dwell', 'occupancy'], default='dwell',
+                        help='Plot the time spent in each cell (dwell) or the number of sightings (occupancy).')
+    parser.add_argument('--cell-size', type=float, default=CELL_SIZE, help='Size of each cell in mm.')
+    parser.add_argument('--output', help='Save the heatmap to this image file instead of showing it.')
+    args = parser.parse_args()
+
+    heatmap = build_heatmap(args.filename, args.cell_size)
+    print(f"{heatmap.records} positions, {heatmap.dwell.sum():.0f} seconds of dwell time")
+
+    fig, ax = plt.subplots()
+    image = ax.imshow(heatmap.grid(args.mode), origin='lower', extent=heatmap.extent(), cmap='hot', aspect='equal')
+    fig.colorbar(image, ax=ax, label='seconds' if args.mode == 'dwell' else 'sightings')
+    ax.set_xlabel('x (mm)')
+    ax.set_ylabel('y (mm)')
+    if args.output:
+        fig.savefig(args.output)
+    else:
+        plt.show()
+
+
+if __name__ == '__main__':
+    main()
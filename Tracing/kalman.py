@@ -0,0 +1,130 @@
+import numpy as np
+
+"""
+Constant velocity Kalman filter for many tracked objects at once.
+
+The state ([x, y, x velocity, y velocity]) and covariance of every track are kept in NumPy arrays, one row per track, so
+each frame all the tracks in it are predicted and updated with a handful of batched matrix operations rather than a loop
+over tracks. The filtered velocity also gives a short prediction of where each object will be, used to draw smooth
+motion between frames when the sensor is run at a low frame rate.
+"""
+
+MEASUREMENT_NOISE = 150  # Standard deviation of the error in the sensor's positions (mm)
+PROCESS_NOISE = 2000  # Standard deviation of how quickly people change velocity (mm/s^2)
+INITIAL_SPEED = 1500  # Standard deviation of the velocity of a newly seen object (mm/s)
+MAX_PREDICTION = 1  # Furthest ahead positions are predicted (seconds)
+
+
+class KalmanTracks:
+    """
+    Kalman filters for a set of tracks, keyed by tracking ID.
+    """
+
+    def __init__(self, measurement_noise=MEASUREMENT_NOISE, process_noise=PROCESS_NOISE,
+                 initial_speed=INITIAL_SPEED, capacity=16):
+        """
+        :param measurement_noise: Standard deviation of the error in the measured positions (mm)
+        :param process_noise: Standard deviation of the acceleration of the objects (mm/s^2)
+        :param initial_speed: Standard deviation of the velocity of a newly seen object (mm/s)
+        :param capacity: Number of tracks to allocate space for initially (grows as needed)
+        """
+        self.measurement_variance = measurement_noise ** 2
+        self.process_variance = process_noise ** 2
+        self.initial_covariance = np.diag([self.measurement_variance] * 2 + [initial_speed ** 2] * 2)
+        self.state = np.zeros((capacity, 4))  # [x, y, x velocity, y velocity] of each track
+        self.covariance = np.zeros((capacity, 4, 4))
+        self.time = np.zeros(capacity)  # Time of the last update of each track
+        self.rows = {}  # In the form {<tracking id>: <row>}
+        self.free = list(range(capacity - 1, -1, -1))
+
+    def update(self, tracking_ids, x, y, now):
+        """
+        Update the tracks with the measured positions of a frame.
+
+        :param tracking_ids: Tracking IDs of the objects in the frame
+        :param x: Measured x positions
+        :param y: Measured y positions
+        :param now: Time of the frame (seconds)
+        :return: Filtered x and y positions
+        :rtype: tuple
+        """
+        measured = np.column_stack((x, y)).astype(float)
+        new = np.array([tracking_id not in self.rows for tracking_id in tracking_ids], dtype=bool)
+        rows = np.array([self._row(tracking_id) for tracking_id in tracking_ids], dtype=int)
+
+        if len(rows) > 0:
+            old_rows = rows[~new]
+            if len(old_rows) > 0:
+                self._predict(old_rows, now - self.time[old_rows])
+                self._correct(old_rows, measured[~new])
+            new_rows = rows[new]
+            self.state[new_rows, :2] = measured[new]
+            self.state[new_rows, 2:] = 0
+            self.covariance[new_rows] = self.initial_covariance
+            self.time[rows] = now
+        return self.state[rows, 0], self.state[rows, 1]
+
+    def _predict(self, rows, dt):
+        dt = np.maximum(dt, 0)
+        n = len(rows)
+        transition = np.broadcast_to(np.eye(4), (n, 4, 4)).copy()
+        transition[:, 0, 2] = transition[:, 1, 3] = dt
+
+        # Random acceleration between the frames
+        noise = np.zeros((n, 4, 4))
+        position, cross, velocity = dt ** 4 / 4, dt ** 3 / 2, dt ** 2
+        for i, j, value in ((0, 0, position), (1, 1, position), (0, 2, cross), (1, 3, cross), (2, 0, cross),
+                            (3, 1, cross), (2, 2, velocity), (3, 3, velocity)):
+            noise[:, i, j] = value * self.process_variance
+
+        self.state[rows] = np.einsum('nij,nj->ni', transition, self.state[rows])
+        self.covariance[rows] = transition @ self.covariance[rows] @ transition.transpose(0, 2, 1) + noise
+
+    def _correct(self, rows, measured):
+        covariance = self.covariance[rows]
+        innovation_covariance = covariance[:, :2, :2] + np.eye(2) * self.measurement_variance
+        gain = covariance[:, :, :2] @ np.linalg.inv(innovation_covariance)
+        innovation = measured - self.state[rows, :2]
+        self.state[rows] += np.einsum('nij,nj->ni', gain, innovation)
+        self.covariance[rows] = covariance - gain @ covariance[:, :2, :]
+
+    def predict(self, tracking_ids, now):
+        """
+        Predict where the objects are at a time after their last update.
+
+        :param tracking_ids: Tracking IDs of the objects
+        :param now: Time to predict the positions at, or an array of times, one for each object (seconds). At most
+            MAX_PREDICTION after the last update
+        :return: Array of positions of shape (n, 2)
+        :rtype: np.ndarray
+        """
+        rows = np.array([self.rows[tracking_id] for tracking_id in tracking_ids], dtype=int)
+        ahead = np.clip(now - self.time[rows], 0, MAX_PREDICTION)
+        return self.state[rows, :2] + self.state[rows, 2:] * ahead[:, None]
+
+    def remove(self, tracking_id):
+        """
+        Forget a track.
+        """
+        row = self.rows.pop(tracking_id, None)
+        if row is not None:
+            self.free.append(row)
+
+    def clear(self):
+        self.free.extend(self.rows.values())
+        self.rows.clear()
+
+    def _row(self, tracking_id):
+        row = self.rows.get(tracking_id)
+        if row is None:
+            if len(self.free) == 0:
+                self._grow()
+            row = self.rows[tracking_id] = self.free.pop()
+        return row
+
+    def _grow(self):
+        capacity = len(self.time)
+        self.state = np.concatenate((self.state, np.zeros_like(self.state)))
+        self.covariance = np.concatenate((self.covariance, np.zeros_like(self.covariance)))
+        self.time = np.concatenate((self.time, np.zeros_like(self.time)))
+        self.free.extend(range(2 * capacity - 1, capacity - 1, -1))
@@ -0,0 +1,65 @@
+import threading
+import time
+import unittest
+import frame_reader
+
+"""
+Unit tests for the background frame reader
+"""
+
+
+class TestFrameReader(unittest.TestCase):
+
+    def test_latest_frame(self):
+        reader = frame_reader.FrameReader(lambda: iter([]))
+        self.assertEqual((None, None), reader.take())
+        reader.put([1])
+        reader.put([2])
+        self.assertListEqual([2], reader.take()[0])
+        self.assertEqual((None, None), reader.take())
+        self.assertEqual(2, reader.frames)
+
+    def test_slow_sensor_does_not_block(self):
+        release = threading.Event()
+        logged = []
+
+        def slow_sensor():
+            yield [1]
+            release.wait(5)  # a read which takes a long time
+            yield None
+            yield [2]
+
+        reader = frame_reader.FrameReader(slow_sensor, on_frame=logged.append)
+        reader.start()
+        deadline = time.monotonic() + 2
+        while reader.frames == 0 and time.monotonic() < deadline:
+            time.sleep(0.001)
+
+        start = time.perf_counter()
+        frames = [reader.take()[0] for _ in range(100)]
+        self.assertLess(time.perf_counter() - start, 0.1)
+        self.assertListEqual([[1]] + [None] * 99, frames)
+        self.assertGreaterEqual(reader.frame_age(), 0)
+
+        release.set()
+        reader.join(2)
+        self.assertListEqual([2], reader.take()[0])
+        self.assertListEqual([[1], [2]], logged)
+
+
+class TestRenderRate(unittest.TestCase):
+
+    def test_fps(self):
+        times = iter([0, 0.05, 0.1, 0.15])
+        rate = frame_reader.RenderRate(clock=lambda: next(times))
+        self.assertEqual(0, rate.tick())
+        for _ in range(3):
+            fps = rate.tick()
+        self.assertAlmostEqual(20, fps)
+
+    def test_label(self):
+        reader = frame_reader.FrameReader(lambda: iter([]), clock=lambda: 10)
+        rate = frame_reader.RenderRate()
+        self.assertEqual('0.0 fps, frame age -', rate.label(reader))
+        reader.put([])
+        self.assertEqual('0.0 fps, frame age 0 ms', rate.label(reader))
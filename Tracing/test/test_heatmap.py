@@ -0,0 +1,84 @@
+import os
+import tempfile
+import unittest
+import numpy as np
+import trace_log
+import heatmap
+
+"""
+Unit tests for the trace log and heatmaps
+"""
+
+
+def walk(tracking_id, start, end, t0, duration, frame_rate=5):
+    """
+    Frames of one person walking in a straight line.
+    """
+    n = int(duration * frame_rate)
+    return [(t0 + i / frame_rate, [{'tracking_id': tracking_id,
+                                    'x_pos': start[0] + (end[0] - start[0]) * i / n,
+                                    'y_pos': start[1] + (end[1] - start[1]) * i / n}]) for i in range(n)]
+
+
+class TestTraceLog(unittest.TestCase):
+
+    def setUp(self):
+        self.filename = os.path.join(tempfile.mkdtemp(), 'trace.bin')
+
+    def tearDown(self):
+        os.remove(self.filename)
+
+    def test_round_trip(self):
+        log = trace_log.TraceWriter(self.filename, batch_size=3, clock=lambda: 0)
+        for now, frame in walk(7, (0, 1000), (0, 2000), 100, 2):
+            log.write(frame, now)
+        log.close()
+
+        records = np.concatenate(list(trace_log.read_chunks(self.filename, chunk_size=4)))
+        self.assertEqual(10, len(records))
+        self.assertEqual(18, records.itemsize)
+        self.assertListEqual([7] * 10, records['tracking_id'].tolist())
+        np.testing.assert_allclose(np.arange(10) * 100 + 1000, records['y'])
+        np.testing.assert_allclose(100 + np.arange(10) / 5, records['time'])
+
+    def test_partial_record_ignored(self):
+        log = trace_log.TraceWriter(self.filename)
+        log.write([{'tracking_id': 1, 'x_pos': 0, 'y_pos': 0}])
+        log.close()
+        with open(self.filename, 'ab') as f:
+            f.write(b'\x00' * 5)
+        self.assertEqual(1, sum(len(records) for records in trace_log.read_chunks(self.filename)))
+
+
+class TestHeatmap(unittest.TestCase):
+
+    def test_chunks_match_histogram2d(self):
+        rng = np.random.default_rng(3)
+        records = np.zeros(5000, dtype=trace_log.RECORD)
+        records['time'] = np.arange(5000) / 5
+        records['tracking_id'] = rng.integers(0, 5, 5000)
+        records['x'] = rng.uniform(-3000, 3000, 5000)
+        records['y'] = rng.uniform(0, 6000, 5000)
+
+        grid = heatmap.Heatmap((-4000, 4000), (0, 8000), cell_size=500)
+        for start in range(0, len(records), 700):
+            grid.add(records[start:start + 700])
+
+        expected, _, _ = np.histogram2d(records['y'], records['x'], bins=(16, 16), range=((0, 8000), (-4000, 4000)))
+        np.testing.assert_array_equal(expected, grid.grid('occupancy'))
+
+    def test_dwell(self):
+        records = np.zeros(100, dtype=trace_log.RECORD)
+        records['time'] = np.arange(100) / 5
+        records['tracking_id'] = 1
+        records['x'] = 100
+        records['y'][:50] = 1100  # stands still for 10 seconds
+        records['y'][50:] = 3100  # then another 10 seconds elsewhere
+        records['time'][50:] += 60  # after leaving for a minute
+
+        grid = heatmap.Heatmap((-1000, 1000), (0, 4000), cell_size=1000)
+        grid.add(records[:30])
+        grid.add(records[30:])
+        self.assertAlmostEqual(9.8, grid.grid('dwell')[1, 1])
+        self.assertAlmostEqual(9.8, grid.grid('dwell')[3, 1])
+        self.assertAlmostEqual(19.6, grid.dwell.sum())
@@ -0,0 +1,62 @@
+import unittest
+import numpy as np
+import kalman
+
+"""
+Unit tests for the Kalman filter
+"""
+
+
+def walking(n_tracks, n_frames, frame_rate, noise, seed=0):
+    """
+    People walking in straight lines at different speeds, measured with noise.
+    """
+    rng = np.random.default_rng(seed)
+    start = rng.uniform(-3000, 3000, (n_tracks, 2))
+    velocity = rng.uniform(-1500, 1500, (n_tracks, 2))
+    times = np.arange(n_frames) / frame_rate
+    true = start[None] + velocity[None] * times[:, None, None]  # shape (frames, tracks, 2)
+    return times, true, true + rng.normal(0, noise, true.shape)
+
+
+class TestKalmanTracks(unittest.TestCase):
+
+    def test_smooths(self):
+        times, true, measured = walking(20, 50, 5, 150)
+        tracks = kalman.KalmanTracks()
+        filtered = np.zeros_like(measured)
+        for frame, now in enumerate(times):
+            x, y = tracks.update(list(range(20)), measured[frame, :, 0], measured[frame, :, 1], now)
+            filtered[frame] = np.column_stack((x, y))
+
+        settled = slice(10, None)  # once the velocity has been estimated
+        raw_error = np.sqrt(np.mean((measured[settled] - true[settled]) ** 2))
+        filtered_error = np.sqrt(np.mean((filtered[settled] - true[settled]) ** 2))
+        self.assertLess(filtered_error, raw_error * 0.8)
+
+        # Predicting two frames ahead is better than the latest raw position
+        predicted = tracks.predict(list(range(20)), times[-1] + 0.4)
+        actual = true[-1] + (true[-1] - true[-2]) * 2
+        self.assertLess(np.sqrt(np.mean((predicted - actual) ** 2)), np.sqrt(np.mean((measured[-1] - actual) ** 2)))
+
+    def test_tracks_are_independent(self):
+        times, _, measured = walking(3, 20, 5, 150)
+        together = kalman.KalmanTracks(capacity=1)
+        separate = [kalman.KalmanTracks() for _ in range(3)]
+        for frame, now in enumerate(times):
+            # Tracks come and go in a different order each frame
+            order = [(frame + i) % 3 for i in range(3)] if frame % 4 else [1]
+            x, y = together.update(order, measured[frame, order, 0], measured[frame, order, 1], now)
+            for i, track in enumerate(order):
+                expected = separate[track].update([0], measured[frame, [track], 0], measured[frame, [track], 1], now)
+                self.assertAlmostEqual(expected[0][0], x[i])
+                self.assertAlmostEqual(expected[1][0], y[i])
+
+    def test_remove(self):
+        tracks = kalman.KalmanTracks()
+        tracks.update([5], [0], [1000], 0)
+        tracks.update([5], [100], [1000], 0.2)
+        tracks.remove(5)
+        # A recycled tracking ID starts again from its measured position
+        x, y = tracks.update([5], [3000], [3000], 0.4)
+        self.assertListEqual([3000, 3000], [x[0], y[0]])
@@ -0,0 +1,87 @@
+import unittest
+import numpy as np
+import trail
+
+"""
+Unit tests for trail
+"""
+
+
+class TestTrail(unittest.TestCase):
+
+    def test_decimation(self):
+        path = trail.Trail(capacity=10, min_step=50)
+        self.assertTrue(path.append(0, 0))
+        self.assertFalse(path.append(30, 30))
+        self.assertTrue(path.append(0, 60))
+        self.assertListEqual([[0, 0], [0, 60]], path.points().tolist())
+
+    def test_drops_oldest_without_simplifying(self):
+        path = trail.Trail(capacity=4, min_step=0, tolerance=0)
+        for i in range(10):
+            path.append(i, 0)
+        self.assertListEqual([6, 7, 8, 9], path.points()[:, 0].tolist())
+
+    def test_long_trace_is_bounded(self):
+        rng = np.random.default_rng(1)
+        steps = rng.normal(0, 100, (100000, 2)).cumsum(axis=0)
+        path = trail.Trail(capacity=200, min_step=0)
+        for x, y in steps:
+            path.append(x, y)
+            self.assertLessEqual(len(path), 200)
+        self.assertListEqual(steps[-1].tolist(), path.points()[-1].tolist())
+        # The newest points are kept as they were
+        self.assertTrue(np.array_equal(steps[-50:], path.points()[-50:]))
+
+    def test_clear(self):
+        path = trail.Trail()
+        path.append(1, 2)
+        path.clear()
+        self.assertEqual(0, len(path.points()))
+
+
+class TestTrailSet(unittest.TestCase):
+
+    def test_path_per_object(self):
+        paths = trail.TrailSet(min_step=0, smooth=False)
+        paths.update([{'tracking_id': 1, 'x_pos': 0, 'y_pos': 1000}, {'tracking_id': 2, 'x_pos': 500, 'y_pos': 2000}],
+                     now=0)
+        paths.update([{'tracking_id': 2, 'x_pos': 600, 'y_pos': 2000}, {'tracking_id': 1, 'x_pos': 0, 'y_pos': 1100}],
+                     now=0.2)
+        tracking_ids, segments = paths.segments()
+        self.assertListEqual([1, 2], tracking_ids)
+        self.assertListEqual([[0, 1000], [0, 1100]], segments[0].tolist())
+        self.assertListEqual([[500, 2000], [600, 2000]], segments[1].tolist())
+        self.assertListEqual([[0, 1100], [600, 2000]], paths.heads().tolist())
+
+    def test_expire(self):
+        paths = trail.TrailSet(ttl=3)
+        paths.update([{'tracking_id': 1, 'x_pos': 0, 'y_pos': 1000}], now=0)
+        paths.update([{'tracking_id': 2, 'x_pos': 0, 'y_pos': 1000}], now=2)
+        self.assertFalse(paths.expire(now=3))
+        self.assertTrue(paths.expire(now=3.5))
+        self.assertListEqual([2], paths.segments()[0])
+        self.assertEqual(0, len(trail.TrailSet().heads()))
+
+
+class TestRdp(unittest.TestCase):
+
+    def test_straight_line(self):
+        points = np.column_stack((np.arange(10.0), np.zeros(10)))
+        self.assertListEqual([0, 9], np.flatnonzero(trail.rdp(points, 1)).tolist())
+
+    def test_keeps_corner(self):
+        points = np.array([[0, 0], [5, 0.5], [10, 0], [10, 5], [10, 10]], dtype=float)
+        self.assertListEqual([0, 2, 4], np.flatnonzero(trail.rdp(points, 1)).tolist())
+
+    def test_within_tolerance(self):
+        rng = np.random.default_rng(2)
+        points = rng.normal(0, 100, (500, 2)).cumsum(axis=0)
+        kept = np.flatnonzero(trail.rdp(points, 30))
+        # Every removed point is within the tolerance of the segment it was replaced by
+        for first, last in zip(kept[:-1], kept[1:]):
+            start, end = points[first], points[last]
+            direction = (end - start) / np.linalg.norm(end - start)
+            offsets = points[first + 1:last] - start
+            distance = np.abs(direction[0] * offsets[:, 1] - direction[1] * offsets[:, 0])
+            self.assertTrue(np.all(distance <= 30))
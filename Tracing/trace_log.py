@@ -0,0 +1,87 @@
+import time
+import numpy as np
+
+"""
+Compact binary log of tracked positions.
+
+Each position is an 18 byte record (time, tracking ID, x, y) and a log is just these records one after the other, so
+logs can be appended to across runs and read back in chunks (via a memory map) however big they grow.
+"""
+
+RECORD = np.dtype([('time', '<f8'), ('tracking_id', '<u2'), ('x', '<f4'), ('y', '<f4')])
+BATCH_SIZE = 1000  # Number of records collected before writing them to the file
+FLUSH_INTERVAL = 5  # Maximum time records are held before writing them to the file (seconds)
+CHUNK_SIZE = 1000000  # Number of records read at a time
+
+
+class TraceWriter:
+    """
+    Appends positions to a log in batches.
+    """
+
+    def __init__(self, filename, batch_size=BATCH_SIZE, flush_interval=FLUSH_INTERVAL, clock=time.time):
+        """
+        :param filename: Path to the log. Records are added to the end if it already exists
+        :param batch_size: Number of records collected before writing them
+        :param flush_interval: Maximum time records are held before writing them (seconds)
+        :param clock: Function returning the current time in seconds since the epoch
+        """
+        self.file = open(filename, 'ab')
+        self.flush_interval = flush_interval
+        self.clock = clock
+        self.batch = np.zeros(batch_size, dtype=RECORD)
+        self.length = 0
+        self.last_flush = clock()
+        self.written = 0
+
+    def write(self, frame, now=None):
+        """
+        Add the positions of the objects in an object tracking frame.
+
+        :param frame: Object tracking frame from the RadarIQ module
+        :param now: Time the frame was received (seconds since the epoch). Defaults to now
+        """
+        now = self.clock() if now is None else now
+        for obj in frame:
+            if self.length == len(self.batch):
+                self.flush(now)
+            self.batch[self.length] = (now, obj['tracking_id'], obj['x_pos'], obj['y_pos'])
+            self.length += 1
+        if now - self.last_flush >= self.flush_interval:
+            self.flush(now)
+
+    def flush(self, now=None):
+        """
+        Write the collected records to the file.
+        """
+        self.last_flush = self.clock() if now is None else now
+        if self.length > 0:
+            self.file.write(self.batch[:self.length].tobytes())
+            self.file.flush()
+            self.written += self.length
+            self.length = 0
+
+    def close(self):
+        self.flush()
+        self.file.close()
+
+
+def read_chunks(filename, chunk_size=CHUNK_SIZE):
+    """
+    Read a log a chunk at a time.
+
+    A partly written record at the end of the file (eg. if the program was killed while writing) is ignored.
+
+    :param filename: Path to the log
+    :param chunk_size: Number of records in each chunk
+    :return: Iterator of record arrays with the fields time, tracking_id, x and y
+    """
+    with open(filename, 'rb') as f:
+        f.seek(0, 2)
+        n_records = f.tell() // RECORD.itemsize
+    if n_records == 0:
+        return
+    records = np.memmap(filename, dtype=RECORD, mode='r', shape=(n_records,))
+    for start in range(0, n_records, chunk_size):
+        yield np.array(records[start:start + chunk_size])
+    del records
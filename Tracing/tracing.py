@@ -1,12 +1,27 @@
+import argparse
 from math import tan, radians
 from radariq import RadarIQ, MODE_OBJECT_TRACKING, OUTPUT_LIST
 import matplotlib.pyplot as plt
 from matplotlib import animation
 from matplotlib.widgets import Button
 import matplotlib.lines as mlines
+from matplotlib.collections import LineCollection
+from trail import TrailSet
+from trace_log import TraceWriter
+from frame_reader import FrameReader, RenderRate
 
 """
 Demonstration program tracing a path using RadarIQ's object tracking
+
+Every tracked object gets its own path, in its own colour. All the paths are drawn by a single LineCollection so drawing
+stays quick with many people in view. The positions are smoothed with a Kalman filter and a dashed line shows where
+each person is predicted to be PREDICT_FRAMES frames ahead. The sensor is read in a background thread and the window is
+redrawn with the latest frame every RENDER_INTERVAL, so it stays responsive however slowly the frames arrive.
+
+Usage:
+    python tracing.py  (show the paths)
+    python tracing.py --log trace.bin  (show the paths and save the positions to trace.bin)
+    python tracing.py --log trace.bin --headless  (save the positions without showing them, eg. for python heatmap.py)
 """
 
 FRAME_RATE = 5  # frames per second
@@ -14,6 +29,8 @@ MIN_DISTANCE = 10  # Closest distance to look (mm)
 MAX_DISTANCE = 10000  # Furthermost distance to look (mm)
 MIN_ANGLE = -45  # Minimum angle to look
 MAX_ANGLE = 45  # Maximum angle to look
+RENDER_INTERVAL = 50  # Time between redraws of the window (ms)
+PREDICT_FRAMES = 2  # Number of frames ahead to draw the predicted path (0 to not draw it)
 
 
 class Visualize:
@@ -21,21 +38,34 @@ class Visualize:
     Visualize Paths using RadarIQ's object tracking mode.
     """
 
-    def __init__(self):
+    def __init__(self, log_file=None):
+        """
+        :param log_file: Trace log to save the tracked positions to (None to not save them)
+        """
         self.riq = None
+        self.log = None if log_file is None else TraceWriter(log_file)
         self.fig = None
         self.anim = None
-        self.line = None
-        self.data = [[], []]
-
-    def start(self):
+        self.paths = None
+        self.heads = None
+        self.predicted = None
+        self.status = None
+        self.reader = None
+        self.render_rate = RenderRate()
+        self.trails = TrailSet()
+
+    def start(self, headless=False):
         """
         Start the visualization.
+
+        :param headless: Only save the positions to the log, without showing them
         """
         try:
             self.setup_radariq()
-            self.start_animation()
-            self.riq.start()
+            if headless:
+                self.record()
+            else:
+                self.start_animation()
 
         except Exception as err:
             print(err)
@@ -59,7 +89,6 @@ class Visualize:
             print(error)
 
     def start_animation(self):
-        frame_speed = (1000 / FRAME_RATE) / 2  # run the animation faster than the module
         self.fig, ax = plt.subplots()
         plt.subplots_adjust(bottom=0.2)
 
@@ -77,24 +106,65 @@ class Visualize:
         b_clear = Button(ax_clear, 'Clear')
         b_clear.on_clicked(self.clear)
 
-        self.line, = ax.plot(self.data[0], self.data[1], "ro-")
+        self.paths = LineCollection([], linewidths=1.5, cmap=plt.get_cmap('tab10'), norm=plt.Normalize(0, 10))
+        ax.add_collection(self.paths)
+        self.predicted = LineCollection([], linewidths=1.5, linestyles='dashed', cmap=plt.get_cmap('tab10'),
+                                        norm=plt.Normalize(0, 10))
+        ax.add_collection(self.predicted)
+        self.heads = ax.scatter([], [], c='red', zorder=3)
+        self.status = ax.text(0.02, 0.97, '', transform=ax.transAxes, va='top', fontsize=8, color='grey')
+
         self.riq.start()
-        self.anim = animation.FuncAnimation(self.fig, self.update_plot, frames=self.riq.get_data, interval=frame_speed,
-                                            init_func=self.init_plot, blit=True)
+        self.reader = FrameReader(self.riq.get_data, None if self.log is None else self.log.write)
+        self.reader.start()
+        self.anim = animation.FuncAnimation(self.fig, self.animate, interval=RENDER_INTERVAL, init_func=self.init_plot,
+                                            blit=True, cache_frame_data=False)
         plt.show()
 
+    def record(self):
+        """
+        Save the tracked positions to the log until the program is stopped.
+        """
+        self.riq.start()
+        for frame in self.riq.get_data():
+            if frame is not None:
+                self.log.write(frame)
+
     def init_plot(self):
-        return self.line,
+        return self.paths, self.predicted, self.heads, self.status
 
-    def update_plot(self, frame):
-        if frame is not None and len(frame)>0:
-            self.data[0].append(frame[0]['x_pos'])
-            self.data[1].append(frame[0]['y_pos'])
-            self.line.set_data(self.data)
-        return self.line,
+    def animate(self, i):
+        """
+        Redraw the window with the latest frame, if a new one has arrived.
+        """
+        frame, received = self.reader.take()
+        artists = self.update_plot(frame, received)
+        self.render_rate.tick()
+        self.status.set_text(self.render_rate.label(self.reader))
+        return artists + (self.status,)
+
+    def update_plot(self, frame, now=None):
+        if frame is not None:
+            changed = self.trails.update(frame, now)
+        else:
+            changed = self.trails.expire()
+        if changed:
+            self.draw_paths()
+        return self.paths, self.predicted, self.heads
+
+    def draw_paths(self):
+        tracking_ids, segments = self.trails.segments()
+        self.paths.set_segments(segments)
+        colours = [tracking_id % 10 for tracking_id in tracking_ids]  # colour each object's path
+        self.paths.set_array(colours)
+        self.heads.set_offsets(self.trails.heads())
+        if PREDICT_FRAMES > 0:
+            self.predicted.set_segments(self.trails.predictions(PREDICT_FRAMES / FRAME_RATE))
+            self.predicted.set_array(colours)
 
     def clear(self, event):
-        self.data = [[], []]
+        self.trails.clear()
+        self.draw_paths()
 
     def exit_handler(self):
         """
@@ -104,8 +174,20 @@ class Visualize:
             self.riq.close()
         except Exception:
             pass
+        if self.reader is not None:
+            self.reader.stop()
+            self.reader.join(timeout=2)
+        if self.log is not None:
+            self.log.close()
 
 
 if __name__ == '__main__':
-    vis = Visualize()
-    vis.start()
+    parser = argparse.ArgumentParser(description='Trace the paths of the people in view of the sensor.')
+    parser.add_argument('--log', help='Save the tracked positions to this file.')
+    parser.add_argument('--headless', action='store_true', help='Save the positions without showing them.')
+    args = parser.parse_args()
+    if args.headless and args.log is None:
+        parser.error('--headless needs --log')
+
+    vis = Visualize(args.log)
+    vis.start(args.headless)
@@ -0,0 +1,228 @@
+import time
+import numpy as np
+from kalman import KalmanTracks
+
+"""
+Fixed size storage for a traced path.
+
+The path is kept in a NumPy ring buffer so a trace which runs for hours uses the same memory, and takes the same time to
+draw, as one which has just started. Points closer than MIN_STEP to the previous point are not stored (someone standing
+still does not fill the buffer) and, when the buffer fills up, the older half of the path is simplified with the
+Ramer-Douglas-Peucker algorithm to make room before the oldest points are dropped.
+
+TrailSet keeps one Trail for each tracked object, keyed by tracking ID, and forgets objects which have not been seen for
+PATH_TTL seconds. By default the positions are smoothed with a Kalman filter (see kalman.py) before they are stored.
+"""
+
+TRAIL_LENGTH = 500  # Maximum number of points kept in a path
+MIN_STEP = 50  # Points closer than this to the previous point are not stored (mm). 0 to store every point
+SIMPLIFY_TOLERANCE = 30  # Maximum distance simplifying moves the old part of the path (mm). 0 to not simplify
+PATH_TTL = 3  # Number of seconds after an object was last seen that its path is removed
+
+
+class Trail:
+    """
+    A path of bounded length.
+    """
+
+    def __init__(self, capacity=TRAIL_LENGTH, min_step=MIN_STEP, tolerance=SIMPLIFY_TOLERANCE):
+        """
+        :param capacity: Maximum number of points kept
+        :param min_step: Points closer than this to the previous point are not stored
+        :param tolerance: Maximum distance simplifying moves the old part of the path. 0 to not simplify
+        """
+        self.capacity = capacity
+        self.min_step = min_step
+        self.tolerance = tolerance
+        # Every point is written twice, capacity rows apart, so the path is always one contiguous slice of the buffer
+        self._buffer = np.zeros((2 * capacity, 2))
+        self.start = 0
+        self.length = 0
+
+    def append(self, x, y):
+        """
+        Add a point to the end of the path.
+
+        :return: False if the point was too close to the previous one to be stored
+        :rtype: bool
+        """
+        if self.length > 0:
+            last = self._buffer[self.start + self.length - 1]
+            if (x - last[0]) ** 2 + (y - last[1]) ** 2 < self.min_step ** 2:
+                return False
+
+        if self.length == self.capacity:
+            if self.tolerance > 0:
+                self._compact()
+            else:
+                self.start = (self.start + 1) % self.capacity
+                self.length -= 1
+
+        index = (self.start + self.length) % self.capacity
+        self._buffer[index] = self._buffer[index + self.capacity] = x, y
+        self.length += 1
+        return True
+
+    def _compact(self):
+        """
+        Simplify the older half of the path, dropping the oldest points if that does not free up a quarter of the buffer.
+        """
+        points = self.points()
+        old = self.capacity // 2
+        simplified = points[:old][rdp(points[:old], self.tolerance)]
+        points = np.concatenate((simplified, points[old:]))[-(self.capacity - self.capacity // 4):]
+        self._set(points)
+
+    def _set(self, points):
+        self.start = 0
+        self.length = len(points)
+        self._buffer[:self.length] = points
+        self._buffer[self.capacity:self.capacity + self.length] = points
+
+    def points(self):
+        """
+        :return: The points in the path, oldest first, as an array of shape (n, 2). This is a view of the buffer
+        :rtype: np.ndarray
+        """
+        return self._buffer[self.start:self.start + self.length]
+
+    def clear(self):
+        self.start = 0
+        self.length = 0
+
+    def __len__(self):
+        return self.length
+
+
+class TrailSet:
+    """
+    The paths of several tracked objects.
+    """
+
+    def __init__(self, ttl=PATH_TTL, clock=time.monotonic, smooth=True, **trail_options):
+        """
+        :param ttl: Seconds after an object was last seen that its path is removed
+        :param clock: Function returning the current time in seconds
+        :param smooth: Smooth the positions with a Kalman filter
+        :param trail_options: Options for each Trail (capacity, min_step, tolerance)
+        """
+        self.ttl = ttl
+        self.clock = clock
+        self.filter = KalmanTracks() if smooth else None
+        self.trail_options = trail_options
+        self.trails = {}  # In the form {<tracking id>: <Trail>}
+        self.last_seen = {}  # In the form {<tracking id>: <time>}
+
+    def update(self, frame, now=None):
+        """
+        Add the positions of the objects in a frame to their paths.
+
+        :param frame: Object tracking frame from the RadarIQ module
+        :param now: Time the frame was received (seconds). Defaults to the clock
+        :return: True if any path changed
+        :rtype: bool
+        """
+        now = self.clock() if now is None else now
+        changed = self.expire(now)
+        tracking_ids = [obj['tracking_id'] for obj in frame]
+        x = [obj['x_pos'] for obj in frame]
+        y = [obj['y_pos'] for obj in frame]
+        if self.filter is not None:
+            x, y = self.filter.update(tracking_ids, x, y, now)
+        for i, tracking_id in enumerate(tracking_ids):
+            path = self.trails.get(tracking_id)
+            if path is None:
+                path = self.trails[tracking_id] = Trail(**self.trail_options)
+            self.last_seen[tracking_id] = now
+            changed = path.append(x[i], y[i]) or changed
+        return changed
+
+    def expire(self, now=None):
+        """
+        Remove the paths of objects which have not been seen within the TTL.
+
+        :return: True if any path was removed
+        :rtype: bool
+        """
+        now = self.clock() if now is None else now
+        expired = [tracking_id for tracking_id, seen in self.last_seen.items() if now - seen > self.ttl]
+        for tracking_id in expired:
+            del self.trails[tracking_id]
+            del self.last_seen[tracking_id]
+            if self.filter is not None:
+                self.filter.remove(tracking_id)
+        return len(expired) > 0
+
+    def segments(self):
+        """
+        :return: The tracking IDs and a list of the paths (arrays of shape (n, 2)), eg. for LineCollection.set_segments
+        :rtype: tuple
+        """
+        return list(self.trails.keys()), [path.points() for path in self.trails.values()]
+
+    def heads(self):
+        """
+        :return: The latest position of each object as an array of shape (n, 2)
+        :rtype: np.ndarray
+        """
+        return np.array([path.points()[-1] for path in self.trails.values()]).reshape(-1, 2)
+
+    def predictions(self, ahead):
+        """
+        Where each object is predicted to go next, from the filtered velocity.
+
+        :param ahead: How far ahead to predict (seconds)
+        :return: A list of segments from the latest position of each object to its predicted position
+        :rtype: list
+        """
+        if self.filter is None or len(self.trails) == 0:
+            return []
+        tracking_ids = list(self.trails.keys())
+        times = np.array([self.last_seen[tracking_id] for tracking_id in tracking_ids])
+        start = self.filter.predict(tracking_ids, times)
+        predicted = self.filter.predict(tracking_ids, times + ahead)
+        return list(np.stack((start, predicted), axis=1))
+
+    def clear(self):
+        self.trails.clear()
+        self.last_seen.clear()
+        if self.filter is not None:
+            self.filter.clear()
+
+    def __len__(self):
+        return len(self.trails)
+
+
+def rdp(points, tolerance):
+    """
+    Ramer-Douglas-Peucker line simplification.
+
+    :param points: Array of shape (n, 2)
+    :param tolerance: Maximum distance of a removed point from the simplified line
+    :return: Boolean array, True for the points which are kept
+    :rtype: np.ndarray
+    """
+    keep = np.zeros(len(points), dtype=bool)
+    if len(points) == 0:
+        return keep
+    keep[0] = keep[-1] = True
+    stack = [(0, len(points) - 1)]
+    while stack:
+        first, last = stack.pop()
+        if last - first < 2:
+            continue
+        start = points[first]
+        direction = points[last] - start
+        offsets = points[first + 1:last] - start
+        length = np.hypot(direction[0], direction[1])
+        if length == 0:
+            distance = np.hypot(offsets[:, 0], offsets[:, 1])
+        else:
+            distance = np.abs(direction[0] * offsets[:, 1] - direction[1] * offsets[:, 0]) / length
+        furthest = int(np.argmax(distance))
+        if distance[furthest] > tolerance:
+            split = first + 1 + furthest
+            keep[split] = True
+            stack.append((first, split))
+            stack.append((split, last))
+    return keep